@@ -0,0 +1,215 @@
+"""
+Compact binary commander index written next to each commander CSV
+
+Shared by the EDHRec scraper (which writes top_commanders_<timeframe>.bin)
+and the commander randomizer API (which reads it instead of parsing the
+CSV). docs/js/dataLoader.js decodes the same layout in the browser.
+"""
+
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+
+# Compact binary commander index written next to each CSV (see write_commander_index)
+#   header:  magic, version, record size, record count, string tables offset
+#   records: rank, decks, name id, type id, rarity id, colour mask, cmc, colours id,
+#            whole-number bits, salt*100, prices in cents (Card Kingdom, TCGPlayer,
+#            Face to Face, Cardmarket, Cardhoarder)
+#   strings: names, types, rarities, colours; each is count, count+1 offsets, UTF-8 blob
+# The colours table keeps the CSV's colour strings (EDHRec order) and the
+# whole-number bits record whether cmc, salt and each price were written as
+# "0" or "0.0", so readers return the same text as the CSV; the mask is there
+# for filtering
+INDEX_MAGIC = b"EDHC"
+INDEX_VERSION = 3
+INDEX_HEADER = struct.Struct("<4sHHII")
+INDEX_RECORD = struct.Struct("<IIIBBBBBBH5I")
+INDEX_STRING_TABLES = ("name", "type", "rarity", "colors")
+INDEX_COLORS_OFFSET = 14  # byte offset of the colour mask within a record
+INDEX_MISSING = 0xFFFFFFFF  # missing rank/decks/price
+INDEX_MISSING_CMC = 0xFF
+INDEX_MISSING_SALT = 0xFFFF
+INDEX_PRICE_FIELDS = ("cardkingdom", "tcgplayer", "face2face", "cardmarket", "cardhoarder")
+INDEX_WHOLE_FIELDS = ("cmc", "salt") + INDEX_PRICE_FIELDS  # bit i of the whole-number byte
+
+# Colour identity bits (WUBRG order)
+COLOR_BITS = {"W": 1, "U": 2, "B": 4, "R": 8, "G": 16}
+
+
+def color_mask(colors: str) -> int:
+    """Convert a colour identity like "W,U,B", "WUB" or "Colorless" to a 5-bit WUBRG mask."""
+    if colors.strip().lower() == "colorless":
+        return 0
+    mask = 0
+    for char in colors.upper():
+        mask |= COLOR_BITS.get(char, 0)
+    return mask
+
+
+def _index_int(value: Any, missing: int, scale: int = 1) -> int:
+    """Encode an optional number as a fixed-width int, using `missing` for blanks."""
+    if value is None or value == "":
+        return missing
+    try:
+        return max(0, min(int(round(float(value) * scale)), missing - 1))
+    except (TypeError, ValueError):
+        return missing
+
+
+def _index_value(value: int, missing: int, scale: int = 1, whole: bool = True) -> Any:
+    """Decode a fixed-width int written by _index_int ("" for blanks, int or float as written)."""
+    if value == missing:
+        return ""
+    return value // scale if whole else value / scale
+
+
+def _is_whole(value: Any) -> bool:
+    """True if the CSV text for value has no decimal point ("4" rather than "4.0")."""
+    if isinstance(value, str):
+        return "." not in value
+    return not isinstance(value, float)
+
+
+def _pack_strings(strings: List[str]) -> bytes:
+    """Pack an interned string table: count, count+1 offsets, UTF-8 blob."""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return struct.pack(f"<I{len(offsets)}I", len(strings), *offsets) + b"".join(encoded)
+
+
+def write_commander_index(commanders: List[Dict[str, Any]], output_path: Path) -> None:
+    """
+    Write commanders as a compact binary index (fixed-width records + string tables).
+    
+    Consumers can mmap the file and scan ranks or colour masks without parsing
+    text; see CommanderIndex for the reader and docs/js/dataLoader.js for the browser.
+    CMC is stored as a whole number and salt in hundredths.
+    
+    Raises:
+        ValueError: if there are more than 255 distinct types or colour strings
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    tables: Dict[str, Dict[str, int]] = {table: {} for table in INDEX_STRING_TABLES}
+    
+    def intern(table: str, value: Any) -> int:
+        ids = tables[table]
+        return ids.setdefault(str(value or ""), len(ids))
+    
+    records = bytearray()
+    for cmd in commanders:
+        whole = sum(1 << bit for bit, field in enumerate(INDEX_WHOLE_FIELDS) if _is_whole(cmd[field]))
+        records += INDEX_RECORD.pack(
+            _index_int(cmd["rank"], INDEX_MISSING),
+            _index_int(cmd["num_decks"], INDEX_MISSING),
+            intern("name", cmd["name"]),
+            intern("type", cmd["type"]),
+            intern("rarity", cmd["rarity"]),
+            color_mask(cmd["colors"]),
+            _index_int(cmd["cmc"], INDEX_MISSING_CMC),
+            intern("colors", cmd["colors"]),
+            whole,
+            _index_int(cmd["salt"], INDEX_MISSING_SALT, 100),
+            *(_index_int(cmd[field], INDEX_MISSING, 100) for field in INDEX_PRICE_FIELDS)
+        )
+    
+    # Type and colour string ids are stored in one byte
+    for table in ("type", "colors"):
+        if len(tables[table]) > 0xFF:
+            raise ValueError(f"Too many distinct {table} strings for the index: {len(tables[table])}")
+    
+    strings_offset = INDEX_HEADER.size + len(records)
+    header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, INDEX_RECORD.size,
+                               len(commanders), strings_offset)
+    
+    with open(output_path, 'wb') as f:
+        f.write(header)
+        f.write(records)
+        for table in INDEX_STRING_TABLES:
+            f.write(_pack_strings(list(tables[table])))
+    
+    print(f"✅ Wrote {len(commanders)} commanders to {output_path}")
+
+
+class CommanderIndex:
+    """
+    Read-only view over a binary commander index written by write_commander_index.
+    
+    Records are decoded on access, so opening a file (mmap) costs only the
+    header and string offset tables. Names are decoded lazily.
+    """
+    
+    def __init__(self, buffer: Any):
+        self.buffer = buffer
+        magic, version, record_size, self.count, strings_offset = INDEX_HEADER.unpack_from(buffer, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or record_size != INDEX_RECORD.size:
+            raise ValueError(f"Not a version {INDEX_VERSION} commander index")
+        
+        self.tables = []
+        offset = strings_offset
+        for _ in INDEX_STRING_TABLES:
+            (count,) = struct.unpack_from("<I", buffer, offset)
+            offsets = struct.unpack_from(f"<{count + 1}I", buffer, offset + 4)
+            blob_start = offset + 4 + 4 * (count + 1)
+            self.tables.append((blob_start, offsets))
+            offset = blob_start + offsets[-1]
+        
+        self.types = [self._string(1, i) for i in range(len(self.tables[1][1]) - 1)]
+        self.rarities = [self._string(2, i) for i in range(len(self.tables[2][1]) - 1)]
+        self.colors = [self._string(3, i) for i in range(len(self.tables[3][1]) - 1)]
+    
+    @classmethod
+    def open(cls, path: Path) -> "CommanderIndex":
+        """Memory-map an index file."""
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self.record(i) for i in range(self.count))
+    
+    def _string(self, table: int, string_id: int) -> str:
+        blob_start, offsets = self.tables[table]
+        return bytes(self.buffer[blob_start + offsets[string_id]:blob_start + offsets[string_id + 1]]).decode('utf-8')
+    
+    def name(self, i: int) -> str:
+        """Commander name for record i."""
+        return self._string(0, struct.unpack_from("<I", self.buffer, INDEX_HEADER.size + i * INDEX_RECORD.size + 8)[0])
+    
+    def color_mask(self, i: int) -> int:
+        """Colour identity mask for record i, without decoding the rest of the record."""
+        return self.buffer[INDEX_HEADER.size + i * INDEX_RECORD.size + INDEX_COLORS_OFFSET]
+    
+    def record(self, i: int) -> Dict[str, Any]:
+        """
+        Decode record i into the same dict shape the scraper writes to CSV.
+        
+        Numbers come back as int or float the way they were written, so
+        str() of each value gives back the CSV text.
+        """
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        
+        rank, decks, name_id, type_id, rarity_id, _, cmc, colors_id, whole_bits, salt, *prices = \
+            INDEX_RECORD.unpack_from(self.buffer, INDEX_HEADER.size + i * INDEX_RECORD.size)
+        whole = {field: bool(whole_bits >> bit & 1) for bit, field in enumerate(INDEX_WHOLE_FIELDS)}
+        
+        commander = {
+            "rank": _index_value(rank, INDEX_MISSING),
+            "colors": self.colors[colors_id],
+            "cmc": _index_value(cmc, INDEX_MISSING_CMC, 1, whole["cmc"]),
+            "name": self._string(0, name_id),
+            "rarity": self.rarities[rarity_id],
+            "type": self.types[type_id],
+            "salt": _index_value(salt, INDEX_MISSING_SALT, 100, whole["salt"]),
+            "num_decks": _index_value(decks, INDEX_MISSING)
+        }
+        for field, price in zip(INDEX_PRICE_FIELDS, prices):
+            commander[field] = _index_value(price, INDEX_MISSING, 100, whole[field])
+        return commander
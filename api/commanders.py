@@ -0,0 +1,421 @@
+# Commander Randomizer API for EDH Randomizer
+# Vercel serverless function
+#
+# Endpoint: GET /api/commanders/random
+#
+# Query parameters (all optional):
+#   timeframe       week | month | 2year (or Weekly | Monthly | 2-Year), default month
+#   count           number of commanders to return (default 1, max 100)
+#   minRank/maxRank rank window (inclusive)
+#   colors + mode   colour filter, mode = exactly | including | atmost (default atmost)
+#   include         colours every commander must have, e.g. "WU"
+#   exclude         colours no commander may have, e.g. "B"
+#   colorCounts     allowed colour counts, e.g. "0,2,3"
+#   minCmc/maxCmc   mana value window (commanders without a CMC are skipped)
+#   salt            salty (> 0.8) | chill (<= 0.8)
+#   excludePartners 1/true to skip "A // B" partner pairs (default true)
+
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+import bisect
+import csv
+import json
+import math
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Binary commander index and colour masks shared with the scraper, CORS
+# headers shared with the other handlers
+try:
+    from commander_index import CommanderIndex, color_mask
+    from cors import cors_headers
+except ImportError:
+    from api.commander_index import CommanderIndex, color_mask
+    from api.cors import cors_headers
+
+# Where the scraper writes top_commanders_<timeframe>.csv (and .bin index)
+COMMANDERS_DATA_DIR = os.environ.get('COMMANDERS_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'docs', 'data'))
+
+TIMEFRAME_FILES = {
+    'week': 'top_commanders_week.csv',
+    'month': 'top_commanders_month.csv',
+    '2year': 'top_commanders_2year.csv',
+}
+
+# Frontend time period labels (docs/js/config.js)
+TIMEFRAME_ALIASES = {'weekly': 'week', 'monthly': 'month', '2-year': '2year'}
+
+DEFAULT_TIMEFRAME = 'month'
+MAX_COUNT = 100
+
+# Salt threshold used by the frontend salt filter
+SALT_THRESHOLD = 0.8
+
+# How often to stat the data files for changes (seconds)
+CATALOG_RECHECK_INTERVAL = 60.0
+
+# CSV columns the catalog reads, and the index record field for each
+INDEX_COLUMNS = {
+    'Rank': 'rank', 'Name': 'name', 'Colors': 'colors', 'CMC': 'cmc',
+    'Rarity': 'rarity', 'Type': 'type', 'Salt': 'salt',
+}
+
+COLOR_MODES = ('exactly', 'including', 'atmost')
+
+# Inclusive (low, high) window over a sorted key; None means unbounded
+Window = Tuple[Optional[float], Optional[float]]
+
+
+def mask_count(mask: int) -> int:
+    return bin(mask).count('1')
+
+
+def parse_number(value: str) -> Optional[float]:
+    try:
+        return float(value) if value != '' else None
+    except ValueError:
+        return None
+
+
+class CommanderBucket:
+    """
+    Commanders sharing one colour mask (and partner flag)
+
+    Keeps row indices sorted by rank, CMC and salt so any of the three
+    windows is two bisects. Rows without a CMC or salt are left out of
+    that key's array (the frontend filters them out too).
+    """
+
+    def __init__(self, rows: List[dict], indices: List[int]):
+        self.by_rank = sorted(indices, key=lambda i: rows[i]['rank'])
+        self.ranks = [rows[i]['rank'] for i in self.by_rank]
+
+        with_cmc = [i for i in indices if rows[i]['_cmc'] is not None]
+        self.by_cmc = sorted(with_cmc, key=lambda i: rows[i]['_cmc'])
+        self.cmcs = [rows[i]['_cmc'] for i in self.by_cmc]
+
+        with_salt = [i for i in indices if rows[i]['_salt'] is not None]
+        self.by_salt = sorted(with_salt, key=lambda i: rows[i]['_salt'])
+        self.salts = [rows[i]['_salt'] for i in self.by_salt]
+
+    @staticmethod
+    def window(keys: List[float], bounds: Window) -> Tuple[int, int]:
+        low, high = bounds
+        start = 0 if low is None else bisect.bisect_left(keys, low)
+        end = len(keys) if high is None else bisect.bisect_right(keys, high)
+        return start, max(start, end)
+
+
+class CommanderCatalog:
+    """
+    One timeframe's commanders, bucketed for colour/rank/CMC/salt queries
+
+    Buckets are keyed by (colour mask, is partner pair). A query picks the
+    matching buckets from at most 64 keys, then in each bucket bisects the
+    narrowest of its rank/CMC/salt windows and checks the other bounds only
+    on that slice, so cost scales with matching buckets rather than rows.
+    """
+
+    def __init__(self, commanders: List[dict], mtime: Optional[float] = None):
+        self.mtime = mtime
+        self.rows: List[dict] = []
+        for commander in commanders:
+            rank = parse_number(commander.get('Rank', ''))
+            if rank is None:
+                continue
+            self.rows.append({
+                'rank': int(rank),
+                'name': commander.get('Name', ''),
+                'colors': commander.get('Colors', ''),
+                'cmc': commander.get('CMC', ''),
+                'rarity': commander.get('Rarity', ''),
+                'type': commander.get('Type', ''),
+                'salt': commander.get('Salt', ''),
+                '_cmc': parse_number(commander.get('CMC', '')),
+                '_salt': parse_number(commander.get('Salt', '')),
+            })
+
+        grouped: Dict[Tuple[int, bool], List[int]] = {}
+        for i, row in enumerate(self.rows):
+            key = (color_mask(row['colors']), ' // ' in row['name'])
+            grouped.setdefault(key, []).append(i)
+
+        self.buckets = {key: CommanderBucket(self.rows, indices) for key, indices in grouped.items()}
+
+        # Colour count -> masks present in this catalog
+        self.masks_by_count: Dict[int, List[int]] = {}
+        for mask in sorted({mask for mask, _ in self.buckets}):
+            self.masks_by_count.setdefault(mask_count(mask), []).append(mask)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def matching_masks(self, colors: Optional[str] = None, mode: str = 'atmost',
+                       include: str = '', exclude: str = '',
+                       color_counts: Optional[List[int]] = None) -> List[int]:
+        """Colour masks satisfying every colour constraint"""
+        counts = set(color_counts) if color_counts else set(self.masks_by_count)
+        # Same rule as the frontend: asking only for colorless ignores the colour set
+        if counts == {0}:
+            colors = None
+
+        selected = color_mask(colors) if colors else None
+        required = color_mask(include)
+        forbidden = color_mask(exclude)
+
+        masks = []
+        for count in sorted(counts):
+            for mask in self.masks_by_count.get(count, []):
+                if mask & required != required or mask & forbidden:
+                    continue
+                if selected is not None:
+                    if mode == 'exactly' and mask != selected:
+                        continue
+                    if mode == 'including' and mask & selected != selected:
+                        continue
+                    if mode == 'atmost' and mask & ~selected:
+                        continue
+                masks.append(mask)
+        return masks
+
+    def query(self, masks: List[int], rank: Window = (None, None), cmc: Window = (None, None),
+              salt: Window = (None, None), exclude_partners: bool = True) -> List[int]:
+        """Row indices in the given colour masks inside every window"""
+        matches = []
+        partner_flags = (False,) if exclude_partners else (False, True)
+
+        for mask in masks:
+            for is_partner in partner_flags:
+                bucket = self.buckets.get((mask, is_partner))
+                if bucket is None:
+                    continue
+
+                # Drive the scan from the narrowest window in this bucket
+                candidates = [(bucket.by_rank, CommanderBucket.window(bucket.ranks, rank))]
+                if cmc != (None, None):
+                    candidates.append((bucket.by_cmc, CommanderBucket.window(bucket.cmcs, cmc)))
+                if salt != (None, None):
+                    candidates.append((bucket.by_salt, CommanderBucket.window(bucket.salts, salt)))
+                order, (start, end) = min(candidates, key=lambda c: c[1][1] - c[1][0])
+
+                for i in order[start:end]:
+                    row = self.rows[i]
+                    if (self._within(row['rank'], rank) and self._within(row['_cmc'], cmc)
+                            and self._within(row['_salt'], salt)):
+                        matches.append(i)
+        return matches
+
+    @staticmethod
+    def _within(value: Optional[float], bounds: Window) -> bool:
+        low, high = bounds
+        if low is None and high is None:
+            return True
+        if value is None:
+            return False
+        return (low is None or value >= low) and (high is None or value <= high)
+
+    def random(self, count: int, **filters) -> Tuple[List[dict], int]:
+        """Pick up to `count` distinct random commanders; returns (commanders, matched)"""
+        masks = self.matching_masks(
+            filters.pop('colors', None), filters.pop('mode', 'atmost'),
+            filters.pop('include', ''), filters.pop('exclude', ''),
+            filters.pop('color_counts', None)
+        )
+        matches = self.query(masks, **filters)
+        picked = random.sample(matches, min(count, len(matches)))
+        return [self.public_row(i) for i in picked], len(matches)
+
+    def public_row(self, i: int) -> dict:
+        return {key: value for key, value in self.rows[i].items() if not key.startswith('_')}
+
+
+_CATALOGS: Dict[str, CommanderCatalog] = {}
+_CATALOG_CHECKED_AT: Dict[str, float] = {}
+_CATALOG_LOCK = threading.Lock()
+
+
+def index_rows(index: CommanderIndex) -> Iterator[dict]:
+    """Index records as CSV rows; str() gives back the text the scraper writes"""
+    for record in index:
+        yield {column: str(record[field]) for column, field in INDEX_COLUMNS.items()}
+
+
+def load_commander_rows(csv_path: str) -> List[dict]:
+    """
+    Rows for a timeframe, read from the binary index next to the CSV
+
+    Falls back to parsing the CSV when the index is missing or was written
+    in another format version.
+    """
+    index_path = os.path.splitext(csv_path)[0] + '.bin'
+    try:
+        index = CommanderIndex.open(index_path)
+    except (OSError, ValueError):
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    try:
+        return list(index_rows(index))
+    finally:
+        index.buffer.close()
+
+
+def data_mtime(csv_path: str) -> float:
+    """Modification time of whichever file load_commander_rows would read"""
+    index_path = os.path.splitext(csv_path)[0] + '.bin'
+    return os.path.getmtime(index_path if os.path.exists(index_path) else csv_path)
+
+
+def get_commander_catalog(timeframe: str) -> CommanderCatalog:
+    """Catalog for a timeframe, loaded once and reloaded when its data changes"""
+    path = os.path.join(COMMANDERS_DATA_DIR, TIMEFRAME_FILES[timeframe])
+
+    now = time.time()
+    with _CATALOG_LOCK:
+        catalog = _CATALOGS.get(timeframe)
+        if catalog is not None and now - _CATALOG_CHECKED_AT.get(timeframe, 0) < CATALOG_RECHECK_INTERVAL:
+            return catalog
+        _CATALOG_CHECKED_AT[timeframe] = now
+
+        mtime = data_mtime(path)
+        if catalog is None or catalog.mtime != mtime:
+            catalog = CommanderCatalog(load_commander_rows(path), mtime)
+            _CATALOGS[timeframe] = catalog
+            print(f"[Commanders] Loaded {len(catalog)} {timeframe} commanders into {len(catalog.buckets)} buckets")
+
+        return catalog
+
+
+def parse_random_query(params: Dict[str, List[str]]) -> dict:
+    """Turn query string parameters into CommanderCatalog.random() arguments
+
+    Raises:
+        ValueError: if a parameter is malformed
+    """
+    def param(name: str, default: str = '') -> str:
+        return params.get(name, [default])[0].strip()
+
+    def number(name: str) -> Optional[float]:
+        value = param(name)
+        if value == '':
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f'{name} must be a number')
+
+    mode = param('mode', 'atmost').lower()
+    if mode not in COLOR_MODES:
+        raise ValueError(f'mode must be one of: {", ".join(COLOR_MODES)}')
+
+    counts = None
+    if param('colorCounts'):
+        try:
+            counts = [int(c) for c in param('colorCounts').split(',') if c.strip()]
+        except ValueError:
+            raise ValueError('colorCounts must be a comma separated list of numbers')
+
+    salt = (None, None)
+    salt_mode = param('salt').lower()
+    if salt_mode == 'salty':
+        salt = (math.nextafter(SALT_THRESHOLD, math.inf), None)
+    elif salt_mode == 'chill':
+        salt = (None, SALT_THRESHOLD)
+    elif salt_mode:
+        raise ValueError('salt must be salty or chill')
+
+    return {
+        'colors': param('colors') or None,
+        'mode': mode,
+        'include': param('include'),
+        'exclude': param('exclude'),
+        'color_counts': counts,
+        'rank': (number('minRank'), number('maxRank')),
+        'cmc': (number('minCmc'), number('maxCmc')),
+        'salt': salt,
+        'exclude_partners': param('excludePartners', 'true').lower() not in ('0', 'false', 'no'),
+    }
+
+
+def resolve_timeframe(value: str) -> Optional[str]:
+    value = (value or DEFAULT_TIMEFRAME).strip().lower()
+    value = TIMEFRAME_ALIASES.get(value, value)
+    return value if value in TIMEFRAME_FILES else None
+
+
+class handler(BaseHTTPRequestHandler):
+    # Every response sends a Content-Length, so connections can be kept alive
+    protocol_version = 'HTTP/1.1'
+
+    def do_OPTIONS(self):
+        """Handle CORS preflight requests"""
+        self.send_response(200)
+        for key, value in cors_headers('GET, OPTIONS').items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        """Handle GET requests"""
+        url = urlparse(self.path)
+        path = url.path
+
+        # Strip /api/commanders prefix if present (Vercel might include it or not)
+        if path.startswith('/api/commanders'):
+            path = path[15:]
+
+        if path in ('/random', '', '/'):
+            self.handle_random(parse_qs(url.query))
+        else:
+            self.send_error_response(404, f'Endpoint not found: {self.path}')
+
+    def handle_random(self, params: Dict[str, List[str]]):
+        """Pick random commanders matching the query filters"""
+        timeframe = resolve_timeframe(params.get('timeframe', [''])[0])
+        if not timeframe:
+            self.send_error_response(400, f'timeframe must be one of: {", ".join(TIMEFRAME_FILES)}')
+            return
+
+        try:
+            count = max(1, min(int(params.get('count', ['1'])[0]), MAX_COUNT))
+        except ValueError:
+            self.send_error_response(400, 'count must be a number')
+            return
+
+        try:
+            filters = parse_random_query(params)
+        except ValueError as e:
+            self.send_error_response(400, str(e))
+            return
+
+        try:
+            catalog = get_commander_catalog(timeframe)
+        except OSError as e:
+            print(f"[Commanders] Could not load {timeframe} data: {e}")
+            self.send_error_response(503, f'No commander data for {timeframe}')
+            return
+
+        commanders, matched = catalog.random(count, **filters)
+        self.send_json_response(200, {
+            'timeframe': timeframe,
+            'matched': matched,
+            'commanders': commanders
+        })
+
+    def send_json_response(self, status_code, data):
+        """Send JSON response with CORS headers"""
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        for key, value in cors_headers('GET, OPTIONS').items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_response(self, status_code, message):
+        """Send error response"""
+        self.send_json_response(status_code, {'error': True, 'message': message})
@@ -0,0 +1,14 @@
+"""
+CORS headers shared by the API handlers (index.py, sessions.py, commanders.py)
+"""
+
+from typing import Dict
+
+
+def cors_headers(methods: str = 'GET, POST, OPTIONS') -> Dict[str, str]:
+    """Return CORS headers for all responses"""
+    return {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': methods,
+        'Access-Control-Allow-Headers': 'Content-Type',
+    }
@@ -0,0 +1,208 @@
+"""
+Pooled keep-alive HTTP client for upstream fetches
+
+Shared by the pack generator API (index.py), pack_generator.py and the
+EDHRec scraper, so all of them reuse TCP/TLS connections to EDHRec,
+Scryfall and Moxfield.
+"""
+
+import base64
+import gzip
+import http.client
+import io
+import os
+import ssl
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Concurrent requests (and kept-alive connections) per upstream host
+HTTP_POOL_MAX_PER_HOST = int(os.environ.get('HTTP_POOL_MAX_PER_HOST', 8))
+
+# Same User-Agent urlopen sends, so upstreams see no change
+HTTP_USER_AGENT = f"Python-urllib/{urllib.request.__version__}"
+
+HTTP_REDIRECT_CODES = (301, 302, 303, 307, 308)
+HTTP_MAX_REDIRECTS = 5
+
+
+class HTTPConnectionPool:
+    """
+    Keep-alive connections to upstream hosts, shared by every fetch
+
+    Each (scheme, host) keeps up to max_per_host idle connections, and a
+    semaphore caps the requests in flight to it, so prefetch threads and
+    batch jobs reuse TCP/TLS sessions instead of handshaking per page.
+    Responses are requested with gzip/deflate and decoded transparently.
+
+    Proxies come from the environment like urlopen (HTTP_PROXY, HTTPS_PROXY,
+    NO_PROXY): plain HTTP is sent to the proxy with absolute URLs and HTTPS
+    is tunnelled through it with CONNECT.
+    """
+
+    def __init__(self, max_per_host: int = HTTP_POOL_MAX_PER_HOST, proxies: Optional[Dict[str, str]] = None):
+        self.max_per_host = max(1, max_per_host)
+        self.proxies = urllib.request.getproxies() if proxies is None else proxies
+        self.idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self.limits: Dict[Tuple[str, str], threading.BoundedSemaphore] = {}
+        self.counters = {'requests': 0, 'connections_opened': 0, 'connections_reused': 0}
+        self.ssl_context = ssl.create_default_context()
+        self.lock = threading.Lock()
+
+    def _limit(self, key: Tuple[str, str]) -> threading.BoundedSemaphore:
+        with self.lock:
+            if key not in self.limits:
+                self.limits[key] = threading.BoundedSemaphore(self.max_per_host)
+            return self.limits[key]
+
+    def _proxy(self, scheme: str, netloc: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """Proxy host and auth headers for a (scheme, host), or None to connect directly"""
+        proxy_url = self.proxies.get(scheme)
+        if not proxy_url:
+            return None
+        if 'no' in self.proxies and urllib.request.proxy_bypass_environment(netloc, self.proxies):
+            return None
+
+        if '://' not in proxy_url:
+            proxy_url = f"http://{proxy_url}"
+        proxy = urllib.parse.urlsplit(proxy_url)
+        headers = {}
+        if proxy.username is not None:
+            credentials = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+            headers['Proxy-Authorization'] = 'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+        return proxy.netloc.rpartition('@')[2], headers
+
+    def _checkout(self, key: Tuple[str, str], timeout: float, proxy: Optional[Tuple[str, Dict[str, str]]]) -> Tuple[http.client.HTTPConnection, bool]:
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                self.counters['connections_reused'] += 1
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+            self.counters['connections_opened'] += 1
+
+        scheme, host = key
+        if proxy is None:
+            if scheme == 'https':
+                return http.client.HTTPSConnection(host, timeout=timeout, context=self.ssl_context), False
+            return http.client.HTTPConnection(host, timeout=timeout), False
+
+        proxy_host, proxy_headers = proxy
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(proxy_host, timeout=timeout, context=self.ssl_context)
+            conn.set_tunnel(host, headers=proxy_headers)
+            return conn, False
+        return http.client.HTTPConnection(proxy_host, timeout=timeout), False
+
+    def _checkin(self, key: Tuple[str, str], conn: http.client.HTTPConnection):
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _send(self, key: Tuple[str, str], target: str, headers: Dict[str, str], timeout: float,
+              proxy: Optional[Tuple[str, Dict[str, str]]] = None) -> Tuple[http.client.HTTPResponse, bytes]:
+        """One request on a pooled connection, retrying once if a kept-alive socket went stale"""
+        while True:
+            conn, reused = self._checkout(key, timeout, proxy)
+            try:
+                conn.request('GET', target, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                if reused and not isinstance(e, TimeoutError):
+                    continue
+                if isinstance(e, urllib.error.URLError):
+                    raise
+                raise urllib.error.URLError(e) from e
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return response, body
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10) -> Tuple[int, bytes, Any]:
+        """
+        GET a URL, following redirects
+
+        Returns:
+            (status, decoded body, response headers)
+
+        Raises:
+            urllib.error.HTTPError: for non-2xx responses, like urlopen
+            urllib.error.URLError: when the connection fails or times out
+        """
+        request_headers = {
+            'User-Agent': HTTP_USER_AGENT,
+            'Accept-Encoding': 'gzip, deflate',
+            **(headers or {})
+        }
+
+        for _ in range(HTTP_MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            if parts.scheme not in ('http', 'https') or not parts.netloc:
+                raise urllib.error.URLError(f"unsupported URL: {url}")
+            key = (parts.scheme, parts.netloc)
+            target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+            send_headers = request_headers
+            proxy = self._proxy(parts.scheme, parts.netloc)
+            if proxy and parts.scheme == 'http':
+                # Plain HTTP proxies take the absolute URL in the request line
+                target = f"http://{parts.netloc}{target}"
+                send_headers = {**request_headers, **proxy[1]}
+
+            with self._limit(key):
+                with self.lock:
+                    self.counters['requests'] += 1
+                response, body = self._send(key, target, send_headers, timeout, proxy)
+
+            location = response.getheader('Location')
+            if response.status in HTTP_REDIRECT_CODES and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+
+            body = self._decode(body, response.getheader('Content-Encoding', ''))
+            if not 200 <= response.status < 300:
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+            return response.status, body, response.headers
+
+        raise urllib.error.URLError(f"too many redirects: {url}")
+
+    @staticmethod
+    def _decode(body: bytes, encoding: str) -> bytes:
+        encoding = encoding.strip().lower()
+        if encoding == 'gzip':
+            return gzip.decompress(body)
+        if encoding == 'deflate':
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                # Some servers send raw deflate without the zlib header
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+        return body
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.counters, 'idle': {host: len(conns) for (_, host), conns in self.idle.items()}}
+
+    def close(self):
+        """Close every idle connection"""
+        with self.lock:
+            idle, self.idle = self.idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+HTTP_POOL = HTTPConnectionPool()
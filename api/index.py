@@ -1,16 +1,31 @@
 """
 EDH Randomizer Pack Generator API
-Vercel Serverless Function (Combined Single File)
+Vercel Serverless Function (plus the shared http_pool.py, commander_index.py
+and cors.py modules)
 
 Endpoint: POST /api/index
 """
 
+import bisect
+import hashlib
+import heapq
+import http.client
 import json
-import urllib.request
+import math
+import os
+import urllib.error
 import urllib.parse
 import re
 import random
-from typing import Dict, List, Any, Optional, Tuple
+import sqlite3
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from http.server import BaseHTTPRequestHandler
 
 
@@ -79,6 +94,508 @@ def get_color_identity_name(colors: Optional[List[str]]) -> Optional[str]:
     return None
 
 
+# ==========================================
+# REQUEST TIMINGS
+# ==========================================
+
+class Timings:
+    """
+    Named spans for one request, summed per name
+    
+    Spans may be recorded from prefetch threads concurrently, so a name's
+    total can exceed the request's wall time when its work overlaps.
+    """
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}  # name -> [count, total seconds, longest]
+        self.lock = threading.Lock()
+    
+    def add(self, name: str, seconds: float):
+        with self.lock:
+            span = self.spans.setdefault(name, [0, 0.0, 0.0])
+            span[0] += 1
+            span[1] += seconds
+            span[2] = max(span[2], seconds)
+    
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block under name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+    
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+    
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """{name: {count, ms, max_ms}} plus the request total so far"""
+        with self.lock:
+            spans = {
+                name: {'count': count, 'ms': round(total * 1000, 1), 'max_ms': round(longest * 1000, 1)}
+                for name, (count, total, longest) in self.spans.items()
+            }
+        spans['total'] = {'count': 1, 'ms': round(self.elapsed_ms(), 1), 'max_ms': round(self.elapsed_ms(), 1)}
+        return spans
+    
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. 'fetch.edhrec;desc="3x";dur=412.0, total;dur=530.2'"""
+        with self.lock:
+            entries = [
+                f'{name};desc="{count}x";dur={total * 1000:.1f}'
+                for name, (count, total, _) in self.spans.items()
+            ]
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ', '.join(entries)
+
+
+# ==========================================
+# RESPONSE CACHE
+# ==========================================
+
+# How long (seconds) a cached upstream response stays fresh, per source
+RESPONSE_CACHE_TTLS = {
+    'edhrec': 24 * 60 * 60,        # EDHRec pages change at most daily
+    'average_deck': 24 * 60 * 60,
+    'scryfall': 6 * 60 * 60,
+    'moxfield': 15 * 60            # Decks can be edited at any time
+}
+
+# Backend selection: "memory" (default), "sqlite" or "none". SQLite is opt-in
+# so importing this module never creates files; set RESPONSE_CACHE_BACKEND=sqlite
+# on deployments to share the cache between workers of a warm instance
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory').lower()
+
+# Vercel only allows writes under /tmp, which survives as long as the instance stays warm
+RESPONSE_CACHE_DIR = os.environ.get(
+    'RESPONSE_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'edhrandomizer-cache')
+)
+
+# Size budget for cached bodies, least recently used entries are evicted past this
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+
+class ResponseCache:
+    """
+    Cache of raw upstream response bodies keyed by URL
+
+    This base class stores nothing and only counts misses, so it doubles as
+    the "none" backend. Subclasses implement _load/_store/_evict.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, int]] = None):
+        self.ttls = ttls if ttls is not None else RESPONSE_CACHE_TTLS
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.lock = threading.Lock()
+
+    def _count(self, source: str, counter: str, amount: int = 1):
+        source_counters = self.counters.setdefault(
+            source, {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        )
+        source_counters[counter] += amount
+
+    def get(self, url: str, source: str) -> Optional[bytes]:
+        """Return a fresh cached body or None"""
+        with self.lock:
+            body = self._load(url, time.time())
+            self._count(source, 'hits' if body is not None else 'misses')
+            return body
+
+    def set(self, url: str, source: str, body: bytes):
+        """Store a body with the TTL configured for its source"""
+        ttl = self.ttls.get(source, 0)
+        if ttl <= 0:
+            return
+
+        with self.lock:
+            now = time.time()
+            self._store(url, source, body, now, now + ttl)
+            self._count(source, 'stores')
+            evicted = self._evict()
+            if evicted:
+                self._count(source, 'evictions', evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per source"""
+        with self.lock:
+            return {
+                'backend': type(self).__name__,
+                'sources': {source: dict(counters) for source, counters in self.counters.items()}
+            }
+
+    def _load(self, url: str, now: float) -> Optional[bytes]:
+        return None
+
+    def _store(self, url: str, source: str, body: bytes, now: float, expires_at: float):
+        pass
+
+    def _evict(self) -> int:
+        return 0
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process LRU cache, lost when the process exits"""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES, ttls: Optional[Dict[str, int]] = None):
+        super().__init__(ttls)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries: 'OrderedDict[str, Tuple[bytes, float]]' = OrderedDict()
+
+    def _load(self, url: str, now: float) -> Optional[bytes]:
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+
+        body, expires_at = entry
+        if expires_at <= now:
+            del self.entries[url]
+            self.total_bytes -= len(body)
+            return None
+
+        self.entries.move_to_end(url)
+        return body
+
+    def _store(self, url: str, source: str, body: bytes, now: float, expires_at: float):
+        old = self.entries.pop(url, None)
+        if old is not None:
+            self.total_bytes -= len(old[0])
+        self.entries[url] = (body, expires_at)
+        self.total_bytes += len(body)
+
+    def _evict(self) -> int:
+        evicted = 0
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (body, _) = self.entries.popitem(last=False)
+            self.total_bytes -= len(body)
+            evicted += 1
+        return evicted
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk cache in a single SQLite file, shared by every process on the box
+
+    Entries carry their own expiry and a last-access timestamp used for LRU
+    eviction once the stored bodies exceed max_bytes.
+
+    The stored size is tracked in memory so writes don't re-sum the table.
+    Other processes write to the same file, so the total is re-read from
+    the database every resync_interval writes and before evicting.
+    """
+
+    resync_interval = 100
+
+    def __init__(self, path: str, max_bytes: int = RESPONSE_CACHE_MAX_BYTES, ttls: Optional[Dict[str, int]] = None):
+        super().__init__(ttls)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.writes_since_sync = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' url TEXT PRIMARY KEY,'
+            ' source TEXT NOT NULL,'
+            ' body BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' expires_at REAL NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)')
+        self.total_bytes = self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        return self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def _load(self, url: str, now: float) -> Optional[bytes]:
+        row = self.conn.execute(
+            'SELECT body, expires_at FROM responses WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        body, expires_at = row
+        if expires_at <= now:
+            self.conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self.total_bytes -= len(body)
+            return None
+
+        self.conn.execute('UPDATE responses SET last_access = ? WHERE url = ?', (now, url))
+        return bytes(body)
+
+    def _store(self, url: str, source: str, body: bytes, now: float, expires_at: float):
+        old = self.conn.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+        self.conn.execute(
+            'INSERT OR REPLACE INTO responses (url, source, body, size, expires_at, last_access) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (url, source, sqlite3.Binary(body), len(body), expires_at, now)
+        )
+        self.total_bytes += len(body) - (old[0] if old else 0)
+        self.writes_since_sync += 1
+
+    def _evict(self) -> int:
+        if self.writes_since_sync >= self.resync_interval:
+            self.total_bytes = self._stored_bytes()
+            self.writes_since_sync = 0
+        if self.total_bytes <= self.max_bytes:
+            return 0
+
+        # Expired rows go first, then least recently used until back under budget
+        evicted = self.conn.execute('DELETE FROM responses WHERE expires_at <= ?', (time.time(),)).rowcount
+        total = self._stored_bytes()
+
+        rows = self.conn.execute('SELECT url, size FROM responses ORDER BY last_access').fetchall()
+        stale = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((url,))
+            total -= size
+
+        if stale:
+            self.conn.executemany('DELETE FROM responses WHERE url = ?', stale)
+        self.total_bytes = total
+        self.writes_since_sync = 0
+        return evicted + len(stale)
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the response cache selected by RESPONSE_CACHE_BACKEND"""
+    if RESPONSE_CACHE_BACKEND == 'none':
+        return ResponseCache()
+
+    if RESPONSE_CACHE_BACKEND == 'sqlite':
+        try:
+            return SQLiteResponseCache(os.path.join(RESPONSE_CACHE_DIR, 'responses.sqlite3'))
+        except Exception as e:
+            print(f"[Cache] Could not open SQLite response cache, using memory: {e}")
+
+    return MemoryResponseCache()
+
+
+RESPONSE_CACHE = create_response_cache()
+
+
+def set_response_cache(cache: ResponseCache):
+    """Swap the response cache backend (e.g. for tests or custom storage)"""
+    global RESPONSE_CACHE
+    RESPONSE_CACHE = cache
+
+
+# ==========================================
+# UPSTREAM HTTP CLIENT
+# ==========================================
+
+# The keep-alive client lives in http_pool.py so pack_generator.py and the
+# scraper can share it without importing this module
+try:
+    from http_pool import HTTP_POOL, HTTPConnectionPool
+except ImportError:
+    from api.http_pool import HTTP_POOL, HTTPConnectionPool
+
+# Colour bits and CORS headers shared with the other API handlers
+try:
+    from commander_index import COLOR_BITS
+    from cors import cors_headers
+except ImportError:
+    from api.commander_index import COLOR_BITS
+    from api.cors import cors_headers
+
+
+# ==========================================
+# UPSTREAM HEALTH
+# ==========================================
+
+# Consecutive failures that open a host's circuit, and how long (seconds) it
+# stays open before a single trial request is let through
+UPSTREAM_FAILURE_THRESHOLD = int(os.environ.get('UPSTREAM_FAILURE_THRESHOLD', 5))
+UPSTREAM_OPEN_SECONDS = float(os.environ.get('UPSTREAM_OPEN_SECONDS', 30))
+
+# How long (seconds) a failed URL is answered from memory, and how many are kept
+UPSTREAM_NEGATIVE_TTL = float(os.environ.get('UPSTREAM_NEGATIVE_TTL', 60))
+UPSTREAM_NEGATIVE_MAX_ENTRIES = int(os.environ.get('UPSTREAM_NEGATIVE_MAX_ENTRIES', 1024))
+
+
+class UpstreamUnavailable(urllib.error.URLError):
+    """Raised without a network call while a host's circuit is open"""
+
+
+def is_host_failure(error: BaseException) -> bool:
+    """Whether an error says the host itself is unhealthy (vs. a bad URL or body)"""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code >= 500 or error.code == 429
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+
+class UpstreamHealth:
+    """
+    Per-host circuit breakers plus a short-lived cache of failed URLs
+
+    A host's circuit opens after UPSTREAM_FAILURE_THRESHOLD consecutive
+    timeouts, connection errors or 5xx/429 responses. While open, requests
+    fail immediately. After UPSTREAM_OPEN_SECONDS it goes half-open and lets
+    one trial request through, whose outcome closes or reopens it.
+
+    Any failed URL (including 404s and malformed bodies) is remembered for
+    UPSTREAM_NEGATIVE_TTL, so retries within that window fail fast with an
+    equivalent error instead of waiting on another timeout.
+    """
+
+    def __init__(self, failure_threshold: int = UPSTREAM_FAILURE_THRESHOLD,
+                 open_seconds: float = UPSTREAM_OPEN_SECONDS,
+                 negative_ttl: float = UPSTREAM_NEGATIVE_TTL,
+                 max_negative_entries: int = UPSTREAM_NEGATIVE_MAX_ENTRIES):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.negative_ttl = negative_ttl
+        self.max_negative_entries = max_negative_entries
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+        self.failed: 'OrderedDict[str, Tuple[Optional[int], str, float]]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _host(self, url: str) -> Dict[str, Any]:
+        host = urllib.parse.urlparse(url).netloc
+        return self.hosts.setdefault(host, {
+            'host': host, 'state': 'closed', 'failures': 0, 'opened_at': 0.0, 'trial_at': None,
+            'opens': 0, 'short_circuits': 0, 'negative_hits': 0
+        })
+
+    def check(self, url: str):
+        """
+        Raise instead of fetching url when it recently failed or its host is down
+
+        Raises:
+            urllib.error.HTTPError: the URL recently answered with this status
+            UpstreamUnavailable: the URL recently failed otherwise, or the circuit is open
+        """
+        now = time.time()
+        with self.lock:
+            host = self._host(url)
+
+            failed = self.failed.get(url)
+            if failed is not None:
+                code, reason, expires_at = failed
+                if expires_at > now:
+                    host['negative_hits'] += 1
+                    if code is not None:
+                        raise urllib.error.HTTPError(url, code, reason, None, None)
+                    raise UpstreamUnavailable(f"recently failed: {reason}")
+                del self.failed[url]
+
+            if host['state'] == 'open' and now - host['opened_at'] >= self.open_seconds:
+                host['state'] = 'half_open'
+                host['trial_at'] = None
+
+            if host['state'] == 'half_open':
+                # One trial at a time; a trial that never reported back is retried after a while
+                if host['trial_at'] is None or now - host['trial_at'] >= self.open_seconds:
+                    host['trial_at'] = now
+                    return
+
+            if host['state'] != 'closed':
+                host['short_circuits'] += 1
+                raise UpstreamUnavailable(f"circuit {host['state']} for {host['host']}")
+
+    def record_success(self, url: str):
+        with self.lock:
+            self._close(self._host(url))
+
+    def record_failure(self, url: str, error: BaseException):
+        now = time.time()
+        with self.lock:
+            if self.negative_ttl > 0:
+                code = error.code if isinstance(error, urllib.error.HTTPError) else None
+                reason = str(error.reason) if isinstance(error, urllib.error.URLError) else f"{type(error).__name__}: {error}"
+                self.failed.pop(url, None)
+                self.failed[url] = (code, reason, now + self.negative_ttl)
+                while len(self.failed) > self.max_negative_entries:
+                    self.failed.popitem(last=False)
+
+            host = self._host(url)
+            if not is_host_failure(error):
+                # The host answered, the URL or its body was the problem
+                self._close(host)
+                return
+
+            host['failures'] += 1
+            if host['state'] == 'half_open' or host['failures'] >= self.failure_threshold:
+                if host['state'] != 'open':
+                    host['opens'] += 1
+                    print(f"[Upstream] Circuit open for {host['host']} after {host['failures']} failures: {error}")
+                host['state'] = 'open'
+                host['opened_at'] = now
+                host['trial_at'] = None
+
+    def _close(self, host: Dict[str, Any]):
+        if host['state'] != 'closed':
+            print(f"[Upstream] Circuit closed for {host['host']}")
+        host['state'] = 'closed'
+        host['failures'] = 0
+        host['trial_at'] = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state and counters per host"""
+        with self.lock:
+            return {
+                'hosts': {
+                    name: {key: host[key] for key in ('state', 'failures', 'opens', 'short_circuits', 'negative_hits')}
+                    for name, host in self.hosts.items()
+                },
+                'failed_urls': len(self.failed)
+            }
+
+
+UPSTREAM_HEALTH = UpstreamHealth()
+
+
+def fetch_json(url: str, source: str, timeout: int = 10) -> Any:
+    """
+    Fetch and decode a JSON document, going through the response cache
+
+    Args:
+        url: Upstream URL
+        source: Cache source name, selects the TTL (see RESPONSE_CACHE_TTLS)
+        timeout: Socket timeout in seconds
+
+    Raises HTTPError/URLError (as urlopen would) or JSON errors, so callers
+    keep their error handling.
+    Recently failed URLs and hosts with an open circuit raise immediately
+    (see UpstreamHealth). Cache read/write errors (e.g. a locked SQLite
+    file) are logged and never fail the fetch.
+    """
+    try:
+        body = RESPONSE_CACHE.get(url, source)
+    except Exception as e:
+        print(f"[Cache] Read failed for {url}: {type(e).__name__}: {e}")
+        body = None
+    if body is not None:
+        return json.loads(body.decode('utf-8'))
+
+    UPSTREAM_HEALTH.check(url)
+    try:
+        _, body, _ = HTTP_POOL.get(url, timeout=timeout)
+
+        # Decode before storing so malformed responses never get cached
+        data = json.loads(body.decode('utf-8'))
+    except Exception as e:
+        UPSTREAM_HEALTH.record_failure(url, e)
+        raise
+
+    UPSTREAM_HEALTH.record_success(url)
+    try:
+        RESPONSE_CACHE.set(url, source, body)
+    except Exception as e:
+        print(f"[Cache] Write failed for {url}: {type(e).__name__}: {e}")
+    return data
+
+
 # ==========================================
 # SCRYFALL QUERIES
 # ==========================================
@@ -202,6 +719,367 @@ def build_scryfall_query(
     return url
 
 
+# ==========================================
+# SCRYFALL BULK DATA (OFFLINE QUERIES)
+# ==========================================
+
+# Path to a Scryfall "Oracle Cards" bulk-data JSON file. When set, Scryfall
+# queries are answered from this file instead of api.scryfall.com (queries
+# using syntax we don't evaluate locally still go to the network).
+SCRYFALL_BULK_PATH = os.environ.get('SCRYFALL_BULK_PATH')
+
+# Memoized query results kept per loaded bulk file (least recently used go first)
+SCRYFALL_QUERY_CACHE_SIZE = int(os.environ.get('SCRYFALL_QUERY_CACHE_SIZE', 512))
+
+# Seconds between checks for a newer bulk file (a new file is reloaded)
+SCRYFALL_BULK_RECHECK_INTERVAL = float(os.environ.get('SCRYFALL_BULK_RECHECK_INTERVAL', 60))
+
+# Layouts that Scryfall search leaves out by default
+SCRYFALL_EXTRA_LAYOUTS = {
+    'token', 'double_faced_token', 'emblem', 'art_series',
+    'vanguard', 'scheme', 'planar'
+}
+
+# Color identity for each WUBRG mask, in WUBRG order (tuples, so callers copy
+# them into their own lists instead of sharing one)
+COLOR_IDENTITY_BY_MASK = tuple(tuple(c for c in 'WUBRG' if mask & COLOR_BITS[c]) for mask in range(32))
+
+LEGALITY_CODES = {'not_legal': 0, 'legal': 1, 'banned': 2, 'restricted': 3}
+
+SCRYFALL_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<open>-?\()
+      | (?P<close>\))
+      | (?P<term>-?(?:[A-Za-z]+(?:>=|<=|!=|:|=|>|<))?(?:"[^"]*"|[^\s()]+))
+    )
+''', re.VERBOSE)
+
+SCRYFALL_TERM_RE = re.compile(r'^(?P<key>[A-Za-z]+)(?P<op>>=|<=|!=|:|=|>|<)(?P<value>.*)$', re.DOTALL)
+
+
+class UnsupportedScryfallQuery(ValueError):
+    """Raised for search syntax the local bulk-data engine can't evaluate"""
+
+
+def color_identity_mask(colors: List[str]) -> int:
+    """Pack a color identity into a 5-bit WUBRG mask"""
+    mask = 0
+    for color in colors:
+        mask |= COLOR_BITS.get(color.upper(), 0)
+    return mask
+
+
+def parse_scryfall_query(query: str) -> Tuple:
+    """
+    Parse the subset of Scryfall search syntax used by pack configs
+
+    Supports implicit AND, OR, parentheses, '-' negation, quoted values and
+    the keys evaluated by ScryfallBulkIndex. Returns a nested tuple AST:
+    ('and', [...]), ('or', [...]), ('not', node), ('term', key, op, value).
+    """
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = SCRYFALL_TOKEN_RE.match(query, position)
+        if not match or match.end() == position:
+            raise UnsupportedScryfallQuery(f"Cannot tokenize query near: {query[position:]!r}")
+        position = match.end()
+        if match.group('open'):
+            tokens.append(match.group('open'))
+        elif match.group('close'):
+            tokens.append(')')
+        elif match.group('term'):
+            tokens.append(match.group('term'))
+
+    def parse_or(index):
+        branches = []
+        node, index = parse_and(index)
+        branches.append(node)
+        while index < len(tokens) and tokens[index].upper() == 'OR':
+            node, index = parse_and(index + 1)
+            branches.append(node)
+        return (branches[0] if len(branches) == 1 else ('or', branches)), index
+
+    def parse_and(index):
+        parts = []
+        while index < len(tokens) and tokens[index] != ')' and tokens[index].upper() != 'OR':
+            if tokens[index].upper() == 'AND':
+                index += 1
+                continue
+            node, index = parse_unary(index)
+            parts.append(node)
+        if not parts:
+            raise UnsupportedScryfallQuery("Empty query group")
+        return (parts[0] if len(parts) == 1 else ('and', parts)), index
+
+    def parse_unary(index):
+        token = tokens[index]
+        if token in ('(', '-('):
+            node, index = parse_or(index + 1)
+            if index >= len(tokens) or tokens[index] != ')':
+                raise UnsupportedScryfallQuery("Unbalanced parentheses")
+            return (('not', node) if token == '-(' else node), index + 1
+
+        negate = token.startswith('-')
+        if negate:
+            token = token[1:]
+
+        match = SCRYFALL_TERM_RE.match(token)
+        if match:
+            key, op, value = match.group('key').lower(), match.group('op'), match.group('value')
+        else:
+            key, op, value = 'name', ':', token
+
+        if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+            value = value[1:-1]
+
+        node = ('term', key, op, value.lower())
+        return (('not', node) if negate else node), index + 1
+
+    node, index = parse_or(0)
+    if index != len(tokens):
+        raise UnsupportedScryfallQuery("Unbalanced parentheses")
+    return node
+
+
+class ScryfallBulkIndex:
+    """
+    Columnar in-memory index over a Scryfall Oracle Cards bulk-data dump
+
+    Each card is a row; text fields are lowercased lists, colors are WUBRG
+    bitmasks and prices/mana values live in typed arrays. Rows are sorted by
+    name, matching Scryfall's default order. Results of the most recent
+    max_queries queries are memoized in an LRU.
+    """
+
+    NUMERIC_KEYS = {'usd': 'usd', 'cmc': 'cmc', 'mv': 'cmc', 'manavalue': 'cmc'}
+
+    def __init__(self, cards: List[Dict[str, Any]], mtime: Optional[float] = None, max_queries: int = SCRYFALL_QUERY_CACHE_SIZE):
+        self.mtime = mtime
+        self.max_queries = max_queries
+        cards = sorted(
+            (c for c in cards if c.get('layout') not in SCRYFALL_EXTRA_LAYOUTS and c.get('name')),
+            key=lambda c: c['name']
+        )
+
+        self.names: List[str] = []
+        self.names_lower: List[str] = []
+        self.type_lines: List[str] = []
+        self.oracle_texts: List[str] = []
+        self.sets: List[str] = []
+        self.identity_masks = array('B')
+        self.game_changer = array('B')
+        self.playtest = array('B')
+        self.usd = array('d')
+        self.cmc = array('d')
+        self.legalities: Dict[str, bytearray] = {}
+
+        for row, card in enumerate(cards):
+            faces = card.get('card_faces') or []
+            oracle_text = card.get('oracle_text')
+            if oracle_text is None:
+                oracle_text = '\n'.join(face.get('oracle_text', '') for face in faces)
+
+            self.names.append(card['name'])
+            self.names_lower.append(card['name'].lower())
+            self.type_lines.append((card.get('type_line') or '').lower())
+            self.oracle_texts.append(oracle_text.lower())
+            self.sets.append((card.get('set') or '').lower())
+            self.identity_masks.append(color_identity_mask(card.get('color_identity', [])))
+            self.game_changer.append(1 if card.get('game_changer') else 0)
+            self.playtest.append(1 if 'playtest' in (card.get('promo_types') or []) else 0)
+
+            usd = (card.get('prices') or {}).get('usd')
+            self.usd.append(float(usd) if usd else math.nan)
+            self.cmc.append(float(card.get('cmc') or 0))
+
+            for format_name, status in (card.get('legalities') or {}).items():
+                column = self.legalities.get(format_name)
+                if column is None:
+                    column = self.legalities[format_name] = bytearray(len(cards))
+                column[row] = LEGALITY_CODES.get(status, 0)
+
+        self.query_cache: 'OrderedDict[str, Tuple[int, ...]]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, mtime: Optional[float] = None) -> 'ScryfallBulkIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), mtime)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def compile(self, node: Tuple):
+        """Turn a parsed query into a predicate over row numbers"""
+        kind = node[0]
+        if kind == 'and':
+            predicates = [self.compile(child) for child in node[1]]
+            return lambda row: all(p(row) for p in predicates)
+        if kind == 'or':
+            predicates = [self.compile(child) for child in node[1]]
+            return lambda row: any(p(row) for p in predicates)
+        if kind == 'not':
+            predicate = self.compile(node[1])
+            return lambda row: not predicate(row)
+        return self.compile_term(node[1], node[2], node[3])
+
+    def compile_term(self, key: str, op: str, value: str):
+        if key in ('t', 'type') and op == ':':
+            return lambda row: value in self.type_lines[row]
+
+        if key in ('o', 'oracle') and op == ':':
+            return lambda row: value in self.oracle_texts[row]
+
+        if key in ('name', 'n') and op == ':':
+            return lambda row: value in self.names_lower[row]
+
+        if key in ('set', 's', 'e', 'edition') and op == ':':
+            return lambda row: self.sets[row] == value
+
+        if key == 'commander' and op == ':':
+            letters = value.replace(',', '').upper()
+            if any(c not in COLOR_BITS and c != 'C' for c in letters):
+                raise UnsupportedScryfallQuery(f"Unsupported commander value: {value}")
+            allowed = color_identity_mask(list(letters))
+            return lambda row: self.identity_masks[row] & ~allowed == 0
+
+        if key in ('banned', 'restricted', 'f', 'format', 'legal') and op == ':':
+            column = self.legalities.get(value)
+            if column is None:
+                return lambda row: False
+            if key == 'banned':
+                return lambda row: column[row] == LEGALITY_CODES['banned']
+            if key == 'restricted':
+                return lambda row: column[row] == LEGALITY_CODES['restricted']
+            return lambda row: column[row] in (LEGALITY_CODES['legal'], LEGALITY_CODES['restricted'])
+
+        if key == 'is' and op == ':':
+            if value == 'gamechanger':
+                return lambda row: self.game_changer[row] == 1
+            if value == 'playtest':
+                return lambda row: self.playtest[row] == 1
+
+        if key in self.NUMERIC_KEYS:
+            try:
+                target = float(value)
+            except ValueError:
+                raise UnsupportedScryfallQuery(f"Non-numeric value for {key}: {value}")
+            column = getattr(self, self.NUMERIC_KEYS[key])
+            compare = {
+                ':': lambda x: x == target, '=': lambda x: x == target, '!=': lambda x: x != target,
+                '>': lambda x: x > target, '>=': lambda x: x >= target,
+                '<': lambda x: x < target, '<=': lambda x: x <= target
+            }[op]
+            # Missing prices are NaN, which fails every comparison like on Scryfall
+            return lambda row: compare(column[row])
+
+        raise UnsupportedScryfallQuery(f"Unsupported search term: {key}{op}{value}")
+
+    def search(self, query: str) -> Tuple[int, ...]:
+        """Row numbers matching a Scryfall query string"""
+        with self.lock:
+            cached = self.query_cache.get(query)
+            if cached is not None:
+                self.query_cache.move_to_end(query)
+                return cached
+
+        predicate = self.compile(parse_scryfall_query(query))
+        rows = tuple(row for row in range(len(self.names)) if predicate(row))
+
+        if self.max_queries > 0:
+            with self.lock:
+                self.query_cache[query] = rows
+                self.query_cache.move_to_end(query)
+                while len(self.query_cache) > self.max_queries:
+                    self.query_cache.popitem(last=False)
+        return rows
+
+    def search_cards(self, query: str, with_colors: bool) -> List:
+        """Same output as fetch_scryfall_cards / fetch_scryfall_cards_with_colors"""
+        rows = self.search(query)
+        if not with_colors:
+            return [self.names[row] for row in rows]
+        return [
+            {'name': self.names[row], 'color_identity': list(COLOR_IDENTITY_BY_MASK[self.identity_masks[row]])}
+            for row in rows
+        ]
+
+
+_SCRYFALL_BULK_INDEX = None
+_SCRYFALL_BULK_CHECKED_AT = 0.0
+# When the last load attempt failed with no index loaded (None after a success)
+_SCRYFALL_BULK_FAILED_AT: Optional[float] = None
+_SCRYFALL_BULK_LOCK = threading.Lock()
+
+
+def get_scryfall_bulk_index() -> Optional[ScryfallBulkIndex]:
+    """
+    Load the bulk-data index on first use and reload it when the file changes
+
+    A reload builds a new index, so memoized query results from the old
+    file are dropped with it. Returns None when SCRYFALL_BULK_PATH is unset
+    or no copy could be loaded yet; a failed first load is retried on the
+    next recheck, so a file that appears later is still picked up.
+    """
+    global _SCRYFALL_BULK_INDEX, _SCRYFALL_BULK_CHECKED_AT, _SCRYFALL_BULK_FAILED_AT
+    if not SCRYFALL_BULK_PATH:
+        return None
+
+    now = time.time()
+    with _SCRYFALL_BULK_LOCK:
+        if _SCRYFALL_BULK_INDEX is not None and now - _SCRYFALL_BULK_CHECKED_AT < SCRYFALL_BULK_RECHECK_INTERVAL:
+            return _SCRYFALL_BULK_INDEX
+        if _SCRYFALL_BULK_FAILED_AT is not None and now - _SCRYFALL_BULK_FAILED_AT < SCRYFALL_BULK_RECHECK_INTERVAL:
+            return None
+        _SCRYFALL_BULK_CHECKED_AT = now
+
+        try:
+            mtime = os.path.getmtime(SCRYFALL_BULK_PATH)
+        except OSError:
+            mtime = None
+
+        # Keep the loaded index while the file is unchanged (or briefly missing mid-update)
+        if _SCRYFALL_BULK_INDEX is not None and (mtime is None or _SCRYFALL_BULK_INDEX.mtime == mtime):
+            return _SCRYFALL_BULK_INDEX
+
+        try:
+            reloading = _SCRYFALL_BULK_INDEX is not None
+            _SCRYFALL_BULK_INDEX = ScryfallBulkIndex.load(SCRYFALL_BULK_PATH, mtime)
+            _SCRYFALL_BULK_FAILED_AT = None
+            print(f"[Scryfall] {'Reloaded' if reloading else 'Loaded'} {len(_SCRYFALL_BULK_INDEX)} cards from bulk data")
+        except Exception as e:
+            if _SCRYFALL_BULK_INDEX is None:
+                _SCRYFALL_BULK_FAILED_AT = now
+                print(f"[Scryfall] Could not load bulk data from {SCRYFALL_BULK_PATH}, using API until the next check: {e}")
+            else:
+                print(f"[Scryfall] Could not reload bulk data, keeping the loaded copy: {e}")
+        return _SCRYFALL_BULK_INDEX
+
+
+def search_scryfall_bulk(query_or_url: str, with_colors: bool) -> Optional[List]:
+    """
+    Answer a Scryfall query from local bulk data
+
+    Returns:
+        Cards in the fetch_scryfall_cards* format, or None when no bulk data
+        is configured or the query uses syntax we can't evaluate locally
+    """
+    bulk_index = get_scryfall_bulk_index()
+    if bulk_index is None:
+        return None
+
+    url = convert_to_scryfall_api_url(query_or_url)
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(url).query).get('q', [''])[0]
+
+    try:
+        return bulk_index.search_cards(query, with_colors)
+    except UnsupportedScryfallQuery as e:
+        print(f"[Scryfall] Falling back to API: {e}")
+        return None
+
+
 def fetch_scryfall_cards(query_or_url: str) -> List[str]:
     """
     Fetch card names from Scryfall with given query or URL
@@ -212,13 +1090,16 @@ def fetch_scryfall_cards(query_or_url: str) -> List[str]:
     Returns:
         List of card names
     """
+    local_cards = search_scryfall_bulk(query_or_url, with_colors=False)
+    if local_cards is not None:
+        return local_cards
+    
     cards = []
     url = convert_to_scryfall_api_url(query_or_url)
     
     while url:
         try:
-            with urllib.request.urlopen(url, timeout=5) as response:
-                data = json.loads(response.read().decode('utf-8'))
+            data = fetch_json(url, 'scryfall', timeout=5)
             
             # Extract card names
             for card in data.get('data', []):
@@ -264,7 +1145,38 @@ def get_color_complexity_weight(color_identity: List[str]) -> int:
     return COLOR_COMPLEXITY_MULTIPLIERS.get(color_count, 1)
 
 
-def weighted_random_sample(cards_with_colors: List[Dict[str, Any]], count: int, use_quantity: bool = False) -> List[str]:
+def weighted_sample_without_replacement(items: List[Any], weights: List[float], count: int, rng: Optional[random.Random] = None) -> List[Any]:
+    """
+    Draw up to count distinct items, each with probability proportional to its weight
+    
+    Efraimidis-Spirakis keyed sampling: every item gets the key
+    log(u) / weight for uniform u, and the count largest keys win. Uses O(n)
+    memory and O(n log count) time, and never returns an item twice.
+    Items with a non-positive weight are never selected.
+    
+    Args:
+        items: Candidates to draw from
+        weights: Weight for each item (same length as items)
+        count: Number of items to draw
+        rng: Random source (defaults to the global random module)
+    
+    Returns:
+        Selected items, most heavily favoured draw first
+    """
+    if count <= 0:
+        return []
+    rng = rng or random
+    
+    keyed = (
+        (math.log(1.0 - rng.random()) / weight, index)
+        for index, weight in enumerate(weights)
+        if weight > 0
+    )
+    
+    return [items[index] for _, index in heapq.nlargest(count, keyed)]
+
+
+def weighted_random_sample(cards_with_colors: List[Dict[str, Any]], count: int, use_quantity: bool = False, rng: Optional[random.Random] = None) -> List[str]:
     """
     Select random cards with weighting based on color complexity
     
@@ -272,36 +1184,27 @@ def weighted_random_sample(cards_with_colors: List[Dict[str, Any]], count: int,
         cards_with_colors: List of dicts with 'name', 'color_identity', and optionally 'quantity'
         count: Number of cards to select
         use_quantity: If True, multiply weight by card quantity (for Moxfield)
+        rng: Random source (defaults to the global random module)
     
     Returns:
-        List of selected card names
+        List of selected card names (never contains duplicates)
     """
     if not cards_with_colors:
         return []
     
-    # Build weighted list
-    weighted_pool = []
+    # Merge repeated names so a card can only be drawn once
+    weight_by_name: Dict[str, int] = {}
     for card in cards_with_colors:
         name = card['name']
         color_identity = card.get('color_identity', [])
         quantity = card.get('quantity', 1) if use_quantity else 1
         
-        # Get color complexity weight
-        color_weight = get_color_complexity_weight(color_identity)
-        
         # Total weight = color_weight * quantity
-        total_weight = color_weight * quantity
-        
-        # Add card to pool 'total_weight' times
-        for _ in range(total_weight):
-            weighted_pool.append(name)
+        total_weight = get_color_complexity_weight(color_identity) * quantity
+        weight_by_name[name] = weight_by_name.get(name, 0) + total_weight
     
-    # Sample from weighted pool
-    if not weighted_pool:
-        return []
-    
-    selected_count = min(count, len(weighted_pool))
-    return random.sample(weighted_pool, selected_count)
+    names = list(weight_by_name)
+    return weighted_sample_without_replacement(names, [weight_by_name[name] for name in names], count, rng)
 
 
 def fetch_scryfall_cards_with_colors(query_or_url: str) -> List[Dict[str, Any]]:
@@ -315,13 +1218,16 @@ def fetch_scryfall_cards_with_colors(query_or_url: str) -> List[Dict[str, Any]]:
         List of dicts with 'name' and 'color_identity' keys
         Example: [{'name': 'Sol Ring', 'color_identity': []}, {'name': 'Atraxa', 'color_identity': ['W','U','B','G']}]
     """
+    local_cards = search_scryfall_bulk(query_or_url, with_colors=True)
+    if local_cards is not None:
+        return local_cards
+    
     cards = []
     url = convert_to_scryfall_api_url(query_or_url)
     
     while url:
         try:
-            with urllib.request.urlopen(url, timeout=5) as response:
-                data = json.loads(response.read().decode('utf-8'))
+            data = fetch_json(url, 'scryfall', timeout=5)
             
             # Extract card names and color identity
             for card in data.get('data', []):
@@ -389,194 +1295,160 @@ def get_cached_basic_lands() -> set:
 # MOXFIELD DECK IMPORT
 # ==========================================
 
-def fetch_moxfield_deck_name(deck_url_or_id: str) -> Optional[str]:
+
+class MoxfieldDeck:
     """
-    Fetch the deck name from a Moxfield decklist
-    
-    Args:
-        deck_url_or_id: Either full Moxfield URL or just deck ID
+    A Moxfield deck parsed once into its name and a compact mainboard
     
-    Returns:
-        Deck name or None if unable to fetch
+    Mainboard cards are kept as parallel arrays of name, color identity mask
+    and quantity, in deck order. Every slot drawing from the deck, each
+    color filter and the pack title read from this one download.
     """
-    # Extract deck ID from URL if needed
-    if 'moxfield.com' in deck_url_or_id:
-        match = re.search(r'moxfield\.com/decks/([^/?]+)', deck_url_or_id)
-        if match:
-            deck_id = match.group(1)
-        else:
-            return None
-    else:
-        deck_id = deck_url_or_id
     
-    # Moxfield API endpoint
-    url = f"https://api2.moxfield.com/v3/decks/all/{deck_id}/"
+    __slots__ = ('deck_id', 'name', 'names', 'masks', 'quantities')
     
-    try:
-        with urllib.request.urlopen(url, timeout=5) as response:
-            data = json.loads(response.read().decode('utf-8'))
+    def __init__(self, deck_id: str, name: Optional[str]):
+        self.deck_id = deck_id
+        self.name = name
+        self.names: List[str] = []
+        self.masks = array('B')
+        self.quantities = array('H')
+    
+    @classmethod
+    def from_json(cls, deck_id: str, data: Dict[str, Any]) -> 'MoxfieldDeck':
+        """Build from a v3 deck response (mainboard only: no commanders, companions or sideboard)"""
+        deck = cls(deck_id, data.get('name'))
+        mainboard = data.get('boards', {}).get('mainboard', {}).get('cards', {})
         
-        return data.get('name')
+        for card_data in mainboard.values():
+            card = card_data.get('card')
+            if card and card.get('name'):
+                deck.names.append(card['name'])
+                deck.masks.append(color_identity_mask(card.get('color_identity', [])))
+                deck.quantities.append(min(card_data.get('quantity', 1), 0xFFFF))
         
-    except Exception as e:
-        print(f"[Moxfield] Error fetching deck name: {e}")
-        return None
+        return deck
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def _matching(self, commander_colors: Optional[List[str]]) -> Iterator[int]:
+        """Indexes of cards whose color identity fits within commander_colors (all when None)"""
+        if commander_colors is None:
+            return iter(range(len(self.names)))
+        outside = ~color_identity_mask(commander_colors)
+        return (i for i, mask in enumerate(self.masks) if not mask & outside)
+    
+    def cards(self, commander_colors: Optional[List[str]] = None) -> List[str]:
+        """Card names, each repeated once per copy in the deck"""
+        cards = []
+        for i in self._matching(commander_colors):
+            cards.extend([self.names[i]] * self.quantities[i])
+        return cards
+    
+    def cards_with_colors(self, commander_colors: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """One {'name', 'color_identity', 'quantity'} dict per distinct card, freshly built on each call"""
+        return [
+            {'name': self.names[i], 'color_identity': list(COLOR_IDENTITY_BY_MASK[self.masks[i]]), 'quantity': self.quantities[i]}
+            for i in self._matching(commander_colors)
+        ]
 
 
-def fetch_moxfield_cards(deck_url_or_id: str, commander_colors: Optional[List[str]] = None) -> List[str]:
+def extract_moxfield_deck_id(deck_url_or_id: str) -> Optional[str]:
+    """Deck ID from a Moxfield URL (or the argument itself when it is already an ID)"""
+    if 'moxfield.com' in deck_url_or_id:
+        match = re.search(r'moxfield\.com/decks/([^/?]+)', deck_url_or_id)
+        return match.group(1) if match else None
+    return deck_url_or_id
+
+
+def fetch_moxfield_deck(deck_url_or_id: str) -> Optional[MoxfieldDeck]:
     """
-    Fetch card names from a Moxfield decklist
+    Fetch and parse a Moxfield decklist
     
     Args:
         deck_url_or_id: Either full Moxfield URL or just deck ID
             - URL: https://moxfield.com/decks/abc123
             - ID: abc123
-        commander_colors: Optional list of color identity letters to filter by (e.g., ['W', 'U', 'B'])
-            If provided, only cards whose color identity is a subset will be included
     
     Returns:
-        List of card names from mainboard (excludes commanders, companions, sideboard)
+        MoxfieldDeck, or None if unable to fetch
     """
-    # Extract deck ID from URL if needed
-    if 'moxfield.com' in deck_url_or_id:
-        match = re.search(r'moxfield\.com/decks/([^/?]+)', deck_url_or_id)
-        if match:
-            deck_id = match.group(1)
-        else:
-            print(f"Could not extract Moxfield deck ID from: {deck_url_or_id}")
-            return []
-    else:
-        deck_id = deck_url_or_id
+    deck_id = extract_moxfield_deck_id(deck_url_or_id)
+    if not deck_id:
+        print(f"Could not extract Moxfield deck ID from: {deck_url_or_id}")
+        return None
     
     # Moxfield API endpoint
     url = f"https://api2.moxfield.com/v3/decks/all/{deck_id}/"
     
     print(f"[Moxfield] Fetching deck from: {url}")
-    if commander_colors:
-        print(f"[Moxfield] Filtering by commander colors: {commander_colors}")
     
     try:
-        with urllib.request.urlopen(url, timeout=5) as response:
-            data = json.loads(response.read().decode('utf-8'))
-        
-        print(f"[Moxfield] Successfully fetched deck data")
-        
-        cards = []
-        filtered_count = 0
-        
-        # Extract mainboard cards - they're in boards.mainboard.cards
-        boards = data.get('boards', {})
-        mainboard_data = boards.get('mainboard', {})
-        mainboard = mainboard_data.get('cards', {})
-        
-        print(f"[Moxfield] Mainboard has {len(mainboard)} unique cards")
-        
-        for card_data in mainboard.values():
-            if card_data.get('card'):
-                card = card_data['card']
-                card_name = card.get('name')
-                card_color_identity = card.get('color_identity', [])
-                quantity = card_data.get('quantity', 1)
-                
-                if card_name:
-                    # Apply color identity filter if specified
-                    if commander_colors is not None:
-                        # Check if card's color identity is a subset of commander's
-                        if all(color in commander_colors for color in card_color_identity):
-                            # Add the card name 'quantity' times (for duplicates)
-                            for _ in range(quantity):
-                                cards.append(card_name)
-                        else:
-                            filtered_count += quantity
-                    else:
-                        # No filter - add all cards
-                        for _ in range(quantity):
-                            cards.append(card_name)
-        
-        if commander_colors:
-            print(f"[Moxfield] Color filter excluded {filtered_count} cards")
-        print(f"[Moxfield] Fetched {len(cards)} total cards from deck {deck_id}")
-        return cards
+        deck = MoxfieldDeck.from_json(deck_id, fetch_json(url, 'moxfield', timeout=5))
+        print(f"[Moxfield] Mainboard has {len(deck)} unique cards")
+        return deck
         
     except urllib.error.HTTPError as e:
         print(f"[Moxfield] HTTP Error {e.code} fetching deck {deck_id}: {e.reason}")
-        return []
+        return None
     except urllib.error.URLError as e:
         print(f"[Moxfield] URL Error fetching deck {deck_id}: {e.reason}")
-        return []
+        return None
     except Exception as e:
         print(f"[Moxfield] Error fetching Moxfield deck {deck_id}: {type(e).__name__}: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        return None
 
 
-def fetch_moxfield_cards_with_colors(deck_url_or_id: str, commander_colors: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+def fetch_moxfield_deck_name(deck_url_or_id: str) -> Optional[str]:
     """
-    Fetch card data from Moxfield including color identity and quantities
+    Fetch the deck name from a Moxfield decklist
     
     Args:
         deck_url_or_id: Either full Moxfield URL or just deck ID
-        commander_colors: Optional list of color identity letters to filter by
     
     Returns:
-        List of dicts with 'name', 'color_identity', and 'quantity' keys
-        Each card appears once with its quantity (not duplicated in list)
-        Example: [{'name': 'Sol Ring', 'color_identity': [], 'quantity': 1}, ...]
+        Deck name or None if unable to fetch
     """
-    # Extract deck ID from URL if needed
-    if 'moxfield.com' in deck_url_or_id:
-        match = re.search(r'moxfield\.com/decks/([^/?]+)', deck_url_or_id)
-        if match:
-            deck_id = match.group(1)
-        else:
-            print(f"Could not extract Moxfield deck ID from: {deck_url_or_id}")
-            return []
-    else:
-        deck_id = deck_url_or_id
+    deck = fetch_moxfield_deck(deck_url_or_id)
+    return deck.name if deck else None
+
+
+def fetch_moxfield_cards(deck_url_or_id: str, commander_colors: Optional[List[str]] = None) -> List[str]:
+    """
+    Fetch card names from a Moxfield decklist
     
-    # Moxfield API endpoint
-    url = f"https://api2.moxfield.com/v3/decks/all/{deck_id}/"
+    Args:
+        deck_url_or_id: Either full Moxfield URL or just deck ID
+            - URL: https://moxfield.com/decks/abc123
+            - ID: abc123
+        commander_colors: Optional list of color identity letters to filter by (e.g., ['W', 'U', 'B'])
+            If provided, only cards whose color identity is a subset will be included
+    
+    Returns:
+        List of card names from mainboard (excludes commanders, companions, sideboard)
+    """
+    deck = fetch_moxfield_deck(deck_url_or_id)
+    return deck.cards(commander_colors) if deck else []
+
+
+def fetch_moxfield_cards_with_colors(deck_url_or_id: str, commander_colors: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch card data from Moxfield including color identity and quantities
+    
+    Args:
+        deck_url_or_id: Either full Moxfield URL or just deck ID
+        commander_colors: Optional list of color identity letters to filter by
     
-    try:
-        with urllib.request.urlopen(url, timeout=5) as response:
-            data = json.loads(response.read().decode('utf-8'))
-        
-        cards = []
-        
-        # Extract mainboard cards
-        boards = data.get('boards', {})
-        mainboard_data = boards.get('mainboard', {})
-        mainboard = mainboard_data.get('cards', {})
-        
-        for card_data in mainboard.values():
-            if card_data.get('card'):
-                card = card_data['card']
-                card_name = card.get('name')
-                card_color_identity = card.get('color_identity', [])
-                quantity = card_data.get('quantity', 1)
-                
-                if card_name:
-                    # Apply color identity filter if specified
-                    if commander_colors is not None:
-                        if all(color in commander_colors for color in card_color_identity):
-                            cards.append({
-                                'name': card_name,
-                                'color_identity': card_color_identity,
-                                'quantity': quantity
-                            })
-                    else:
-                        cards.append({
-                            'name': card_name,
-                            'color_identity': card_color_identity,
-                            'quantity': quantity
-                        })
-        
-        return cards
-        
-    except Exception as e:
-        print(f"[Moxfield] Error fetching deck {deck_id}: {e}")
-        return []
+    Returns:
+        List of dicts with 'name', 'color_identity', and 'quantity' keys
+        Each card appears once with its quantity (not duplicated in list)
+        Example: [{'name': 'Sol Ring', 'color_identity': [], 'quantity': 1}, ...]
+    """
+    deck = fetch_moxfield_deck(deck_url_or_id)
+    return deck.cards_with_colors(commander_colors) if deck else []
 
 
 # ==========================================
@@ -621,19 +1493,154 @@ def fetch_edhrec_data(commander_slug: str, bracket: int, budget: str) -> Optiona
     url = f"https://json.edhrec.com/pages/commanders/{commander_slug}{bracket_path}{budget_suffix}.json"
     
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            
-            if 'container' in data and 'json_dict' in data['container']:
-                return data['container']['json_dict']
-            
-            return None
+        data = fetch_json(url, 'edhrec', timeout=10)
+        
+        if 'container' in data and 'json_dict' in data['container']:
+            return data['container']['json_dict']
+        
+        return None
             
     except Exception as e:
         print(f"Error fetching {url}: {e}")
         return None
 
 
+class RequestCache:
+    """
+    Memoizes upstream fetches for the lifetime of a single generate_packs call
+
+    Every slot of every pack asks for the same handful of pages, so parsed
+    results are shared instead of being downloaded once per slot. Failed
+    fetches are remembered too. Safe to fill from the prefetch thread pool:
+    concurrent callers asking for the same key wait for the first load.
+
+    A batch of generate_packs calls can share upstream results by giving
+    each call its own RequestCache on top of one shared parent. Fetched
+    data (read-only) then lives in the parent, while per-call state such as
+    CardPools, which are drained as cards are drawn, stays in the child.
+    Children also inherit the parent's prefetch executor, so the whole batch
+    shares one bounded pool of upstream fetch threads.
+    """
+
+    def __init__(
+        self,
+        shared: Optional['RequestCache'] = None,
+        timings: Optional[Timings] = None,
+        prefetch_executor: Optional[ThreadPoolExecutor] = None
+    ):
+        self.results: Dict[Tuple, Any] = {}
+        self.loading: Dict[Tuple, threading.Event] = {}
+        self.lock = threading.Lock()
+        self.shared = shared
+        self.timings = timings or Timings()
+        self.prefetch_executor = prefetch_executor or (shared.prefetch_executor if shared else None)
+
+    def get(self, key: Tuple, loader):
+        """Return the memoized result for key, calling loader() on first use"""
+        with self.lock:
+            if key in self.results:
+                return self.results[key]
+            event = self.loading.get(key)
+            is_loader = event is None
+            if is_loader:
+                event = self.loading[key] = threading.Event()
+
+        if not is_loader:
+            event.wait()
+            with self.lock:
+                if key in self.results:
+                    return self.results[key]
+            # The first load raised; try again ourselves
+            return loader()
+
+        try:
+            result = loader()
+            with self.lock:
+                self.results[key] = result
+            return result
+        finally:
+            with self.lock:
+                del self.loading[key]
+            event.set()
+
+    def fetch(self, key: Tuple, loader):
+        """Memoize an upstream fetch, in the shared parent cache if there is one"""
+        def timed_loader():
+            with self.timings.span(f"fetch.{key[0]}"):
+                return loader()
+        
+        return (self.shared or self).get(key, timed_loader)
+
+    def get_edhrec_data(self, commander_slug: str, bracket: Any, budget: str) -> Optional[Dict]:
+        """Memoized fetch_edhrec_data"""
+        # Key on the resolved URL parts so e.g. bracket 0 and "any" share a page
+        key = ('edhrec', commander_slug, BRACKET_PATHS.get(bracket, ""), BUDGET_SUFFIXES.get(budget, ""))
+        return self.fetch(key, lambda: fetch_edhrec_data(commander_slug, bracket, budget))
+
+    def get_average_deck(self, commander_slug: str, bracket: Any) -> Optional[Dict[str, float]]:
+        """Memoized fetch_average_deck"""
+        key = ('average_deck', commander_slug, BRACKET_PATHS.get(bracket, ""))
+        return self.fetch(key, lambda: fetch_average_deck(commander_slug, bracket))
+
+    def get_scryfall_cards(self, query_or_url: str, with_colors: bool) -> List:
+        """Memoized fetch_scryfall_cards / fetch_scryfall_cards_with_colors"""
+        key = ('scryfall', convert_to_scryfall_api_url(query_or_url), with_colors)
+        if with_colors:
+            return self.fetch(key, lambda: fetch_scryfall_cards_with_colors(query_or_url))
+        return self.fetch(key, lambda: fetch_scryfall_cards(query_or_url))
+
+    def get_moxfield_deck(self, deck_url: str) -> Optional['MoxfieldDeck']:
+        """Memoized fetch_moxfield_deck, one download per deck ID"""
+        key = ('moxfield_deck', extract_moxfield_deck_id(deck_url) or deck_url)
+        return self.fetch(key, lambda: fetch_moxfield_deck(deck_url))
+
+    def get_moxfield_cards(self, deck_url: str, filter_colors: Optional[List[str]], with_colors: bool) -> List:
+        """Mainboard of a Moxfield deck as MoxfieldDeck.cards / cards_with_colors, filtered once per color set"""
+        deck = self.get_moxfield_deck(deck_url)
+        if deck is None:
+            return []
+        color_key = tuple(filter_colors) if filter_colors is not None else None
+        key = ('moxfield', deck.deck_id, color_key, with_colors)
+        if with_colors:
+            return self.fetch(key, lambda: deck.cards_with_colors(filter_colors))
+        return self.fetch(key, lambda: deck.cards(filter_colors))
+
+    def get_moxfield_deck_name(self, deck_url: str) -> Optional[str]:
+        """Name of a Moxfield deck, from the same download as its cards"""
+        deck = self.get_moxfield_deck(deck_url)
+        return deck.name if deck else None
+
+    def get_basic_lands(self) -> set:
+        """get_cached_basic_lands, loaded once even when called from many threads"""
+        return self.fetch(('basic_lands',), get_cached_basic_lands)
+
+    def get_game_changers(self) -> set:
+        """get_cached_game_changers, loaded once even when called from many threads"""
+        return self.fetch(('game_changers',), get_cached_game_changers)
+
+    def get_config(self, config_url: str) -> Dict[str, Any]:
+        """Memoized load_config (errors are not cached)"""
+        return self.fetch(('config', config_url), lambda: load_config(config_url))
+
+    def get_card_pool(self, commander_slug: str, bracket: Any, budget: str, collect_all_game_changers: bool) -> Optional['CardPool']:
+        """CardPool for an EDHRec page, built once and shared by every slot drawing from it"""
+        edhrec_data = self.get_edhrec_data(commander_slug, bracket, budget)
+        if not edhrec_data:
+            return None
+
+        key = ('card_pool', commander_slug, BRACKET_PATHS.get(bracket, ""), BUDGET_SUFFIXES.get(budget, ""), collect_all_game_changers)
+
+        def build_pool():
+            with self.timings.span('card_pool'):
+                return CardPool(process_cardlists(
+                    edhrec_data.get('cardlists', []),
+                    collect_all_game_changers=collect_all_game_changers,
+                    request_cache=self
+                ))
+
+        return self.get(key, build_pool)
+
+
 def get_commander_name_from_edhrec(edhrec_data: Optional[Dict]) -> Optional[str]:
     """
     Extract the pretty commander name from EDHRec data
@@ -651,60 +1658,164 @@ def get_commander_name_from_edhrec(edhrec_data: Optional[Dict]) -> Optional[str]
     return card_data.get('name')
 
 
+# Average-deck fields, and the card type each one counts
+AVERAGE_DECK_TYPES = {
+    'creature': "Creature",
+    'instant': "Instant",
+    'sorcery': "Sorcery",
+    'artifact': "Artifact",
+    'enchantment': "Enchantment",
+    'planeswalker': "Planeswalker",
+    'battle': "Battle"
+}
+
+# How long (seconds) parsed type weights are kept, and how long a missing
+# average deck (404) is remembered before asking EDHRec again
+TYPE_WEIGHTS_TTL = int(os.environ.get('TYPE_WEIGHTS_TTL', RESPONSE_CACHE_TTLS['average_deck']))
+TYPE_WEIGHTS_MISSING_TTL = int(os.environ.get('TYPE_WEIGHTS_MISSING_TTL', 60 * 60))
+TYPE_WEIGHTS_CACHE_SIZE = int(os.environ.get('TYPE_WEIGHTS_CACHE_SIZE', 4096))
+
+
+class TypeWeights:
+    """
+    Normalized card type distribution from an average deck
+    
+    Keeps the types with a positive share and their cumulative probabilities,
+    so drawing a type is one random number and a bisect.
+    """
+    
+    __slots__ = ('types', 'cumulative')
+    
+    def __init__(self, counts: Dict[str, float]):
+        positive = [(card_type, weight) for card_type, weight in counts.items() if weight > 0]
+        total = sum(weight for _, weight in positive)
+        
+        self.types = tuple(card_type for card_type, _ in positive)
+        self.cumulative = array('d')
+        running = 0.0
+        for _, weight in positive:
+            running += weight / total
+            self.cumulative.append(running)
+    
+    def __bool__(self) -> bool:
+        return bool(self.types)
+    
+    def pick(self, rng: Optional[random.Random] = None) -> str:
+        """Draw a card type (Creature when the distribution is empty)"""
+        if not self.types:
+            return "Creature"
+        i = bisect.bisect_left(self.cumulative, (rng or random).random())
+        return self.types[min(i, len(self.types) - 1)]
+    
+    def as_dict(self) -> Dict[str, float]:
+        """Share of each type, summing to 1"""
+        previous = 0.0
+        shares = {}
+        for card_type, threshold in zip(self.types, self.cumulative):
+            shares[card_type] = threshold - previous
+            previous = threshold
+        return shares
+
+
+class TypeWeightsCache:
+    """
+    Process-wide LRU of parsed average-deck type weights per (commander, bracket)
+    
+    Each entry is a few floats (the dict fetch_average_deck returns), so
+    repeat requests for a commander skip re-reading and parsing the whole
+    average-deck page. Commanders without an average deck are cached as None
+    for a shorter time.
+    """
+    
+    def __init__(self, max_entries: int = TYPE_WEIGHTS_CACHE_SIZE,
+                 ttl: int = TYPE_WEIGHTS_TTL, missing_ttl: int = TYPE_WEIGHTS_MISSING_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self.entries: 'OrderedDict[Tuple[str, str], Tuple[Optional[Dict[str, float]], float]]' = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key: Tuple[str, str]) -> Tuple[bool, Optional[Dict[str, float]]]:
+        """Return (found, weights); weights is None for a cached miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[1] <= time.time():
+                del self.entries[key]
+                return False, None
+            self.entries.move_to_end(key)
+            return True, entry[0]
+    
+    def set(self, key: Tuple[str, str], weights: Optional[Dict[str, float]]):
+        ttl = self.ttl if weights is not None else self.missing_ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (weights, time.time() + ttl)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+TYPE_WEIGHTS_CACHE = TypeWeightsCache()
+
+
 def fetch_average_deck(commander_slug: str, bracket: int) -> Optional[Dict[str, float]]:
-    """Fetch average deck type distribution for weighted selection"""
+    """Fetch average deck type distribution for weighted selection (cached in TYPE_WEIGHTS_CACHE)"""
     bracket_path = BRACKET_PATHS.get(bracket, "")
+    key = (commander_slug, bracket_path)
+    
+    found, weights = TYPE_WEIGHTS_CACHE.get(key)
+    if found:
+        return weights
     
     url = f"https://edhrec.com/_next/data/hPTdkgKVPwypO51RvBDXB/average-decks/{commander_slug}{bracket_path}.json?commander={commander_slug}"
     
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            
-            if 'pageProps' in data and 'data' in data['pageProps']:
-                deck_data = data['pageProps']['data']
-                
-                creature = deck_data.get('creature', 0)
-                instant = deck_data.get('instant', 0)
-                sorcery = deck_data.get('sorcery', 0)
-                artifact = deck_data.get('artifact', 0)
-                enchantment = deck_data.get('enchantment', 0)
-                planeswalker = deck_data.get('planeswalker', 0)
-                battle = deck_data.get('battle', 0)
-                
-                total = creature + instant + sorcery + artifact + enchantment + planeswalker + battle
-                
-                if total > 0:
-                    return {
-                        "Creature": creature / total,
-                        "Instant": instant / total,
-                        "Sorcery": sorcery / total,
-                        "Artifact": artifact / total,
-                        "Enchantment": enchantment / total,
-                        "Planeswalker": planeswalker / total,
-                        "Battle": battle / total
-                    }
+        data = fetch_json(url, 'average_deck', timeout=10)
         
-        return None
+        weights = None
+        if 'pageProps' in data and 'data' in data['pageProps']:
+            deck_data = data['pageProps']['data']
+            counts = {card_type: deck_data.get(field, 0) for field, card_type in AVERAGE_DECK_TYPES.items()}
+            total = sum(counts.values())
+            if total > 0:
+                weights = {card_type: count / total for card_type, count in counts.items()}
         
+        TYPE_WEIGHTS_CACHE.set(key, weights)
+        return weights
+        
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            TYPE_WEIGHTS_CACHE.set(key, None)
+        print(f"Error fetching average deck: {e}")
+        return None
     except Exception as e:
         print(f"Error fetching average deck: {e}")
         return None
 
 
-def process_cardlists(cardlists: List[Dict], include_game_changers: bool = True, collect_all_game_changers: bool = False) -> List[Dict[str, Any]]:
+def process_cardlists(
+    cardlists: List[Dict],
+    include_game_changers: bool = True,
+    collect_all_game_changers: bool = False,
+    request_cache: Optional[RequestCache] = None
+) -> List[Dict[str, Any]]:
     """Process EDHRec cardlists into a flat list of cards with metadata
     
     Args:
         cardlists: List of cardlist dictionaries from EDHRec
         include_game_changers: Whether to include the dedicated game changers section
         collect_all_game_changers: If True, mark cards matching Scryfall's game changer list from all sections
+        request_cache: Shared fetch memo for the current request (optional)
     """
     cards = []
+    request_cache = request_cache or RequestCache()
     
-    # Get basic lands and game changers from Scryfall
-    basic_lands = get_cached_basic_lands()
-    game_changers = get_cached_game_changers() if collect_all_game_changers else set()
+    # Get basic lands and game changers from Scryfall (joining any prefetch in flight)
+    basic_lands = request_cache.get_basic_lands()
+    game_changers = request_cache.get_game_changers() if collect_all_game_changers else set()
     
     for cardlist in cardlists:
         tag = cardlist.get('tag', '')
@@ -749,72 +1860,98 @@ def process_cardlists(cardlists: List[Dict], include_game_changers: bool = True,
     return cards
 
 
-def select_weighted_type(type_weights: Dict[str, float]) -> str:
-    """Select a card type based on weighted distribution"""
-    if not type_weights:
-        return "Creature"
-    
-    types = []
-    weights = []
-    cumulative = 0
-    
-    for card_type, weight in type_weights.items():
-        if weight > 0:
-            types.append(card_type)
-            cumulative += weight
-            weights.append(cumulative)
+class CardPool:
+    """
+    Processed EDHRec cards indexed for constant-time random draws
+    
+    Built once per EDHRec page from process_cardlists output, with name
+    buckets for every cardType and sourceList. Draws pick a random slot and
+    swap-remove it, so drawn cards leave the bucket in O(1). Cards that were
+    used elsewhere (e.g. drawn from another bucket) are skipped and dropped
+    lazily when they come up. Within a request the used set only grows, so
+    a dropped card never needs to come back.
+    """
     
-    if not types:
-        return "Creature"
+    def __init__(self, cards: List[Dict[str, Any]]):
+        self.all_cards: List[str] = []
+        self.by_type: Dict[str, List[str]] = {}
+        self.by_source: Dict[str, List[str]] = {}
+        
+        for card in cards:
+            name = card['name']
+            self.all_cards.append(name)
+            self.by_type.setdefault(card['cardType'], []).append(name)
+            self.by_source.setdefault(card['sourceList'], []).append(name)
+    
+    def __len__(self) -> int:
+        return len(self.all_cards)
+    
+    @staticmethod
+    def draw(bucket: List[str], count: int, used_cards: set, rng: Optional[random.Random] = None) -> List[str]:
+        """Draw up to count distinct unused names from a bucket, removing them"""
+        selected = []
+        seen = set()
+        rng = rng or random
+        
+        while bucket and len(selected) < count:
+            i = rng.randrange(len(bucket))
+            name = bucket[i]
+            bucket[i] = bucket[-1]
+            bucket.pop()
+            
+            if name in used_cards or name in seen:
+                continue
+            
+            seen.add(name)
+            selected.append(name)
+        
+        return selected
     
-    rand = random.random()
+    def draw_any(self, count: int, used_cards: set, rng: Optional[random.Random] = None) -> List[str]:
+        return self.draw(self.all_cards, count, used_cards, rng)
     
-    for i, threshold in enumerate(weights):
-        if rand <= threshold:
-            return types[i]
+    def draw_type(self, card_type: str, count: int, used_cards: set, rng: Optional[random.Random] = None) -> List[str]:
+        return self.draw(self.by_type.get(card_type, []), count, used_cards, rng)
     
-    return types[-1]
+    def draw_source(self, source_list: str, count: int, used_cards: set, rng: Optional[random.Random] = None) -> List[str]:
+        return self.draw(self.by_source.get(source_list, []), count, used_cards, rng)
+
+
+def select_weighted_type(type_weights: Any, rng: Optional[random.Random] = None) -> str:
+    """Select a card type based on weighted distribution (TypeWeights or a type -> weight dict)"""
+    if not type_weights:
+        return "Creature"
+    if not isinstance(type_weights, TypeWeights):
+        type_weights = TypeWeights(type_weights)
+    return type_weights.pick(rng)
 
 
-def select_cards_by_type(cards: List[Dict], card_type: str, count: int, used_cards: set) -> List[str]:
+def select_cards_by_type(pool: CardPool, card_type: str, count: int, used_cards: set, rng: Optional[random.Random] = None) -> List[str]:
     """Select random cards of a specific type"""
-    available = [c['name'] for c in cards if c['cardType'] == card_type and c['name'] not in used_cards]
-    
-    if not available:
-        return []
-    
-    selected_count = min(count, len(available))
-    selected = random.sample(available, selected_count)
-    
-    return selected
+    return pool.draw_type(card_type, count, used_cards, rng)
 
 
-def select_random_cards(cards: List[Dict], count: int, used_cards: set) -> List[str]:
+def select_random_cards(pool: CardPool, count: int, used_cards: set, rng: Optional[random.Random] = None) -> List[str]:
     """Select random cards from all types with equal probability"""
-    available = [c['name'] for c in cards if c['name'] not in used_cards]
-    
-    if not available:
-        return []
-    
-    selected_count = min(count, len(available))
-    selected = random.sample(available, selected_count)
-    
-    return selected
+    return pool.draw_any(count, used_cards, rng)
 
 
-def select_weighted_cards(cards: List[Dict], count: int, type_weights: Dict[str, float], used_cards: set) -> List[str]:
+def select_weighted_cards(pool: CardPool, count: int, type_weights: Any, used_cards: set, rng: Optional[random.Random] = None) -> List[str]:
     """Select cards using weighted type distribution from average deck"""
     selected = []
+    # Average-deck dicts are turned into cumulative weights once per slot, not per draw
+    if not isinstance(type_weights, TypeWeights):
+        type_weights = TypeWeights(type_weights)
     
     for _ in range(count):
-        card_type = select_weighted_type(type_weights)
-        card_list = select_cards_by_type(cards, card_type, 1, used_cards)
+        card_type = select_weighted_type(type_weights, rng)
+        card_list = select_cards_by_type(pool, card_type, 1, used_cards, rng)
         
         if card_list:
             selected.extend(card_list)
             used_cards.add(card_list[0])
         else:
-            fallback = select_random_cards(cards, 1, used_cards)
+            fallback = select_random_cards(pool, 1, used_cards, rng)
             if fallback:
                 selected.extend(fallback)
                 used_cards.add(fallback[0])
@@ -822,24 +1959,18 @@ def select_weighted_cards(cards: List[Dict], count: int, type_weights: Dict[str,
     return selected
 
 
-def select_cards_from_category(cards: List[Dict], category: str, count: int, used_cards: set) -> List[str]:
+def select_cards_from_category(pool: CardPool, category: str, count: int, used_cards: set, rng: Optional[random.Random] = None) -> List[str]:
     """Select cards from a specific EDHRec category/tag"""
-    available = [c['name'] for c in cards if c['sourceList'] == category and c['name'] not in used_cards]
-    
-    if not available:
-        return []
-    
-    selected_count = min(count, len(available))
-    selected = random.sample(available, selected_count)
-    
-    return selected
+    return pool.draw_source(category, count, used_cards, rng)
 
 
 def process_scryfall_slots(
     slots: List[Dict],
     commander_colors: Optional[List[str]],
     pack_level_color_filter: bool,
-    used_cards: set
+    used_cards: set,
+    request_cache: Optional[RequestCache] = None,
+    rng: Optional[random.Random] = None
 ) -> List[str]:
     """
     Process Scryfall slots to generate cards
@@ -849,11 +1980,14 @@ def process_scryfall_slots(
         commander_colors: Commander color identity from EDHRec
         pack_level_color_filter: Pack-level useCommanderColorIdentity setting
         used_cards: Set of cards already used
+        request_cache: Shared fetch memo for the current request (optional)
+        rng: Random source for seeded generation (optional)
     
     Returns:
         List of selected card names
     """
     selected_cards = []
+    request_cache = request_cache or RequestCache()
     
     for slot in slots:
         query = slot.get('query')
@@ -873,23 +2007,23 @@ def process_scryfall_slots(
         
         if use_weighting:
             # Fetch cards with color identity for weighted selection
-            available_cards_data = fetch_scryfall_cards_with_colors(full_query)
+            available_cards_data = request_cache.get_scryfall_cards(full_query, with_colors=True)
             
             # Filter out already used cards
             available_cards_data = [c for c in available_cards_data if c['name'] not in used_cards]
             
             # Use weighted selection based on color complexity
-            selected = weighted_random_sample(available_cards_data, count, use_quantity=False)
+            selected = weighted_random_sample(available_cards_data, count, use_quantity=False, rng=rng)
         else:
             # Simple unweighted selection (old behavior)
-            available_cards = fetch_scryfall_cards(full_query)
+            available_cards = request_cache.get_scryfall_cards(full_query, with_colors=False)
             
             # Filter out already used cards
             available_cards = [c for c in available_cards if c not in used_cards]
             
             # Select random cards
             selected_count = min(count, len(available_cards))
-            selected = random.sample(available_cards, selected_count) if selected_count > 0 else []
+            selected = (rng or random).sample(available_cards, selected_count) if selected_count > 0 else []
         
         selected_cards.extend(selected)
         used_cards.update(selected)
@@ -901,7 +2035,9 @@ def process_moxfield_slots(
     slots: List[Dict],
     used_cards: set,
     commander_colors: Optional[List[str]] = None,
-    pack_level_color_filter: bool = False
+    pack_level_color_filter: bool = False,
+    request_cache: Optional[RequestCache] = None,
+    rng: Optional[random.Random] = None
 ) -> List[str]:
     """
     Process Moxfield slots to generate cards from deck pools
@@ -911,11 +2047,14 @@ def process_moxfield_slots(
         used_cards: Set of cards already used
         commander_colors: Optional commander color identity for filtering
         pack_level_color_filter: Whether to apply color filtering (can be overridden per slot)
+        request_cache: Shared fetch memo for the current request (optional)
+        rng: Random source for seeded generation (optional)
     
     Returns:
         List of selected card names
     """
     selected_cards = []
+    request_cache = request_cache or RequestCache()
     
     for slot in slots:
         deck_url = slot.get('deckUrl')
@@ -936,23 +2075,26 @@ def process_moxfield_slots(
         
         if use_weighting:
             # Fetch cards with color identity and quantities for weighted selection
-            available_cards_data = fetch_moxfield_cards_with_colors(deck_url, filter_colors)
+            available_cards_data = request_cache.get_moxfield_cards(deck_url, filter_colors, with_colors=True)
             
             # Filter out already used cards
             available_cards_data = [c for c in available_cards_data if c['name'] not in used_cards]
             
             # Use weighted selection (color complexity * quantity)
-            selected = weighted_random_sample(available_cards_data, count, use_quantity=True)
+            selected = weighted_random_sample(available_cards_data, count, use_quantity=True, rng=rng)
         else:
             # Simple unweighted selection (old behavior)
-            available_cards = fetch_moxfield_cards(deck_url, filter_colors)
+            available_cards = request_cache.get_moxfield_cards(deck_url, filter_colors, with_colors=False)
             
-            # Filter out already used cards
-            available_cards = [c for c in available_cards if c not in used_cards]
+            # Count copies of each unused card (the list repeats names per quantity)
+            copies: Dict[str, int] = {}
+            for card_name in available_cards:
+                if card_name not in used_cards:
+                    copies[card_name] = copies.get(card_name, 0) + 1
             
-            # Select random cards
-            selected_count = min(count, len(available_cards))
-            selected = random.sample(available_cards, selected_count) if selected_count > 0 else []
+            # Select random cards, weighted by copies but never the same card twice
+            names = list(copies)
+            selected = weighted_sample_without_replacement(names, [copies[name] for name in names], count, rng)
         
         if selected:
             selected_cards.extend(selected)
@@ -963,16 +2105,336 @@ def process_moxfield_slots(
     return selected_cards
 
 
-def generate_packs(commander_slug: str, config: Dict[str, Any], bracket: int = 2) -> List[Dict[str, Any]]:
+# ==========================================
+# SEEDED PACK CACHE
+# ==========================================
+
+# Seeded results kept in memory, and how long (seconds) each stays valid
+SEEDED_PACK_CACHE_SIZE = int(os.environ.get('SEEDED_PACK_CACHE_SIZE', 256))
+SEEDED_PACK_CACHE_TTL = int(os.environ.get('SEEDED_PACK_CACHE_TTL', RESPONSE_CACHE_TTLS['edhrec']))
+
+# Bump to invalidate every seeded result (e.g. after changing selection logic)
+PACK_DATA_VERSION = os.environ.get('PACK_DATA_VERSION', '1')
+
+# Longest string accepted as a seed
+MAX_SEED_LENGTH = 64
+
+
+def pack_data_version() -> str:
+    """Version of the local data seeded packs are drawn from"""
+    version = PACK_DATA_VERSION
+    if SCRYFALL_BULK_PATH:
+        try:
+            version += f":{os.path.getmtime(SCRYFALL_BULK_PATH):.0f}"
+        except OSError:
+            pass
+    return version
+
+
+def seeded_pack_key(commander_slug: Optional[str], config: Dict[str, Any], bracket: int, seed: Any) -> str:
+    """Cache key for a seeded request: (slug, config hash, seed, data version)"""
+    config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+    return json.dumps([commander_slug, bracket, config_hash, seed, pack_data_version()])
+
+
+class SeededPackCache:
+    """
+    Bounded LRU of finished seeded pack lists
+    
+    A seeded request always draws the same packs from the same data, so its
+    result can be replayed without touching upstream. Packs are stored as
+    JSON so every hit hands out a fresh copy.
+    """
+    
+    def __init__(self, max_entries: int = SEEDED_PACK_CACHE_SIZE, ttl: int = SEEDED_PACK_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: 'OrderedDict[str, Tuple[bytes, float]]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(entry[0])
+    
+    def set(self, key: str, packs: List[Dict[str, Any]]):
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        body = json.dumps(packs).encode('utf-8')
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (body, time.time() + self.ttl)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+SEEDED_PACK_CACHE = SeededPackCache()
+
+
+def validate_seed(seed: Any) -> Any:
+    """
+    Check a request seed (an integer or a short string)
+    
+    Raises:
+        PackRequestError: if the seed has any other type or is too long
+    """
+    if seed is None or (isinstance(seed, int) and not isinstance(seed, bool)):
+        return seed
+    if isinstance(seed, str) and len(seed) <= MAX_SEED_LENGTH:
+        return seed
+    raise PackRequestError(400, {"error": f"Invalid seed (use an integer or a string of at most {MAX_SEED_LENGTH} characters)"})
+
+
+# ==========================================
+# UPSTREAM PREFETCH PLANNER
+# ==========================================
+
+# Upper bound on concurrent upstream requests per generate_packs call
+PREFETCH_MAX_WORKERS = int(os.environ.get('PREFETCH_MAX_WORKERS', 8))
+
+
+def resolve_slot_bracket(card_type: str, slot_bracket: Any) -> Any:
+    """Bracket actually fetched for an EDHRec slot"""
+    # Use bracket 4 for gamechangers when "any" is specified (brackets 1-3 have few/no gamechangers)
+    if card_type == 'gamechangers' and slot_bracket == 'any':
+        return 4
+    # Use slot_bracket as-is, including "any" (which means no bracket filter)
+    return slot_bracket
+
+
+def plan_upstream_fetches(commander_slug: Optional[str], config: Dict[str, Any]) -> List[Tuple]:
+    """
+    Compile a pack config into the distinct upstream fetches it will need
+    
+    Tasks are tuples whose first element is the kind:
+        ('edhrec', slug, bracket, budget)
+        ('average_deck', slug, bracket)
+        ('scryfall', query, with_colors, use_color_filter)
+        ('moxfield_deck', deck_url)
+        ('moxfield', deck_url, with_colors, use_color_filter)
+        ('basic_lands',) / ('game_changers',)
+    
+    Scryfall/Moxfield tasks with use_color_filter set can only be resolved
+    once the commander's color identity is known. Moxfield decks are
+    downloaded by their own task, so that never waits on the commander.
+    """
+    tasks = {}
+    
+    for pack_type in config.get('packTypes', []):
+        slots = pack_type.get('slots', [])
+        source = pack_type.get('source', 'edhrec')
+        
+        if source == 'scryfall':
+            pack_level_color_filter = pack_type.get('useCommanderColorIdentity', True)
+            for slot in slots:
+                if slot.get('query'):
+                    use_color_filter = slot.get('useCommanderColorIdentity', pack_level_color_filter)
+                    use_weighting = slot.get('colorComplexityWeighting', True)
+                    tasks[('scryfall', slot['query'], use_weighting, bool(use_color_filter))] = True
+        
+        elif source == 'moxfield':
+            pack_level_color_filter = pack_type.get('useCommanderColorIdentity', False)
+            # The deck download also carries the name used for unnamed packs
+            for slot in slots:
+                if slot.get('deckUrl'):
+                    use_color_filter = slot.get('useCommanderColorIdentity', pack_level_color_filter)
+                    use_weighting = slot.get('colorComplexityWeighting', True)
+                    tasks[('moxfield_deck', slot['deckUrl'])] = True
+                    tasks[('moxfield', slot['deckUrl'], use_weighting, bool(use_color_filter))] = True
+        
+        elif commander_slug:
+            tasks[('basic_lands',)] = True
+            for slot in slots:
+                card_type = slot.get('cardType', 'weighted')
+                effective_bracket = resolve_slot_bracket(card_type, slot.get('bracket', 'any'))
+                tasks[('edhrec', commander_slug, effective_bracket, slot.get('budget', 'any'))] = True
+                
+                if card_type == 'weighted':
+                    tasks[('average_deck', commander_slug, effective_bracket)] = True
+                elif card_type == 'gamechangers':
+                    tasks[('game_changers',)] = True
+    
+    return list(tasks)
+
+
+def task_needs_commander_colors(task: Tuple) -> bool:
+    """Whether a planned fetch depends on the commander's color identity"""
+    return task[0] in ('scryfall', 'moxfield') and task[3]
+
+
+def run_fetch_task(request_cache: RequestCache, task: Tuple, commander_colors: Optional[List[str]]):
+    """Execute one planned fetch, storing the result in the request cache"""
+    kind = task[0]
+    
+    if kind == 'edhrec':
+        request_cache.get_edhrec_data(task[1], task[2], task[3])
+    elif kind == 'average_deck':
+        request_cache.get_average_deck(task[1], task[2])
+    elif kind == 'scryfall':
+        _, query, with_colors, use_color_filter = task
+        full_query = build_scryfall_query(query, commander_colors, use_color_filter)
+        request_cache.get_scryfall_cards(full_query, with_colors)
+    elif kind == 'moxfield':
+        _, deck_url, with_colors, use_color_filter = task
+        filter_colors = commander_colors if use_color_filter else None
+        request_cache.get_moxfield_cards(deck_url, filter_colors, with_colors)
+    elif kind == 'moxfield_deck':
+        request_cache.get_moxfield_deck(task[1])
+    elif kind == 'basic_lands':
+        request_cache.get_basic_lands()
+    elif kind == 'game_changers':
+        request_cache.get_game_changers()
+
+
+def prefetch_upstream(
+    request_cache: RequestCache,
+    commander_slug: Optional[str],
+    config: Dict[str, Any],
+    bracket: Any,
+    max_workers: int = PREFETCH_MAX_WORKERS,
+    wait: bool = True
+) -> Optional[Dict]:
+    """
+    Fetch everything a config needs in parallel before any selection runs
+    
+    The commander page and all color-independent fetches start immediately;
+    color-filtered Scryfall/Moxfield fetches start as soon as the commander
+    page has arrived. Wall time is roughly the slowest single fetch (plus the
+    commander page for color-filtered sources).
+    
+    With wait=False only the commander page is awaited; the other fetches
+    keep running in the background and selection blocks per key on the
+    request cache, so early packs don't wait for unrelated slow fetches.
+    
+    Fetches run on request_cache.prefetch_executor when one is set (batches
+    share one), otherwise on a pool of max_workers threads for this call.
+    
+    Returns:
+        The commander's EDHRec data (also left in the request cache)
+    """
+    tasks = plan_upstream_fetches(commander_slug, config)
+    independent = [t for t in tasks if not task_needs_commander_colors(t)]
+    dependent = [t for t in tasks if task_needs_commander_colors(t)]
+    
+    def run_safely(task, commander_colors=None):
+        try:
+            run_fetch_task(request_cache, task, commander_colors)
+        except Exception as e:
+            print(f"[Prefetch] {task[0]} fetch failed: {e}")
+    
+    executor = request_cache.prefetch_executor
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        header_future = None
+        if commander_slug:
+            header_future = executor.submit(request_cache.get_edhrec_data, commander_slug, bracket, 'any')
+        
+        futures = [executor.submit(run_safely, task) for task in independent]
+        
+        edhrec_data = header_future.result() if header_future else None
+        commander_colors = edhrec_data.get('card', {}).get('color_identity', []) if edhrec_data else None
+        
+        futures += [executor.submit(run_safely, task, commander_colors) for task in dependent]
+        
+        if wait:
+            for future in futures:
+                future.result()
+    finally:
+        if owns_executor:
+            executor.shutdown(wait=wait)
+    
+    return edhrec_data
+
+
+def generate_packs(
+    commander_slug: str,
+    config: Dict[str, Any],
+    bracket: int = 2,
+    request_cache: Optional[RequestCache] = None,
+    seed: Any = None
+) -> List[Dict[str, Any]]:
     """Main function to generate packs based on commander and configuration"""
-    packs = []
-    global_used_cards = set()
+    return list(iter_packs(commander_slug, config, bracket, request_cache, seed=seed))
+
+
+def iter_packs(
+    commander_slug: str,
+    config: Dict[str, Any],
+    bracket: int = 2,
+    request_cache: Optional[RequestCache] = None,
+    stream: bool = False,
+    seed: Any = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Generate packs one at a time, in config order
+    
+    With stream=True upstream fetches finish in the background and each pack
+    is yielded as soon as the data it draws from has arrived.
+    
+    With a seed every draw comes from a dedicated random.Random, so the same
+    request against the same data always yields the same packs; finished
+    results are memoized in SEEDED_PACK_CACHE.
+    """
+    if seed is None:
+        yield from build_packs(commander_slug, config, bracket, request_cache, stream)
+        return
+    
+    key = seeded_pack_key(commander_slug, config, bracket, seed)
+    cached = SEEDED_PACK_CACHE.get(key)
+    if cached is not None:
+        yield from cached
+        return
     
-    # Fetch commander data from EDHRec (once for all packs)
+    packs = []
+    for pack in build_packs(commander_slug, config, bracket, request_cache, stream, random.Random(seed)):
+        packs.append(pack)
+        yield pack
+    
+    # An empty pack usually means an upstream fetch failed; don't pin that result
+    if all(pack['cards'] for pack in packs):
+        SEEDED_PACK_CACHE.set(key, packs)
+
+
+def build_packs(
+    commander_slug: str,
+    config: Dict[str, Any],
+    bracket: int = 2,
+    request_cache: Optional[RequestCache] = None,
+    stream: bool = False,
+    rng: Optional[random.Random] = None
+) -> Iterator[Dict[str, Any]]:
+    """Draw packs in config order (rng defaults to the global random module)"""
+    # Cards drawn so far across every pack. Slots read and extend this one
+    # set, so excluding used cards never copies it
+    used_cards = set()
+    request_cache = request_cache or RequestCache()
+    timings = request_cache.timings
+    
+    # Fetch every upstream page the config needs up front, in parallel;
+    # selection below then only reads from the request cache
+    with timings.span('prefetch'):
+        edhrec_data = prefetch_upstream(request_cache, commander_slug, config, bracket, wait=not stream)
+    
+    # Commander data from EDHRec (once for all packs)
     commander_colors = None
     commander_name = None
     if commander_slug:
-        edhrec_data = fetch_edhrec_data(commander_slug, bracket, 'any')
         if edhrec_data:
             # Extract color identity and name from the card object
             card_data = edhrec_data.get('card', {})
@@ -986,23 +2448,21 @@ def generate_packs(commander_slug: str, config: Dict[str, Any], bracket: int = 2
         source = pack_type.get('source', 'edhrec')  # Default to EDHRec for backward compatibility
         
         for pack_num in range(pack_count):
+            pack_started = time.perf_counter()
             pack_cards = []
-            pack_used_cards = set()
             
             # Route to appropriate pack generation logic based on source
             if source == 'scryfall':
                 # Scryfall pack generation
                 pack_level_color_filter = pack_type.get('useCommanderColorIdentity', True)  # Default to true
-                scryfall_cards = process_scryfall_slots(slots, commander_colors, pack_level_color_filter, pack_used_cards | global_used_cards)
+                scryfall_cards = process_scryfall_slots(slots, commander_colors, pack_level_color_filter, used_cards, request_cache, rng)
                 pack_cards.extend(scryfall_cards)
-                pack_used_cards.update(scryfall_cards)
             
             elif source == 'moxfield':
                 # Moxfield pack generation
                 pack_level_color_filter = pack_type.get('useCommanderColorIdentity', False)  # Default to false for backward compatibility
-                moxfield_cards = process_moxfield_slots(slots, pack_used_cards | global_used_cards, commander_colors, pack_level_color_filter)
+                moxfield_cards = process_moxfield_slots(slots, used_cards, commander_colors, pack_level_color_filter, request_cache, rng)
                 pack_cards.extend(moxfield_cards)
-                pack_used_cards.update(moxfield_cards)
             
             else:
                 # EDHRec pack generation (original logic)
@@ -1012,47 +2472,39 @@ def generate_packs(commander_slug: str, config: Dict[str, Any], bracket: int = 2
                     slot_bracket = slot.get('bracket', 'any')
                     card_count = slot.get('count', 1)
                     
-                    # Use bracket 4 for gamechangers when "any" is specified (brackets 1-3 have few/no gamechangers)
-                    if card_type == 'gamechangers' and slot_bracket == 'any':
-                        effective_bracket = 4
+                    effective_bracket = resolve_slot_bracket(card_type, slot_bracket)
+                    if effective_bracket != slot_bracket:
                         print(f"[gamechangers] Using bracket 4 instead of 'any' (brackets 1-3 have minimal gamechangers)")
-                    else:
-                        # Use slot_bracket as-is, including "any" (which means no bracket filter)
-                        effective_bracket = slot_bracket
-                    
-                    edhrec_data = fetch_edhrec_data(commander_slug, effective_bracket, budget)
-                    
-                    if not edhrec_data:
-                        continue
                     
                     # When requesting gamechangers, collect from all sections using Scryfall's game changer list
                     collect_all = (card_type == 'gamechangers')
-                    cards = process_cardlists(edhrec_data.get('cardlists', []), collect_all_game_changers=collect_all)
+                    pool = request_cache.get_card_pool(commander_slug, effective_bracket, budget, collect_all)
+                    
+                    if not pool:
+                        continue
                     
                     selected = []
                     
                     if card_type == 'weighted':
-                        type_weights = fetch_average_deck(commander_slug, effective_bracket)
+                        type_weights = request_cache.get_average_deck(commander_slug, effective_bracket)
                         if type_weights:
-                            selected = select_weighted_cards(cards, card_count, type_weights, pack_used_cards | global_used_cards)
+                            selected = select_weighted_cards(pool, card_count, type_weights, used_cards, rng)
                         else:
-                            selected = select_random_cards(cards, card_count, pack_used_cards | global_used_cards)
+                            selected = select_random_cards(pool, card_count, used_cards, rng)
                     
                     elif card_type == 'random':
-                        selected = select_random_cards(cards, card_count, pack_used_cards | global_used_cards)
+                        selected = select_random_cards(pool, card_count, used_cards, rng)
                     
                     elif card_type in ['creatures', 'instants', 'sorceries', 'enchantments', 'planeswalkers', 
                                        'battles', 'lands', 'utilityartifacts', 'manaartifacts', 
                                        'newcards', 'highsynergycards', 'topcards', 'gamechangers']:
-                        selected = select_cards_from_category(cards, card_type, card_count, pack_used_cards | global_used_cards)
+                        selected = select_cards_from_category(pool, card_type, card_count, used_cards, rng)
                     
                     else:
-                        selected = select_cards_from_category(cards, card_type, card_count, pack_used_cards | global_used_cards)
+                        selected = select_cards_from_category(pool, card_type, card_count, used_cards, rng)
                     
                     pack_cards.extend(selected)
-                    pack_used_cards.update(selected)
-            
-            global_used_cards.update(pack_used_cards)
+                    used_cards.update(selected)
             
             # Build intelligent pack name
             # Priority: 1. Config override (pack_name), 2. API-generated name, 3. Generic fallback
@@ -1080,7 +2532,7 @@ def generate_packs(commander_slug: str, config: Dict[str, Any], bracket: int = 2
                     if slots and len(slots) > 0:
                         first_deck_url = slots[0].get('deckUrl')
                         if first_deck_url:
-                            deck_name = fetch_moxfield_deck_name(first_deck_url)
+                            deck_name = request_cache.get_moxfield_deck_name(first_deck_url)
                     
                     if deck_name:
                         parts.append(f"{deck_name} Card Set")
@@ -1113,12 +2565,11 @@ def generate_packs(commander_slug: str, config: Dict[str, Any], bracket: int = 2
                 # Join with pipe separator
                 pack_display_name = " | ".join(parts)
             
-            packs.append({
+            timings.add('select', time.perf_counter() - pack_started)
+            yield {
                 "name": pack_display_name,
                 "cards": pack_cards
-            })
-    
-    return packs
+            }
 
 
 # ==========================================
@@ -1134,8 +2585,8 @@ def extract_commander_slug(url: str) -> Optional[str]:
 def load_config(config_url: str) -> Dict[str, Any]:
     """Load pack configuration from URL"""
     try:
-        with urllib.request.urlopen(config_url) as response:
-            return json.loads(response.read().decode('utf-8'))
+        _, body, _ = HTTP_POOL.get(config_url, timeout=10)
+        return json.loads(body.decode('utf-8'))
     except Exception as e:
         raise Exception(f"Failed to load config from {config_url}: {str(e)}")
 
@@ -1157,57 +2608,200 @@ def get_default_config() -> Dict[str, Any]:
     }
 
 
+class PackRequestError(Exception):
+    """A pack request that can't be served, carrying the error response body"""
+
+    def __init__(self, status_code: int, body: Dict[str, Any]):
+        super().__init__(body.get("error"))
+        self.status_code = status_code
+        self.body = body
+
+
+def parse_pack_request(request_data: Dict[str, Any], request_cache: Optional[RequestCache] = None) -> Tuple[Optional[str], Dict[str, Any]]:
+    """
+    Resolve a pack request body into (commander_slug, config)
+    
+    Args:
+        request_data: Request with commander_url and config or config_url
+        request_cache: Cache used to share config_url downloads (optional)
+    
+    Raises:
+        PackRequestError: if the commander is missing or invalid
+    """
+    commander_url = request_data.get('commander_url')
+    config_url = request_data.get('config_url')
+    config_json = request_data.get('config')
+    
+    # Check if config is Scryfall-only (no EDHRec packs)
+    if config_json:
+        config = config_json
+    elif config_url:
+        config = request_cache.get_config(config_url) if request_cache else load_config(config_url)
+    else:
+        config = get_default_config()
+    
+    is_scryfall_only = all(
+        pack.get('source') in ['scryfall', 'moxfield']
+        for pack in config.get('packTypes', [])
+    )
+    
+    # Commander is optional for Scryfall/Moxfield-only configs
+    if not commander_url and not is_scryfall_only:
+        # Return a more helpful error with the flag
+        raise PackRequestError(400, {
+            "error": "Missing commander_url parameter (required for EDHRec packs)",
+            "commander_required": True,
+            "message": "This pack configuration contains EDHRec packs which require a commander URL. Please provide an EDHRec commander URL."
+        })
+    
+    commander_slug = None
+    if commander_url:
+        commander_slug = extract_commander_slug(commander_url)
+        if not commander_slug:
+            raise PackRequestError(400, {"error": "Invalid commander URL format"})
+    
+    return commander_slug, config
+
+
+# ==========================================
+# BATCH PACK GENERATION
+# ==========================================
+
+# Jobs run concurrently per batch request, and the most jobs one request may carry
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', min(32, (os.cpu_count() or 1) * 4)))
+BATCH_MAX_JOBS = int(os.environ.get('BATCH_MAX_JOBS', 64))
+
+# Upstream fetch threads shared by every job of a batch request
+BATCH_PREFETCH_WORKERS = int(os.environ.get('BATCH_PREFETCH_WORKERS', 16))
+
+
+def generate_pack_batch(jobs: List[Dict[str, Any]], max_workers: int = BATCH_MAX_WORKERS, timings: Optional[Timings] = None) -> List[Dict[str, Any]]:
+    """
+    Generate packs for many (commander, config) jobs in one call
+    
+    Jobs run on a thread pool and share one parent RequestCache, so upstream
+    data common to several jobs (game changers, basic lands, config files,
+    identical Scryfall/Moxfield queries, repeated commanders) is fetched once
+    for the whole batch. Each job keeps its own card pools and used-card set.
+    
+    Upstream fetches of all jobs share one pool of BATCH_PREFETCH_WORKERS
+    threads, so a batch never runs more than max_workers + that many threads.
+    
+    Args:
+        jobs: Pack request bodies (same fields as a single POST)
+        max_workers: Jobs generated concurrently
+        timings: Collects fetch and selection spans for the whole batch (optional)
+    
+    Returns:
+        One result per job, in order: {"packs": [...]} or {"status": ..., "error": ...}
+    """
+    prefetch_executor = ThreadPoolExecutor(max_workers=max(1, BATCH_PREFETCH_WORKERS), thread_name_prefix='batch-prefetch')
+    shared_cache = RequestCache(timings=timings, prefetch_executor=prefetch_executor)
+    
+    def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            if not isinstance(job, dict):
+                raise PackRequestError(400, {"error": "Each job must be an object"})
+            commander_slug, config = parse_pack_request(job, shared_cache)
+            seed = validate_seed(job.get('seed'))
+            packs = generate_packs(commander_slug, config, request_cache=RequestCache(shared_cache, shared_cache.timings), seed=seed)
+            return {"status": 200, "packs": packs}
+        except PackRequestError as e:
+            return {"status": e.status_code, **e.body}
+        except Exception as e:
+            print(f"[Batch] Job failed: {type(e).__name__}: {e}")
+            return {"status": 500, "error": f"Internal server error: {str(e)}"}
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs) or 1))) as executor:
+            return list(executor.map(run_job, jobs))
+    finally:
+        prefetch_executor.shutdown(wait=False)
+
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Send streamed packs with chunked transfer encoding as each one is built.
+# Vercel's Python runtime collects the handler's whole response before
+# returning it, so chunks would only reach the client at the end anyway;
+# there (or with NDJSON_CHUNKED=0) streamed requests get the same NDJSON
+# lines as one buffered body with a Content-Length.
+NDJSON_CHUNKED = os.environ.get('NDJSON_CHUNKED', '0' if os.environ.get('VERCEL') else '1').lower() not in ('0', 'false')
+
+
+def wants_stream(request_data: Dict[str, Any], path: str, accept: Optional[str]) -> bool:
+    """Whether a request opted into NDJSON streaming (body, query string or Accept header)"""
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(path).query)
+    return (
+        request_data.get('stream') is True
+        or query.get('stream', ['0'])[0].lower() in ('1', 'true')
+        or NDJSON_CONTENT_TYPE in (accept or '')
+    )
+
+
+def wants_timings(request_data: Dict[str, Any], path: str) -> bool:
+    """Whether a request asked for the timings debug block (body or query string)"""
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(path).query)
+    return request_data.get('timings') is True or query.get('timings', ['0'])[0].lower() in ('1', 'true')
+
+
 class handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so streamed responses can use chunked transfer encoding;
+    # every other response sends a Content-Length
+    protocol_version = 'HTTP/1.1'
+    
+    # Per-request timing state, set by do_POST
+    timings: Optional[Timings] = None
+    include_timings = False
+    
+    # False while a POST body is still (partly) unread on the socket; a
+    # response sent then closes the connection rather than parse the rest
+    # of the body as the next request
+    body_consumed = True
+    
     def do_OPTIONS(self):
         """Handle CORS preflight"""
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        for key, value in cors_headers().items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def do_POST(self):
         """Handle POST requests for pack generation"""
+        self.timings = Timings()
+        self.include_timings = False
+        self.log_fields: Dict[str, Any] = {}
+        self.body_consumed = False
         try:
-            content_length = int(self.headers['Content-Length'])
-            body = self.rfile.read(content_length)
-            request_data = json.loads(body.decode('utf-8'))
+            with self.timings.span('read'):
+                content_length = int(self.headers['Content-Length'])
+                body = self.rfile.read(content_length)
+                self.body_consumed = len(body) == content_length
+                request_data = json.loads(body.decode('utf-8'))
+            self.include_timings = wants_timings(request_data, self.path)
             
-            commander_url = request_data.get('commander_url')
-            config_url = request_data.get('config_url')
-            config_json = request_data.get('config')
-            
-            # Check if config is Scryfall-only (no EDHRec packs)
-            if config_json:
-                config = config_json
-            elif config_url:
-                config = load_config(config_url)
-            else:
-                config = get_default_config()
-            
-            is_scryfall_only = all(
-                pack.get('source') in ['scryfall', 'moxfield']
-                for pack in config.get('packTypes', [])
-            )
+            # Batch mode (POST .../batch): {"jobs": [{commander_url, config | config_url}, ...]}
+            if self.path.split('?')[0].rstrip('/').endswith('/batch'):
+                self.handle_batch(request_data.get('jobs'))
+                return
             
-            # Commander is optional for Scryfall/Moxfield-only configs
-            if not commander_url and not is_scryfall_only:
-                # Return a more helpful error with the flag
-                self.send_json_response(400, {
-                    "error": "Missing commander_url parameter (required for EDHRec packs)",
-                    "commander_required": True,
-                    "message": "This pack configuration contains EDHRec packs which require a commander URL. Please provide an EDHRec commander URL."
-                })
+            request_cache = RequestCache(timings=self.timings)
+            try:
+                with self.timings.span('parse'):
+                    commander_slug, config = parse_pack_request(request_data, request_cache)
+                    seed = validate_seed(request_data.get('seed'))
+            except PackRequestError as e:
+                self.send_json_response(e.status_code, e.body)
                 return
+            self.log_fields.update(commander=commander_slug, seeded=seed is not None)
             
-            commander_slug = None
-            if commander_url:
-                commander_slug = extract_commander_slug(commander_url)
-                if not commander_slug:
-                    self.send_error_response(400, "Invalid commander URL format")
-                    return
+            if wants_stream(request_data, self.path, self.headers.get('Accept')):
+                self.send_pack_stream(iter_packs(commander_slug, config, request_cache=request_cache, stream=True, seed=seed))
+                return
             
-            packs = generate_packs(commander_slug, config)
+            packs = generate_packs(commander_slug, config, request_cache=request_cache, seed=seed)
+            self.log_fields['packs'] = len(packs)
             
             self.send_json_response(200, {"packs": packs})
             
@@ -1219,7 +2813,111 @@ class handler(BaseHTTPRequestHandler):
                 "traceback": traceback.format_exc()
             }
             print(f"ERROR in do_POST: {error_details}")  # Log to Vercel logs
+            self.log_fields['error'] = type(e).__name__
             self.send_error_response(500, f"Internal server error: {str(e)}")
+        finally:
+            self.log_timings()
+            self.timings = None
+            self.body_consumed = True
+    
+    def log_timings(self):
+        """Write one structured JSON line per request: status, outcome and spans"""
+        print(json.dumps({
+            "event": "generate_packs",
+            "path": self.path.split('?')[0],
+            **self.log_fields,
+            "timings": {name: span['ms'] for name, span in self.timings.as_dict().items()}
+        }, separators=(',', ':')))
+    
+    def pack_stream_lines(self, packs: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+        """
+        NDJSON lines for a pack stream
+        
+        Lines are pack objects, followed by {"done": true, "count": n}. A
+        failure after the first pack can't change the status code, so it is
+        reported as an {"error": ...} line instead.
+        """
+        count = 0
+        try:
+            for pack in packs:
+                yield json.dumps(pack).encode('utf-8') + b'\n'
+                count += 1
+                self.log_fields['packs'] = count
+            done = {"done": True, "count": count}
+            if self.include_timings:
+                done["timings"] = self.timings.as_dict()
+            yield json.dumps(done).encode('utf-8') + b'\n'
+        except Exception as e:
+            print(f"ERROR in pack stream: {type(e).__name__}: {e}")
+            self.log_fields['error'] = type(e).__name__
+            yield json.dumps({"error": f"Internal server error: {str(e)}"}).encode('utf-8') + b'\n'
+        self.log_fields['packs'] = count
+    
+    def send_pack_stream(self, packs: Iterator[Dict[str, Any]]):
+        """
+        Stream packs as NDJSON, one pack per line as soon as it is built
+        
+        Without NDJSON_CHUNKED (e.g. on Vercel) the lines are sent as one
+        buffered response once every pack is built.
+        """
+        if not NDJSON_CHUNKED:
+            self.send_pack_lines(packs)
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', NDJSON_CONTENT_TYPE)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        if self.timings:
+            # Only the work before the first byte; the rest goes in the done line
+            self.send_header('Server-Timing', self.timings.server_timing())
+        self.end_headers()
+        self.log_fields['status'] = 200
+        
+        try:
+            for line in self.pack_stream_lines(packs):
+                self.write_chunk(line)
+        except (BrokenPipeError, ConnectionResetError):
+            print(f"[Stream] Client disconnected after {self.log_fields.get('packs', 0)} packs")
+            self.log_fields['error'] = 'disconnected'
+            self.close_connection = True
+            return
+        
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+    
+    def send_pack_lines(self, packs: Iterator[Dict[str, Any]]):
+        """Send a pack stream's NDJSON lines as one buffered response"""
+        body = b''.join(self.pack_stream_lines(packs))
+        
+        self.send_response(200)
+        self.send_header('Content-Type', NDJSON_CONTENT_TYPE)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Content-Length', str(len(body)))
+        if self.timings:
+            self.send_header('Server-Timing', self.timings.server_timing())
+        self.end_headers()
+        self.wfile.write(body)
+        self.log_fields['status'] = 200
+    
+    def write_chunk(self, data: bytes):
+        """Write one chunk of a chunked response and flush it to the client"""
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+    
+    def handle_batch(self, jobs: Any):
+        """Generate packs for a list of jobs and return per-job results"""
+        if not isinstance(jobs, list) or not jobs:
+            self.send_error_response(400, "Missing jobs list")
+            return
+        if len(jobs) > BATCH_MAX_JOBS:
+            self.send_error_response(400, f"Too many jobs (max {BATCH_MAX_JOBS})")
+            return
+        
+        self.log_fields['jobs'] = len(jobs)
+        self.send_json_response(200, {"results": generate_pack_batch(jobs, timings=self.timings)})
     
     def do_GET(self):
         """Handle GET requests - return API documentation"""
@@ -1229,7 +2927,14 @@ class handler(BaseHTTPRequestHandler):
             "description": "Generate EDH randomizer packs based on commander and configuration",
             "input": {
                 "commander_url": "https://edhrec.com/commanders/atraxa-grand-unifier",
-                "config_url": "https://example.com/pack_config.json (optional)"
+                "config_url": "https://example.com/pack_config.json (optional)",
+                "seed": "integer or string (optional) - same seed, same packs"
+            },
+            "batch": {
+                "endpoint": "/api/generate-packs/batch",
+                "input": {"jobs": [{"commander_url": "...", "config": "{...} (optional)"}]},
+                "output": {"results": [{"status": 200, "packs": []}]},
+                "max_jobs": BATCH_MAX_JOBS
             },
             "output": {
                 "packs": [
@@ -1238,17 +2943,37 @@ class handler(BaseHTTPRequestHandler):
                         "cards": ["Card Name 1", "Card Name 2"]
                     }
                 ]
-            }
+            },
+            "streaming": "Send \"stream\": true (or ?stream=1, or Accept: application/x-ndjson) to receive one pack per line as NDJSON (chunked as packs are built, except on Vercel where the response is buffered)",
+            "timings": "Every response carries a Server-Timing header; send \"timings\": true (or ?timings=1) for a timings block in the body",
+            "cache": RESPONSE_CACHE.stats(),
+            "seeded_cache": SEEDED_PACK_CACHE.stats(),
+            "upstream": {**UPSTREAM_HEALTH.stats(), 'connections': HTTP_POOL.stats()}
         }
         self.send_json_response(200, docs)
     
     def send_json_response(self, status_code: int, data: Dict[str, Any]):
-        """Send JSON response"""
+        """Send JSON response (with Server-Timing, and a timings block if requested, for pack requests)"""
+        timings = self.timings
+        if timings and self.include_timings:
+            data = {**data, "timings": timings.as_dict()}
+        
+        started = time.perf_counter()
+        body = json.dumps(data).encode('utf-8')
+        if timings:
+            timings.add('encode', time.perf_counter() - started)
+            self.log_fields['status'] = status_code
+        
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(body)))
+        if timings:
+            self.send_header('Server-Timing', timings.server_timing())
+        if not self.body_consumed:
+            self.send_header('Connection', 'close')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(body)
     
     def send_error_response(self, status_code: int, message: str):
         """Send error response"""
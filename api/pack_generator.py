@@ -4,10 +4,15 @@ Fetches and processes EDHRec data to generate card packs
 """
 
 import json
-import urllib.request
 import random
 from typing import Dict, List, Any, Optional, Tuple
 
+# Upstream requests share the API's pooled keep-alive client
+try:
+    from http_pool import HTTP_POOL
+except ImportError:
+    from api.http_pool import HTTP_POOL
+
 
 # Bracket to URL path mapping
 BRACKET_PATHS = {
@@ -60,13 +65,13 @@ def fetch_edhrec_data(commander_slug: str, bracket: int, budget: str) -> Optiona
     url = f"https://json.edhrec.com/pages/commanders/{commander_slug}{bracket_path}{budget_suffix}.json"
     
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            
-            if 'container' in data and 'json_dict' in data['container']:
-                return data['container']['json_dict']
-            
-            return None
+        _, body, _ = HTTP_POOL.get(url, timeout=10)
+        data = json.loads(body.decode('utf-8'))
+        
+        if 'container' in data and 'json_dict' in data['container']:
+            return data['container']['json_dict']
+        
+        return None
             
     except Exception as e:
         print(f"Error fetching {url}: {e}")
@@ -86,32 +91,32 @@ def fetch_average_deck(commander_slug: str, bracket: int) -> Optional[Dict[str,
     url = f"https://edhrec.com/_next/data/hPTdkgKVPwypO51RvBDXB/average-decks/{commander_slug}{bracket_path}.json?commander={commander_slug}"
     
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            data = json.loads(response.read().decode('utf-8'))
+        _, body, _ = HTTP_POOL.get(url, timeout=10)
+        data = json.loads(body.decode('utf-8'))
+        
+        if 'pageProps' in data and 'data' in data['pageProps']:
+            deck_data = data['pageProps']['data']
             
-            if 'pageProps' in data and 'data' in data['pageProps']:
-                deck_data = data['pageProps']['data']
-                
-                creature = deck_data.get('creature', 0)
-                instant = deck_data.get('instant', 0)
-                sorcery = deck_data.get('sorcery', 0)
-                artifact = deck_data.get('artifact', 0)
-                enchantment = deck_data.get('enchantment', 0)
-                planeswalker = deck_data.get('planeswalker', 0)
-                battle = deck_data.get('battle', 0)
-                
-                total = creature + instant + sorcery + artifact + enchantment + planeswalker + battle
-                
-                if total > 0:
-                    return {
-                        "Creature": creature / total,
-                        "Instant": instant / total,
-                        "Sorcery": sorcery / total,
-                        "Artifact": artifact / total,
-                        "Enchantment": enchantment / total,
-                        "Planeswalker": planeswalker / total,
-                        "Battle": battle / total
-                    }
+            creature = deck_data.get('creature', 0)
+            instant = deck_data.get('instant', 0)
+            sorcery = deck_data.get('sorcery', 0)
+            artifact = deck_data.get('artifact', 0)
+            enchantment = deck_data.get('enchantment', 0)
+            planeswalker = deck_data.get('planeswalker', 0)
+            battle = deck_data.get('battle', 0)
+            
+            total = creature + instant + sorcery + artifact + enchantment + planeswalker + battle
+            
+            if total > 0:
+                return {
+                    "Creature": creature / total,
+                    "Instant": instant / total,
+                    "Sorcery": sorcery / total,
+                    "Artifact": artifact / total,
+                    "Enchantment": enchantment / total,
+                    "Planeswalker": planeswalker / total,
+                    "Battle": battle / total
+                }
         
         return None
         
@@ -0,0 +1,272 @@
+"""
+EDH Randomizer API - Standalone Server
+
+Serves the pack generator, session and commander handlers from one
+long-running process, so module-level caches (response cache, Scryfall bulk
+index, powerup and commander catalogs, session store) stay warm between
+requests instead of being rebuilt on every cold serverless invocation.
+
+Usage:
+    python -m api.serve [--host 0.0.0.0] [--port 3000] [--workers 32]
+"""
+
+import argparse
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple, Type
+
+from api import commanders, index, sessions
+
+# Most connections open at once, one thread each (further clients wait in the listen backlog)
+DEFAULT_WORKERS = int(os.environ.get('SERVE_WORKERS', 32))
+
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_TIMEOUT = float(os.environ.get('SERVE_KEEPALIVE_TIMEOUT', 15))
+
+
+class not_found_handler(BaseHTTPRequestHandler):
+    """Fallback for paths no API handler serves"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def send_not_found(self):
+        body = b'{"error": "Not found"}'
+        self.send_response(404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_OPTIONS = send_not_found
+
+
+# Path prefix -> handler, mirroring the rewrites in vercel.json
+ROUTES: List[Tuple[str, Type[BaseHTTPRequestHandler]]] = [
+    ('/api/generate-packs', index.handler),
+    ('/api/index', index.handler),
+    ('/api/sessions', sessions.handler),
+    ('/api/commanders', commanders.handler),
+]
+
+
+def route(path: str) -> Type[BaseHTTPRequestHandler]:
+    """Handler class for a request path"""
+    path = path.split('?')[0]
+    for prefix, handler_class in ROUTES:
+        if path == prefix or path.startswith(prefix + '/'):
+            return handler_class
+    return not_found_handler
+
+
+class ConnectionReader:
+    """
+    Buffered reader shared by every request on one keep-alive connection
+
+    The server reads the next request line ahead to route it; the handler
+    then gets that line back from readline() before the rest of the stream.
+    """
+
+    def __init__(self, connection: socket.socket):
+        self.file = connection.makefile('rb')
+        self.pending = b''
+
+    def next_request_line(self) -> bytes:
+        """Read the next request line without consuming it (b'' at end of stream)"""
+        if not self.pending:
+            self.pending = self.file.readline(65537)
+        return self.pending
+
+    def readline(self, limit: int = -1) -> bytes:
+        if self.pending:
+            line, self.pending = self.pending, b''
+            return line
+        return self.file.readline(limit)
+
+    def read(self, size: int = -1) -> bytes:
+        data, self.pending = self.pending, b''
+        if 0 <= size <= len(data):
+            self.pending = data[size:]
+            return data[:size]
+        return data + self.file.read(-1 if size < 0 else size - len(data))
+
+    def close(self):
+        # Handlers close rfile after each request; the server closes the file with the connection
+        pass
+
+
+class ServedHandler(BaseHTTPRequestHandler):
+    """
+    Mixin that lets an API handler serve one request of a server-owned connection
+
+    BoundedHTTPServer builds one instance of the routed handler class per
+    request, so each handler only reads its own request (through the
+    connection's shared ConnectionReader) and leaves the socket open for the
+    next one.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+
+    def setup(self):
+        super().setup()
+        self.rfile.close()
+        self.rfile = self.server.readers[self.connection]
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+
+
+class BoundedHTTPServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer that routes each request and caps open connections
+
+    Each connection gets its own thread, but only `workers` at a time. When
+    every slot is taken, the accept loop closes the longest-idle keep-alive
+    connection to make room; if none is idle it waits for a slot while
+    further clients queue in the listen backlog.
+
+    Every request on a connection is routed by its path (see ROUTES) and
+    served by a new instance of that handler class, so a keep-alive
+    connection can mix endpoints.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, server_address, workers: int = DEFAULT_WORKERS):
+        super().__init__(server_address, not_found_handler)
+        self.workers = max(1, workers)
+        # Handler classes as served here, one request per instance
+        self.handlers = {
+            handler_class: type(handler_class.__name__, (ServedHandler, handler_class), {})
+            for handler_class in {handler_class for _, handler_class in ROUTES} | {not_found_handler}
+        }
+        self.readers: Dict[socket.socket, ConnectionReader] = {}
+        self.slots = threading.BoundedSemaphore(self.workers)
+        # Keep-alive sockets waiting for their next request, oldest first
+        self.idle: Dict[socket.socket, bool] = {}
+        self.idle_lock = threading.Lock()
+        self.idle_closed = 0
+        self.closing = threading.Event()
+
+    def mark_idle(self, connection: socket.socket):
+        with self.idle_lock:
+            self.idle[connection] = True
+
+    def mark_busy(self, connection: socket.socket) -> bool:
+        """Claim an idle connection for a request, False if it was closed meanwhile"""
+        with self.idle_lock:
+            return self.idle.pop(connection, False)
+
+    def close_idle_connection(self) -> bool:
+        """Close the longest-idle keep-alive connection, returns False if none is idle"""
+        with self.idle_lock:
+            if not self.idle:
+                return False
+            connection = next(iter(self.idle))
+            del self.idle[connection]
+            self.idle_closed += 1
+        try:
+            # Wakes the handler thread blocked reading the next request line
+            connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        return True
+
+    def finish_request(self, request: socket.socket, client_address):
+        """Serve a connection's requests, each with the handler class its path routes to"""
+        reader = self.readers[request] = ConnectionReader(request)
+        request.settimeout(KEEPALIVE_TIMEOUT)
+        try:
+            handled = 0
+            while True:
+                # Waiting for a follow-up request: the accept loop may close us to make room
+                if handled:
+                    self.mark_idle(request)
+                try:
+                    line = reader.next_request_line()
+                except OSError:
+                    return
+                if handled and not self.mark_busy(request):
+                    # Closed while idle, the request line arrived too late
+                    return
+                if not line:
+                    return
+
+                parts = line.split()
+                path = parts[1].decode('iso-8859-1') if len(parts) > 1 else ''
+                handler = self.handlers[route(path)](request, client_address, self)
+                handled += 1
+                if handler.close_connection:
+                    return
+        finally:
+            del self.readers[request]
+            reader.file.close()
+
+    def process_request(self, request: socket.socket, client_address):
+        while not self.slots.acquire(timeout=0.05):
+            if self.closing.is_set():
+                self.shutdown_request(request)
+                return
+            self.close_idle_connection()
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def process_request_thread(self, request: socket.socket, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            with self.idle_lock:
+                self.idle.pop(request, None)
+            self.slots.release()
+
+    def shutdown(self):
+        self.closing.set()
+        super().shutdown()
+
+
+def warm_caches():
+    """Load local data up front so the first requests don't pay for it"""
+    sessions.get_powerup_catalog()
+    for timeframe in commanders.TIMEFRAME_FILES:
+        try:
+            commanders.get_commander_catalog(timeframe)
+        except OSError as e:
+            print(f"[Serve] No {timeframe} commander data: {e}")
+    index.get_scryfall_bulk_index()
+
+
+def create_server(host: str = '127.0.0.1', port: int = 3000, workers: int = DEFAULT_WORKERS) -> BoundedHTTPServer:
+    """Build the server (call serve_forever() to run it)"""
+    return BoundedHTTPServer((host, port), workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the EDH Randomizer API as a long-lived server")
+    parser.add_argument('--host', default=os.environ.get('HOST', '127.0.0.1'), help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 3000)), help="Port to listen on (default: 3000)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f"Most connections served at once (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--no-warm', action='store_true', help="Skip preloading local data at startup")
+    args = parser.parse_args()
+
+    if not args.no_warm:
+        warm_caches()
+    sessions.start_expiry_sweeper()
+
+    server = create_server(args.host, args.port, args.workers)
+    print(f"[Serve] Listening on http://{args.host}:{args.port} with {server.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,18 +3,405 @@
 # Updated: 2025-11-01
 
 from http.server import BaseHTTPRequestHandler
+from contextlib import contextmanager
+import bisect
+import heapq
 import json
+import os
+import sqlite3
+import threading
 import time
 import random
 import string
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-# In-memory session storage (for MVP - replace with Redis/database for production)
+try:
+    from cors import cors_headers
+except ImportError:
+    from api.cors import cors_headers
+
+# In-memory session storage (used by the default "memory" session store)
 SESSIONS: Dict[str, dict] = {}
 
 # Session expiration time (24 hours)
 SESSION_TTL = 24 * 60 * 60
 
+# Session store backend: "memory" (default, per process) or "sqlite" (shared by
+# every worker process on the box)
+SESSION_STORE_BACKEND = os.environ.get('SESSION_STORE', 'memory').lower()
+SESSION_DB_PATH = os.environ.get('SESSION_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'sessions.sqlite3'))
+
+
+class AbortEdit(Exception):
+    """Raised inside a store's edit() block to leave it without saving the session"""
+
+
+class MemorySessionStore:
+    """
+    Sessions kept in a dict, lost on restart and not shared between processes
+
+    A secondary index maps pack code -> (session code, player id) so pack
+    lookups and uniqueness checks don't scan every session. It is refreshed
+    whenever a session is inserted, edited or removed.
+
+    Expiry uses a min-heap of (expires_at, session code): cleanup only pops
+    sessions that are due, so a request with nothing to evict costs O(1).
+    """
+
+    def __init__(self, sessions: Dict[str, dict]):
+        self.sessions = sessions
+        self.lock = threading.RLock()
+        self.pack_index: Dict[str, Tuple[str, str]] = {}
+        self.session_pack_codes: Dict[str, List[str]] = {}
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.evicted = 0
+        for session in sessions.values():
+            self._index_session(session)
+            heapq.heappush(self.expiry_heap, (session['created_at'] + SESSION_TTL, session['sessionCode']))
+
+    def _unindex_session(self, session_code: str):
+        for pack_code in self.session_pack_codes.pop(session_code, []):
+            if self.pack_index.get(pack_code, (None,))[0] == session_code:
+                del self.pack_index[pack_code]
+
+    def _index_session(self, session: dict):
+        session_code = session['sessionCode']
+        self._unindex_session(session_code)
+        pack_codes = []
+        for player in session['players']:
+            if player.get('packCode'):
+                self.pack_index[player['packCode']] = (session_code, player['id'])
+                pack_codes.append(player['packCode'])
+        if pack_codes:
+            self.session_pack_codes[session_code] = pack_codes
+
+    def get(self, session_code: str) -> Optional[dict]:
+        with self.lock:
+            return self.sessions.get(session_code)
+
+    def insert(self, session: dict) -> bool:
+        """Add a new session, returns False if its code is already taken"""
+        with self.lock:
+            if session['sessionCode'] in self.sessions:
+                return False
+            self.sessions[session['sessionCode']] = session
+            self._index_session(session)
+            heapq.heappush(self.expiry_heap, (session['created_at'] + SESSION_TTL, session['sessionCode']))
+            return True
+
+    @contextmanager
+    def edit(self, session_code: str):
+        """Yield a session (or None) for read-modify-write; changes persist on exit unless AbortEdit is raised"""
+        with self.lock:
+            session = self.sessions.get(session_code)
+            expires_at = session['created_at'] + SESSION_TTL if session is not None else None
+            try:
+                yield session
+            except AbortEdit:
+                return
+            if session is not None:
+                self._index_session(session)
+                # A refreshed session needs a new heap entry; cleanup skips the old one as stale
+                if session['created_at'] + SESSION_TTL != expires_at:
+                    heapq.heappush(self.expiry_heap, (session['created_at'] + SESSION_TTL, session_code))
+
+    def find_pack(self, pack_code: str) -> Optional[Tuple[dict, dict]]:
+        """Find the (session, player) that owns a pack code"""
+        with self.lock:
+            entry = self.pack_index.get(pack_code)
+            if entry is None:
+                return None
+            session = self.sessions.get(entry[0])
+            if session is None:
+                return None
+            player = next((p for p in session['players'] if p['id'] == entry[1]), None)
+            return (session, player) if player else None
+
+    def pack_code_exists(self, pack_code: str) -> bool:
+        with self.lock:
+            return pack_code in self.pack_index
+
+    def cleanup_expired(self, now: Optional[float] = None) -> int:
+        """Remove expired sessions, returns how many were removed"""
+        now = time.time() if now is None else now
+        removed = 0
+        with self.lock:
+            while self.expiry_heap and self.expiry_heap[0][0] <= now:
+                expires_at, code = heapq.heappop(self.expiry_heap)
+                session = self.sessions.get(code)
+                # Skip heap entries left behind by a session that reused this code
+                if session is None or session['created_at'] + SESSION_TTL != expires_at:
+                    continue
+                del self.sessions[code]
+                self._unindex_session(code)
+                removed += 1
+            self.evicted += removed
+        return removed
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'backend': 'memory', 'sessions': len(self.sessions), 'evicted': self.evicted}
+
+
+class SQLiteSessionStore:
+    """
+    Sessions persisted in a SQLite database (WAL mode)
+
+    Each session row stores the session JSON plus indexed code and expiry
+    columns; pack codes live in their own indexed table. Read-modify-write
+    happens inside BEGIN IMMEDIATE transactions, so several worker processes
+    can share the file without losing updates.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self.evicted = 0
+        self.evicted_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self.connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            ' session_code TEXT PRIMARY KEY,'
+            ' data TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS pack_codes ('
+            ' pack_code TEXT PRIMARY KEY,'
+            ' session_code TEXT NOT NULL,'
+            ' player_id TEXT NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS pack_codes_session ON pack_codes (session_code)')
+
+    def connection(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections aren't shareable)"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _load(self, conn: sqlite3.Connection, session_code: str) -> Optional[dict]:
+        row = conn.execute(
+            'SELECT data FROM sessions WHERE session_code = ? AND expires_at > ?',
+            (session_code, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save(self, conn: sqlite3.Connection, session: dict):
+        session_code = session['sessionCode']
+        conn.execute(
+            'INSERT OR REPLACE INTO sessions (session_code, data, created_at, expires_at) VALUES (?, ?, ?, ?)',
+            (session_code, json.dumps(session), session['created_at'], session['created_at'] + SESSION_TTL)
+        )
+        conn.execute('DELETE FROM pack_codes WHERE session_code = ?', (session_code,))
+        conn.executemany(
+            'INSERT OR REPLACE INTO pack_codes (pack_code, session_code, player_id) VALUES (?, ?, ?)',
+            [(p['packCode'], session_code, p['id']) for p in session['players'] if p.get('packCode')]
+        )
+
+    def get(self, session_code: str) -> Optional[dict]:
+        return self._load(self.connection(), session_code)
+
+    def insert(self, session: dict) -> bool:
+        """Add a new session, returns False if its code is already taken"""
+        with self.transaction() as conn:
+            # An expired row with the same code can be replaced
+            conn.execute(
+                'DELETE FROM sessions WHERE session_code = ? AND expires_at <= ?',
+                (session['sessionCode'], time.time())
+            )
+            exists = conn.execute(
+                'SELECT 1 FROM sessions WHERE session_code = ?', (session['sessionCode'],)
+            ).fetchone()
+            if exists:
+                return False
+            self._save(conn, session)
+            return True
+
+    @contextmanager
+    def edit(self, session_code: str):
+        """Yield a session (or None) for read-modify-write; changes persist on exit unless AbortEdit is raised"""
+        try:
+            with self.transaction() as conn:
+                session = self._load(conn, session_code)
+                yield session
+                if session is not None:
+                    self._save(conn, session)
+        except AbortEdit:
+            # transaction() already rolled back
+            pass
+
+    def find_pack(self, pack_code: str) -> Optional[Tuple[dict, dict]]:
+        """Find the (session, player) that owns a pack code"""
+        conn = self.connection()
+        row = conn.execute(
+            'SELECT session_code, player_id FROM pack_codes WHERE pack_code = ?', (pack_code,)
+        ).fetchone()
+        if not row:
+            return None
+
+        session = self._load(conn, row[0])
+        if session is None:
+            return None
+        player = next((p for p in session['players'] if p['id'] == row[1]), None)
+        return (session, player) if player else None
+
+    def pack_code_exists(self, pack_code: str) -> bool:
+        row = self.connection().execute(
+            'SELECT 1 FROM pack_codes WHERE pack_code = ?', (pack_code,)
+        ).fetchone()
+        return row is not None
+
+    def cleanup_expired(self, now: Optional[float] = None) -> int:
+        """Remove expired sessions, returns how many were removed"""
+        now = time.time() if now is None else now
+
+        # Cheap indexed read first so requests only take the write lock when something is due
+        due = self.connection().execute(
+            'SELECT 1 FROM sessions WHERE expires_at <= ? LIMIT 1', (now,)
+        ).fetchone()
+        if not due:
+            return 0
+
+        with self.transaction() as conn:
+            conn.execute(
+                'DELETE FROM pack_codes WHERE session_code IN '
+                '(SELECT session_code FROM sessions WHERE expires_at <= ?)', (now,)
+            )
+            removed = conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (now,)).rowcount
+
+        with self.evicted_lock:
+            self.evicted += removed
+        return removed
+
+    def stats(self) -> dict:
+        count = self.connection().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+        return {'backend': 'sqlite', 'sessions': count, 'evicted': self.evicted}
+
+
+def create_session_store():
+    """Build the session store selected by SESSION_STORE"""
+    if SESSION_STORE_BACKEND == 'sqlite':
+        return SQLiteSessionStore(SESSION_DB_PATH)
+    return MemorySessionStore(SESSIONS)
+
+
+STORE = create_session_store()
+
+# Powerup definitions shared with the web UI
+POWERUPS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'powerups.json')
+
+# Seconds between mtime checks of powerups.json (edits are picked up without a restart)
+POWERUPS_RECHECK_INTERVAL = 5.0
+
+DEFAULT_RARITY_WEIGHTS = {'common': 55, 'uncommon': 30, 'rare': 12, 'mythic': 3}
+
+DEFAULT_POWERUP = {
+    'id': 'default',
+    'name': 'Standard Pack',
+    'rarity': 'common',
+    'description': 'No special effects',
+    'effects': {}
+}
+
+
+class PowerupCatalog:
+    """
+    Parsed powerups.json with lookups prebuilt for rolling
+
+    Holds an id -> powerup dict, per-rarity powerup lists and a cumulative
+    rarity weight table, so a roll is a bisect plus a random.choice.
+    """
+
+    def __init__(self, powerups_data: dict, mtime: Optional[float] = None):
+        self.mtime = mtime
+        self.powerups = powerups_data.get('powerups', [])
+        self.by_id = {p['id']: p for p in self.powerups}
+
+        self.by_rarity: Dict[str, List[dict]] = {}
+        for powerup in self.powerups:
+            self.by_rarity.setdefault(powerup['rarity'], []).append(powerup)
+
+        self.rarities = []
+        self.cumulative_weights = []
+        cumulative = 0
+        for rarity, weight in powerups_data.get('rarityWeights', DEFAULT_RARITY_WEIGHTS).items():
+            cumulative += weight
+            self.rarities.append(rarity)
+            self.cumulative_weights.append(cumulative)
+        self.total_weight = cumulative
+
+    def get(self, powerup_id: str) -> Optional[dict]:
+        return self.by_id.get(powerup_id)
+
+    def roll(self) -> dict:
+        """Pick a rarity by weight, then a powerup of that rarity"""
+        if not self.powerups:
+            # Fallback powerup
+            return DEFAULT_POWERUP
+
+        selected_rarity = 'common'
+        if self.total_weight > 0:
+            index = bisect.bisect_left(self.cumulative_weights, random.random() * self.total_weight)
+            selected_rarity = self.rarities[min(index, len(self.rarities) - 1)]
+
+        rarity_powerups = self.by_rarity.get(selected_rarity) or self.by_rarity.get('common') or self.powerups
+        return random.choice(rarity_powerups)
+
+
+_POWERUP_CATALOG: Optional[PowerupCatalog] = None
+_POWERUP_CHECKED_AT = 0.0
+_POWERUP_LOCK = threading.Lock()
+
+
+def get_powerup_catalog() -> PowerupCatalog:
+    """Powerup catalog loaded once and reloaded when powerups.json changes"""
+    global _POWERUP_CATALOG, _POWERUP_CHECKED_AT
+
+    now = time.time()
+    with _POWERUP_LOCK:
+        if _POWERUP_CATALOG is not None and now - _POWERUP_CHECKED_AT < POWERUPS_RECHECK_INTERVAL:
+            return _POWERUP_CATALOG
+        _POWERUP_CHECKED_AT = now
+
+        try:
+            mtime = os.path.getmtime(POWERUPS_PATH)
+        except OSError:
+            mtime = None
+
+        if _POWERUP_CATALOG is None or _POWERUP_CATALOG.mtime != mtime:
+            try:
+                with open(POWERUPS_PATH, 'r') as f:
+                    _POWERUP_CATALOG = PowerupCatalog(json.load(f), mtime)
+            except (OSError, ValueError) as e:
+                print(f"[Sessions] Could not load powerups.json: {e}")
+                # Fallback: use hardcoded powerup selection
+                _POWERUP_CATALOG = PowerupCatalog({'rarityWeights': DEFAULT_RARITY_WEIGHTS, 'powerups': []}, mtime)
+
+        return _POWERUP_CATALOG
+
+
 def generate_session_code() -> str:
     """Generate a random 5-character session code"""
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
@@ -29,26 +416,34 @@ def generate_pack_code() -> str:
 
 def cleanup_expired_sessions():
     """Remove expired sessions"""
-    current_time = time.time()
-    expired = [code for code, session in SESSIONS.items() 
-               if current_time - session['created_at'] > SESSION_TTL]
-    for code in expired:
-        del SESSIONS[code]
-
-def cors_headers():
-    """Return CORS headers for all responses"""
-    return {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type',
-    }
+    return STORE.cleanup_expired()
+
+def start_expiry_sweeper(interval: float = 60.0) -> threading.Thread:
+    """Evict expired sessions from a background thread (long-running servers only)"""
+    def sweep():
+        while True:
+            time.sleep(interval)
+            try:
+                removed = cleanup_expired_sessions()
+                if removed:
+                    print(f"[Sessions] Expired {removed} sessions")
+            except Exception as e:
+                print(f"[Sessions] Expiry sweep failed: {e}")
+
+    thread = threading.Thread(target=sweep, name='session-expiry-sweeper', daemon=True)
+    thread.start()
+    return thread
 
 class handler(BaseHTTPRequestHandler):
+    # Every response sends a Content-Length, so connections can be kept alive
+    protocol_version = 'HTTP/1.1'
+
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
         self.send_response(200)
         for key, value in cors_headers().items():
             self.send_header(key, value)
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
     def do_POST(self):
@@ -98,7 +493,10 @@ class handler(BaseHTTPRequestHandler):
             path = path[13:]  # Remove '/api/sessions'
         
         # Get session by code: /sessions/{code} or /{code}
-        if path.startswith('/pack/'):
+        if path == '/_stats':
+            # Store size and eviction counters ('_' can't appear in a session code)
+            self.send_json_response(200, STORE.stats())
+        elif path.startswith('/pack/'):
             # Get pack by code: /pack/{code}
             pack_code = path.split('/')[-1].upper()
             self.handle_get_pack(pack_code)
@@ -118,14 +516,10 @@ class handler(BaseHTTPRequestHandler):
         if not player_name:
             player_name = 'Player 1'
         
-        session_code = generate_session_code()
-        while session_code in SESSIONS:
-            session_code = generate_session_code()
-        
         player_id = generate_player_id()
         
         session = {
-            'sessionCode': session_code,
+            'sessionCode': generate_session_code(),
             'hostId': player_id,
             'state': 'waiting',  # waiting, rolling, selecting, complete
             'players': [
@@ -146,7 +540,10 @@ class handler(BaseHTTPRequestHandler):
             'updated_at': time.time()
         }
         
-        SESSIONS[session_code] = session
+        # Retry with a new code until it doesn't collide with a live session
+        while not STORE.insert(session):
+            session['sessionCode'] = generate_session_code()
+        session_code = session['sessionCode']
         
         self.send_json_response(200, {
             'sessionCode': session_code,
@@ -159,45 +556,49 @@ class handler(BaseHTTPRequestHandler):
         session_code = data.get('sessionCode', '').upper()
         player_name = data.get('playerName', '').strip()[:20]  # Max 20 chars
         
-        if not session_code or session_code not in SESSIONS:
-            self.send_error_response(404, 'Session not found')
-            return
-        
-        session = SESSIONS[session_code]
-        
-        # Check if session is full (max 4 players)
-        if len(session['players']) >= 4:
-            self.send_error_response(400, 'Session is full')
-            return
+        error = None
+        with STORE.edit(session_code) as session:
+            if not session_code or session is None:
+                error = (404, 'Session not found')
+                raise AbortEdit()
+            
+            # Check if session is full (max 4 players)
+            if len(session['players']) >= 4:
+                error = (400, 'Session is full')
+                raise AbortEdit()
+            
+            # Check if session has already started rolling
+            if session['state'] != 'waiting':
+                error = (400, 'Session has already started')
+                raise AbortEdit()
+            
+            # Add new player
+            player_id = generate_player_id()
+            player_number = len(session['players']) + 1
+            
+            # Generate default name if not provided
+            if not player_name:
+                player_name = f'Player {player_number}'
+            
+            session['players'].append({
+                'id': player_id,
+                'number': player_number,
+                'name': player_name,
+                'powerup': None,
+                'commanderUrl': None,
+                'commanderData': None,
+                'commanderLocked': False,
+                'selectedCommanderIndex': None,
+                'packCode': None,
+                'packConfig': None
+            })
+            
+            session['updated_at'] = time.time()
         
-        # Check if session has already started rolling
-        if session['state'] != 'waiting':
-            self.send_error_response(400, 'Session has already started')
+        if error:
+            self.send_error_response(*error)
             return
         
-        # Add new player
-        player_id = generate_player_id()
-        player_number = len(session['players']) + 1
-        
-        # Generate default name if not provided
-        if not player_name:
-            player_name = f'Player {player_number}'
-        
-        session['players'].append({
-            'id': player_id,
-            'number': player_number,
-            'name': player_name,
-            'powerup': None,
-            'commanderUrl': None,
-            'commanderData': None,
-            'commanderLocked': False,
-            'selectedCommanderIndex': None,
-            'packCode': None,
-            'packConfig': None
-        })
-        
-        session['updated_at'] = time.time()
-        
         self.send_json_response(200, {
             'playerId': player_id,
             'sessionData': session
@@ -208,48 +609,35 @@ class handler(BaseHTTPRequestHandler):
         session_code = data.get('sessionCode', '').upper()
         player_id = data.get('playerId', '')
         
-        if not session_code or session_code not in SESSIONS:
-            self.send_error_response(404, 'Session not found')
-            return
+        catalog = get_powerup_catalog()
         
-        session = SESSIONS[session_code]
+        error = None
+        with STORE.edit(session_code) as session:
+            if not session_code or session is None:
+                error = (404, 'Session not found')
+                raise AbortEdit()
+            
+            # Verify player is host
+            if session['hostId'] != player_id:
+                error = (403, 'Only host can roll powerups')
+                raise AbortEdit()
+            
+            # Generate powerup for each player using weighted random
+            for player in session['players']:
+                powerup = self.get_random_powerup(catalog)
+                player['powerup'] = {
+                    'id': powerup['id'],
+                    'name': powerup['name'],
+                    'rarity': powerup['rarity']
+                }
+            
+            session['state'] = 'selecting'
+            session['updated_at'] = time.time()
         
-        # Verify player is host
-        if session['hostId'] != player_id:
-            self.send_error_response(403, 'Only host can roll powerups')
+        if error:
+            self.send_error_response(*error)
             return
         
-        # Roll powerups for each player
-        # Load powerups data
-        import os
-        import sys
-        
-        # Get powerups.json path
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        powerups_path = os.path.join(current_dir, '..', 'data', 'powerups.json')
-        
-        try:
-            with open(powerups_path, 'r') as f:
-                powerups_data = json.load(f)
-        except FileNotFoundError:
-            # Fallback: use hardcoded powerup selection
-            powerups_data = {
-                'rarityWeights': {'common': 55, 'uncommon': 30, 'rare': 12, 'mythic': 3},
-                'powerups': []  # Will be loaded from file in production
-            }
-        
-        # Generate powerup for each player using weighted random
-        for player in session['players']:
-            powerup = self.get_random_powerup(powerups_data)
-            player['powerup'] = {
-                'id': powerup['id'],
-                'name': powerup['name'],
-                'rarity': powerup['rarity']
-            }
-        
-        session['state'] = 'selecting'
-        session['updated_at'] = time.time()
-        
         self.send_json_response(200, session)
 
     def handle_lock_commander(self, data):
@@ -259,36 +647,40 @@ class handler(BaseHTTPRequestHandler):
         commander_url = data.get('commanderUrl', '')
         commander_data = data.get('commanderData', {})
         
-        if not session_code or session_code not in SESSIONS:
-            self.send_error_response(404, 'Session not found')
-            return
-        
-        session = SESSIONS[session_code]
+        error = None
+        with STORE.edit(session_code) as session:
+            if not session_code or session is None:
+                error = (404, 'Session not found')
+                raise AbortEdit()
+            
+            # Find player
+            player = next((p for p in session['players'] if p['id'] == player_id), None)
+            if not player:
+                error = (404, 'Player not found')
+                raise AbortEdit()
+            
+            # Lock in commander
+            player['commanderUrl'] = commander_url
+            player['commanderData'] = commander_data
+            player['commanderLocked'] = True
+            
+            # Extract selectedCommanderIndex from commanderData and store at player level
+            if 'selectedCommanderIndex' in commander_data:
+                player['selectedCommanderIndex'] = commander_data['selectedCommanderIndex']
+            
+            # Check if all players locked in
+            all_locked = all(p['commanderLocked'] for p in session['players'])
+            if all_locked:
+                # Auto-generate pack codes
+                self.generate_pack_codes_internal(session)
+                session['state'] = 'complete'
+            
+            session['updated_at'] = time.time()
         
-        # Find player
-        player = next((p for p in session['players'] if p['id'] == player_id), None)
-        if not player:
-            self.send_error_response(404, 'Player not found')
+        if error:
+            self.send_error_response(*error)
             return
         
-        # Lock in commander
-        player['commanderUrl'] = commander_url
-        player['commanderData'] = commander_data
-        player['commanderLocked'] = True
-        
-        # Extract selectedCommanderIndex from commanderData and store at player level
-        if 'selectedCommanderIndex' in commander_data:
-            player['selectedCommanderIndex'] = commander_data['selectedCommanderIndex']
-        
-        # Check if all players locked in
-        all_locked = all(p['commanderLocked'] for p in session['players'])
-        if all_locked:
-            # Auto-generate pack codes
-            self.generate_pack_codes_internal(session)
-            session['state'] = 'complete'
-        
-        session['updated_at'] = time.time()
-        
         self.send_json_response(200, session)
 
     def handle_update_commanders(self, data):
@@ -297,96 +689,98 @@ class handler(BaseHTTPRequestHandler):
         player_id = data.get('playerId', '')
         commanders = data.get('commanders', [])
         
-        if not session_code or session_code not in SESSIONS:
-            self.send_error_response(404, 'Session not found')
-            return
-        
-        session = SESSIONS[session_code]
+        error = None
+        with STORE.edit(session_code) as session:
+            if not session_code or session is None:
+                error = (404, 'Session not found')
+                raise AbortEdit()
+            
+            # Find player
+            player = next((p for p in session['players'] if p['id'] == player_id), None)
+            if not player:
+                error = (404, 'Player not found')
+                raise AbortEdit()
+            
+            # Store commanders in player data
+            if 'commanders' not in player:
+                player['commanders'] = []
+            player['commanders'] = commanders[:10]  # Limit to 10 commanders max
+            
+            session['updated_at'] = time.time()
         
-        # Find player
-        player = next((p for p in session['players'] if p['id'] == player_id), None)
-        if not player:
-            self.send_error_response(404, 'Player not found')
+        if error:
+            self.send_error_response(*error)
             return
         
-        # Store commanders in player data
-        if 'commanders' not in player:
-            player['commanders'] = []
-        player['commanders'] = commanders[:10]  # Limit to 10 commanders max
-        
-        session['updated_at'] = time.time()
-        
         self.send_json_response(200, session)
 
     def handle_generate_pack_codes(self, data):
         """Generate pack codes for all players (when all locked in)"""
         session_code = data.get('sessionCode', '').upper()
         
-        if not session_code or session_code not in SESSIONS:
-            self.send_error_response(404, 'Session not found')
-            return
-        
-        session = SESSIONS[session_code]
+        error = None
+        with STORE.edit(session_code) as session:
+            if not session_code or session is None:
+                error = (404, 'Session not found')
+                raise AbortEdit()
+            
+            # Verify all players locked in
+            all_locked = all(p['commanderLocked'] for p in session['players'])
+            if not all_locked:
+                error = (400, 'Not all players have locked in')
+                raise AbortEdit()
+            
+            # Generate pack codes
+            self.generate_pack_codes_internal(session)
+            session['state'] = 'complete'
+            session['updated_at'] = time.time()
         
-        # Verify all players locked in
-        all_locked = all(p['commanderLocked'] for p in session['players'])
-        if not all_locked:
-            self.send_error_response(400, 'Not all players have locked in')
+        if error:
+            self.send_error_response(*error)
             return
         
-        # Generate pack codes
-        self.generate_pack_codes_internal(session)
-        session['state'] = 'complete'
-        session['updated_at'] = time.time()
-        
         self.send_json_response(200, session)
 
     def handle_get_session(self, session_code):
         """Get session data"""
-        if session_code not in SESSIONS:
+        session = STORE.get(session_code)
+        if session is None:
             self.send_error_response(404, 'Session not found')
             return
         
-        self.send_json_response(200, SESSIONS[session_code])
+        self.send_json_response(200, session)
 
     def handle_get_pack(self, pack_code):
         """Get pack configuration by pack code"""
         # Find session with this pack code
-        for session in SESSIONS.values():
-            for player in session['players']:
-                if player.get('packCode') == pack_code:
-                    pack_config = {
-                        'commanderUrl': player['commanderUrl'],
-                        'packQuantity': player['packConfig']['packQuantity'],
-                        'config': player['packConfig']['config']
-                    }
-                    self.send_json_response(200, pack_config)
-                    return
+        found = STORE.find_pack(pack_code)
+        if found is None:
+            self.send_error_response(404, 'Pack code not found')
+            return
         
-        self.send_error_response(404, 'Pack code not found')
+        session, player = found
+        pack_config = {
+            'commanderUrl': player['commanderUrl'],
+            'packQuantity': player['packConfig']['packQuantity'],
+            'config': player['packConfig']['config'],
+            # Clients pass this to /api/generate-packs so replays draw the same cards
+            'seed': pack_code
+        }
+        self.send_json_response(200, pack_config)
 
     def generate_pack_codes_internal(self, session):
         """Internal helper to generate pack codes and configs"""
-        # Load powerups to get effects
-        import os
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        powerups_path = os.path.join(current_dir, '..', 'data', 'powerups.json')
-        
-        try:
-            with open(powerups_path, 'r') as f:
-                powerups_data = json.load(f)
-        except:
-            powerups_data = {'powerups': []}
+        # Powerup effects come from the cached catalog
+        catalog = get_powerup_catalog()
         
         for player in session['players']:
             # Generate unique pack code
             pack_code = generate_pack_code()
-            while any(p.get('packCode') == pack_code for s in SESSIONS.values() for p in s['players']):
+            while STORE.pack_code_exists(pack_code) or any(p.get('packCode') == pack_code for p in session['players']):
                 pack_code = generate_pack_code()
             
             # Get powerup effects
-            powerup = next((p for p in powerups_data.get('powerups', []) 
-                          if p['id'] == player['powerup']['id']), None)
+            powerup = catalog.get(player['powerup']['id'])
             
             # Generate pack config
             pack_config = self.apply_powerup_to_config(powerup, player['commanderUrl'])
@@ -515,51 +909,20 @@ class handler(BaseHTTPRequestHandler):
         
         return bundle_config
 
-    def get_random_powerup(self, powerups_data):
+    def get_random_powerup(self, catalog):
         """Get random powerup based on rarity weights"""
-        weights = powerups_data.get('rarityWeights', {
-            'common': 55, 'uncommon': 30, 'rare': 12, 'mythic': 3
-        })
-        powerups = powerups_data.get('powerups', [])
-        
-        if not powerups:
-            # Fallback powerup
-            return {
-                'id': 'default',
-                'name': 'Standard Pack',
-                'rarity': 'common',
-                'description': 'No special effects',
-                'effects': {}
-            }
-        
-        # Calculate total weight
-        total = sum(weights.values())
-        rand = random.random() * total
-        
-        # Determine rarity
-        cumulative = 0
-        selected_rarity = 'common'
-        for rarity, weight in weights.items():
-            cumulative += weight
-            if rand <= cumulative:
-                selected_rarity = rarity
-                break
-        
-        # Get powerups of that rarity
-        rarity_powerups = [p for p in powerups if p['rarity'] == selected_rarity]
-        if not rarity_powerups:
-            rarity_powerups = [p for p in powerups if p['rarity'] == 'common']
-        
-        return random.choice(rarity_powerups)
+        return catalog.roll()
 
     def send_json_response(self, status_code, data):
         """Send JSON response with CORS headers"""
+        body = json.dumps(data).encode('utf-8')
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
         for key, value in cors_headers().items():
             self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(body)
 
     def send_error_response(self, status_code, message):
         """Send error response"""
@@ -0,0 +1,140 @@
+"""
+Test the commander randomizer query engine and endpoint (offline)
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+# Add parent directory to path to import the API module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import commanders
+
+
+class RecordingHandler(commanders.handler):
+    """Commander handler that records responses instead of writing to a socket"""
+
+    def __init__(self, path):
+        self.path = path
+        self.responses = []
+
+    def send_json_response(self, status_code, data):
+        self.responses.append((status_code, json.loads(json.dumps(data))))
+
+
+def get(path):
+    h = RecordingHandler(path)
+    h.do_GET()
+    return h.responses[-1]
+
+
+def brute_force(catalog, colors, mode, counts, include, exclude, rank, cmc, salt, exclude_partners):
+    """Row-by-row filter mirroring docs/js/commanderFilters.js"""
+    matches = []
+    for i, row in enumerate(catalog.rows):
+        mask = commanders.color_mask(row['colors'])
+        if exclude_partners and ' // ' in row['name']:
+            continue
+        if counts and commanders.mask_count(mask) not in counts:
+            continue
+        if colors and counts != [0]:
+            selected = commanders.color_mask(colors)
+            if mode == 'exactly' and mask != selected:
+                continue
+            if mode == 'including' and mask & selected != selected:
+                continue
+            if mode == 'atmost' and mask & ~selected:
+                continue
+        if mask & commanders.color_mask(include) != commanders.color_mask(include):
+            continue
+        if mask & commanders.color_mask(exclude):
+            continue
+        if not all(catalog._within(value, window) for value, window in
+                   ((row['rank'], rank), (row['_cmc'], cmc), (row['_salt'], salt))):
+            continue
+        matches.append(i)
+    return matches
+
+
+def test_index_catalog_matches_csv():
+    """The catalog reads the .bin index and falls back to the CSV without it"""
+    print("=== Testing catalog from the binary index ===")
+    csv_path = os.path.join(commanders.COMMANDERS_DATA_DIR, commanders.TIMEFRAME_FILES['week'])
+    from_index = commanders.CommanderCatalog(commanders.load_commander_rows(csv_path))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_only = os.path.join(tmp, 'top_commanders_week.csv')
+        shutil.copy(csv_path, csv_only)
+        from_csv = commanders.CommanderCatalog(commanders.load_commander_rows(csv_only))
+
+    assert len(from_index) == len(from_csv) > 0
+    assert from_index.rows == from_csv.rows
+    assert from_index.buckets.keys() == from_csv.buckets.keys()
+    print(f"  Commanders: {len(from_index)}")
+    print("  ✓ Index and CSV give identical catalogs")
+    print()
+
+
+def test_queries_match_row_scan():
+    """Bucketed queries return exactly the rows a full scan would"""
+    print("=== Testing bucketed commander queries ===")
+    catalog = commanders.get_commander_catalog('2year')
+    print(f"  Commanders: {len(catalog)}, buckets: {len(catalog.buckets)}")
+
+    rng = random.Random(7)
+    for _ in range(300):
+        colors = ''.join(c for c in 'WUBRG' if rng.random() < 0.5) or None
+        mode = rng.choice(commanders.COLOR_MODES)
+        counts = rng.choice([None, [0], [1, 2], [3, 4, 5]])
+        include = rng.choice(['', 'G', 'WU'])
+        exclude = rng.choice(['', 'B'])
+        low = rng.choice([None, 1, 200])
+        rank = (low, None if low is None else low + rng.choice([50, 1000]))
+        cmc = rng.choice([(None, None), (2, 4), (None, 3)])
+        salt = rng.choice([(None, None), (None, commanders.SALT_THRESHOLD)])
+        exclude_partners = rng.random() < 0.5
+
+        masks = catalog.matching_masks(colors, mode, include, exclude, counts)
+        fast = catalog.query(masks, rank, cmc, salt, exclude_partners)
+        slow = brute_force(catalog, colors, mode, counts, include, exclude, rank, cmc, salt, exclude_partners)
+        assert sorted(fast) == slow, (colors, mode, counts, include, exclude, rank, cmc, salt)
+
+    print("  ✓ 300 random filters agree with a full scan")
+    print()
+
+
+def test_random_endpoint():
+    """GET /api/commanders/random answers with distinct matching commanders"""
+    print("=== Testing /api/commanders/random ===")
+    status, data = get('/api/commanders/random?timeframe=Monthly&count=5&colors=WU&mode=exactly&maxRank=500')
+    assert status == 200, data
+    assert data['timeframe'] == 'month'
+    assert len(data['commanders']) == min(5, data['matched'])
+    assert len({c['name'] for c in data['commanders']}) == len(data['commanders'])
+    for commander in data['commanders']:
+        assert commanders.color_mask(commander['colors']) == 3
+        assert commander['rank'] <= 500
+        assert ' // ' not in commander['name']
+    print(f"  Matched {data['matched']} Azorius commanders in the top 500")
+
+    status, data = get('/api/commanders/random?timeframe=week&salt=chill&include=G&count=3')
+    assert status == 200 and all('G' in c['colors'] for c in data['commanders'])
+
+    status, data = get('/api/commanders/random?timeframe=decade')
+    assert status == 400
+    status, data = get('/api/commanders/random?mode=sideways')
+    assert status == 400
+    status, data = get('/api/commanders/nope')
+    assert status == 404
+    print("  ✓ Filters applied and bad requests rejected")
+    print()
+
+
+if __name__ == "__main__":
+    test_index_catalog_matches_csv()
+    test_queries_match_row_scan()
+    test_random_endpoint()
@@ -0,0 +1,141 @@
+"""
+Test the standalone API server routing and keep-alive (offline)
+"""
+
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+
+# Add parent directory to path to import the API module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import serve
+
+
+def request(conn, method, path, body=None):
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_one_connection_reaches_every_handler():
+    """Sessions, commanders and pack docs answered over one keep-alive connection"""
+    print("=== Testing standalone server ===")
+    server = serve.create_server('127.0.0.1', 0, workers=4)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+
+        status, created = request(conn, 'POST', '/api/sessions/create', {'playerName': 'Host'})
+        assert status == 200 and created['sessionCode']
+        sock = conn.sock
+
+        status, session = request(conn, 'GET', f"/api/sessions/{created['sessionCode']}")
+        assert status == 200 and session['sessionCode'] == created['sessionCode']
+
+        status, data = request(conn, 'GET', '/api/commanders/random?timeframe=week&count=2')
+        assert status == 200 and len(data['commanders']) == 2
+
+        status, docs = request(conn, 'GET', '/api/generate-packs')
+        assert status == 200 and docs['endpoint'] == '/api/generate-packs'
+
+        status, _ = request(conn, 'GET', '/api/nope')
+        assert status == 404
+
+        # Every request above reused the first socket
+        assert conn.sock is sock
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("  ✓ All handlers routed over a single kept-alive connection")
+    print()
+
+
+def test_idle_connection_closed_when_full():
+    """With every slot taken, an idle keep-alive connection makes room for a new client"""
+    print("=== Testing connection limit ===")
+    server = serve.create_server('127.0.0.1', 0, workers=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        first = http.client.HTTPConnection('127.0.0.1', port)
+        status, _ = request(first, 'POST', '/api/sessions/create', {'playerName': 'Host'})
+        assert status == 200
+
+        # The first connection is idle in keep-alive and holds the only slot
+        second = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        status, _ = request(second, 'POST', '/api/sessions/create', {'playerName': 'Guest'})
+        assert status == 200
+        assert server.idle_closed == 1
+
+        first.sock.settimeout(5)
+        assert first.sock.recv(1) == b''
+        first.close()
+        second.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("  ✓ Longest-idle connection closed to admit a new one")
+    print()
+
+
+class SharedReader:
+    """One buffered reader for every response on a socket (HTTPResponse makes its own otherwise)"""
+
+    def __init__(self, sock):
+        self.file = sock.makefile('rb')
+
+    def makefile(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def close(self):
+        pass
+
+
+def test_pipelined_requests_to_different_handlers():
+    """Requests sent back to back in one write are each routed and answered in order"""
+    print("=== Testing pipelined requests ===")
+    server = serve.create_server('127.0.0.1', 0, workers=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        body = json.dumps({'playerName': 'Host'}).encode('utf-8')
+        sock = socket.create_connection(server.server_address, timeout=5)
+        sock.sendall(
+            b'POST /api/sessions/create HTTP/1.1\r\nHost: x\r\nContent-Type: application/json\r\n'
+            b'Content-Length: ' + str(len(body)).encode('ascii') + b'\r\n\r\n' + body +
+            b'GET /api/generate-packs HTTP/1.1\r\nHost: x\r\n\r\n'
+            b'GET /api/commanders/random?timeframe=week HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n'
+        )
+        reader = SharedReader(sock)
+        replies = []
+        for _ in range(3):
+            response = http.client.HTTPResponse(reader)
+            response.begin()
+            replies.append((response.status, json.loads(response.read())))
+        sock.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert [status for status, _ in replies] == [200, 200, 200]
+    assert replies[0][1]['sessionCode']
+    assert replies[1][1]['endpoint'] == '/api/generate-packs'
+    assert len(replies[2][1]['commanders']) == 1
+    print("  ✓ Three pipelined requests routed to three handlers")
+    print()
+
+
+if __name__ == "__main__":
+    test_one_connection_reaches_every_handler()
+    test_idle_connection_closed_when_full()
+    test_pipelined_requests_to_different_handlers()
@@ -0,0 +1,270 @@
+"""
+Test the session store backends through the session handler (offline)
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# Add parent directory to path to import the API module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import sessions
+
+
+class RecordingHandler(sessions.handler):
+    """Session handler that records responses instead of writing to a socket"""
+
+    def __init__(self):
+        self.responses = []
+
+    def send_json_response(self, status_code, data):
+        self.responses.append((status_code, json.loads(json.dumps(data))))
+
+
+def call(method, *args):
+    h = RecordingHandler()
+    getattr(h, method)(*args)
+    return h.responses[-1]
+
+
+def play_session():
+    """Create, join, roll, lock in and fetch packs for a 2-player session"""
+    _, created = call('handle_create_session', {'playerName': 'Host'})
+    code = created['sessionCode']
+    host = created['playerId']
+
+    _, joined = call('handle_join_session', {'sessionCode': code, 'playerName': 'Guest'})
+    guest = joined['playerId']
+
+    status, rolled = call('handle_roll_powerups', {'sessionCode': code, 'playerId': host})
+    assert status == 200 and rolled['state'] == 'selecting'
+
+    for player_id in (host, guest):
+        status, locked = call('handle_lock_commander', {
+            'sessionCode': code,
+            'playerId': player_id,
+            'commanderUrl': 'https://edhrec.com/commanders/krenko-mob-boss',
+            'commanderData': {'selectedCommanderIndex': 0}
+        })
+        assert status == 200
+
+    assert locked['state'] == 'complete'
+    pack_codes = [p['packCode'] for p in locked['players']]
+    assert all(pack_codes) and len(set(pack_codes)) == 2
+
+    found = sessions.STORE.find_pack(pack_codes[1])
+    assert found is not None and found[1]['id'] == guest
+
+    status, _ = call('handle_get_session', code)
+    assert status == 200
+    return code
+
+
+def test_memory_store():
+    """Default in-memory backend"""
+    print("=== Testing MemorySessionStore ===")
+    original = sessions.STORE
+    sessions.STORE = sessions.MemorySessionStore({})
+    try:
+        code = play_session()
+        session = sessions.STORE.get(code)
+        pack_code = session['players'][0]['packCode']
+        assert sessions.STORE.pack_code_exists(pack_code)
+
+        assert sessions.STORE.cleanup_expired(now=session['created_at'] + sessions.SESSION_TTL - 1) == 0
+        assert sessions.STORE.cleanup_expired(now=session['created_at'] + sessions.SESSION_TTL + 1) == 1
+        assert sessions.STORE.stats()['evicted'] == 1
+        assert not sessions.STORE.pack_code_exists(pack_code)
+        assert sessions.STORE.find_pack(pack_code) is None
+    finally:
+        sessions.STORE = original
+    print(f"  ✓ Played session {code}, pack codes unindexed on expiry")
+    print()
+
+
+def test_sqlite_store():
+    """SQLite backend shares sessions between store instances (i.e. processes)"""
+    print("=== Testing SQLiteSessionStore ===")
+    original = sessions.STORE
+    with tempfile.TemporaryDirectory() as db_dir:
+        path = os.path.join(db_dir, 'sessions.sqlite3')
+        sessions.STORE = sessions.SQLiteSessionStore(path)
+        try:
+            code = play_session()
+            other_worker = sessions.SQLiteSessionStore(path)
+            session = other_worker.get(code)
+            assert session is not None and len(session['players']) == 2
+            assert other_worker.cleanup_expired(now=session['created_at'] + sessions.SESSION_TTL + 1) == 1
+            assert sessions.STORE.get(code) is None
+        finally:
+            sessions.STORE = original
+    print(f"  ✓ Played session {code}, visible from a second store, expired cleanly")
+    print()
+
+
+def test_pack_index_follows_edits():
+    """Rerolled and cleared pack codes leave the pack-code index, in both stores"""
+    print("=== Testing pack-code index consistency ===")
+    original = sessions.STORE
+    with tempfile.TemporaryDirectory() as db_dir:
+        stores = [sessions.MemorySessionStore({}), sessions.SQLiteSessionStore(os.path.join(db_dir, 'sessions.sqlite3'))]
+        try:
+            for store in stores:
+                sessions.STORE = store
+                code = play_session()
+                old_codes = [p['packCode'] for p in store.get(code)['players']]
+
+                # Reroll: generating pack codes again replaces every player's code
+                status, rerolled = call('handle_generate_pack_codes', {'sessionCode': code})
+                assert status == 200
+                new_codes = [p['packCode'] for p in rerolled['players']]
+                assert not set(old_codes) & set(new_codes)
+                for old in old_codes:
+                    assert not store.pack_code_exists(old) and store.find_pack(old) is None
+                for player, new in zip(rerolled['players'], new_codes):
+                    assert store.find_pack(new)[1]['id'] == player['id']
+
+                # Delete: clearing one player's code drops only that entry
+                with store.edit(code) as session:
+                    session['players'][1]['packCode'] = None
+                assert not store.pack_code_exists(new_codes[1]) and store.find_pack(new_codes[1]) is None
+                assert store.find_pack(new_codes[0])[0]['sessionCode'] == code
+                print(f"  ✓ {type(store).__name__}: index follows rerolled and cleared codes")
+        finally:
+            sessions.STORE = original
+    print()
+
+
+def test_refreshed_session_expiry():
+    """A session whose created_at moves later expires on the new time, not the stale one"""
+    print("=== Testing expiry of refreshed sessions ===")
+    original = sessions.STORE
+    with tempfile.TemporaryDirectory() as db_dir:
+        stores = [sessions.MemorySessionStore({}), sessions.SQLiteSessionStore(os.path.join(db_dir, 'sessions.sqlite3'))]
+        try:
+            for store in stores:
+                sessions.STORE = store
+                _, created = call('handle_create_session', {'playerName': 'Host'})
+                code = created['sessionCode']
+                _, other = call('handle_create_session', {'playerName': 'Other'})
+                created_at = store.get(code)['created_at']
+
+                with store.edit(code) as session:
+                    session['created_at'] = created_at + 600
+
+                # The original deadline only takes the session that wasn't refreshed
+                assert store.cleanup_expired(now=created_at + sessions.SESSION_TTL + 1) == 1
+                assert store.get(other['sessionCode']) is None
+                assert store.get(code) is not None
+
+                assert store.cleanup_expired(now=created_at + 600 + sessions.SESSION_TTL + 1) == 1
+                assert store.get(code) is None and store.stats()['evicted'] == 2
+                if isinstance(store, sessions.MemorySessionStore):
+                    assert store.expiry_heap == []
+                print(f"  ✓ {type(store).__name__}: stale entry skipped, refreshed session expired on time")
+        finally:
+            sessions.STORE = original
+    print()
+
+
+class LockCheckingHandler(RecordingHandler):
+    """Records whether the store was still locked when the response was written"""
+
+    def send_json_response(self, status_code, data):
+        store = sessions.STORE
+        if isinstance(store, sessions.MemorySessionStore):
+            locked = store.lock._is_owned()
+        else:
+            locked = store.connection().in_transaction
+        self.responses.append((status_code, locked))
+
+
+def test_rejected_edits():
+    """4xx answers are sent after the edit block and leave the session untouched"""
+    print("=== Testing rejected session edits ===")
+    original = sessions.STORE
+    with tempfile.TemporaryDirectory() as db_dir:
+        stores = [sessions.MemorySessionStore({}), sessions.SQLiteSessionStore(os.path.join(db_dir, 'sessions.sqlite3'))]
+        try:
+            for store in stores:
+                sessions.STORE = store
+                _, created = call('handle_create_session', {'playerName': 'Host'})
+                code = created['sessionCode']
+                before = json.dumps(store.get(code), sort_keys=True)
+
+                rejected = [
+                    ('handle_join_session', {'sessionCode': 'NOPE'}, 404),
+                    ('handle_roll_powerups', {'sessionCode': code, 'playerId': 'not-the-host'}, 403),
+                    ('handle_lock_commander', {'sessionCode': code, 'playerId': 'ghost'}, 404),
+                    ('handle_update_commanders', {'sessionCode': code, 'playerId': 'ghost'}, 404),
+                    ('handle_generate_pack_codes', {'sessionCode': code}, 400),
+                ]
+                for method, data, expected in rejected:
+                    h = LockCheckingHandler()
+                    getattr(h, method)(data)
+                    assert h.responses == [(expected, False)], (method, h.responses)
+
+                assert json.dumps(store.get(code), sort_keys=True) == before
+                print(f"  ✓ {type(store).__name__}: errors sent outside the edit, session unchanged")
+
+            # A SQLite edit that raises AbortEdit is rolled back, even after changing the session
+            with stores[1].edit(code) as session:
+                session['state'] = 'complete'
+                raise sessions.AbortEdit()
+            assert stores[1].get(code)['state'] == 'waiting'
+            print("  ✓ AbortEdit rolls back the transaction")
+        finally:
+            sessions.STORE = original
+    print()
+
+
+def test_powerup_catalog():
+    """powerups.json edits are picked up by mtime, and rolls fall back when a rarity is empty"""
+    print("=== Testing powerup catalog ===")
+    originals = (sessions.POWERUPS_PATH, sessions.POWERUPS_RECHECK_INTERVAL,
+                 sessions._POWERUP_CATALOG, sessions._POWERUP_CHECKED_AT)
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, 'powerups.json')
+
+        def write_powerups(powerups, mtime):
+            with open(path, 'w') as f:
+                json.dump({'rarityWeights': {'common': 1, 'rare': 1}, 'powerups': powerups}, f)
+            os.utime(path, (mtime, mtime))
+
+        sessions.POWERUPS_PATH = path
+        sessions.POWERUPS_RECHECK_INTERVAL = 0
+        sessions._POWERUP_CATALOG = None
+        try:
+            write_powerups([{'id': 'first', 'rarity': 'rare'}], 1000)
+            catalog = sessions.get_powerup_catalog()
+            assert catalog.get('first') and sessions.get_powerup_catalog() is catalog
+
+            write_powerups([{'id': 'second', 'rarity': 'rare'}], 2000)
+            reloaded = sessions.get_powerup_catalog()
+            assert reloaded is not catalog and reloaded.mtime == 2000
+            assert reloaded.get('second') and not reloaded.get('first')
+            print("  ✓ Catalog reloaded after powerups.json changed")
+
+            # No common powerups: rolling 'common' falls back to the whole catalog
+            assert {reloaded.roll()['id'] for _ in range(50)} == {'second'}
+            print("  ✓ Missing rarity falls back to all powerups")
+
+            os.remove(path)
+            missing = sessions.get_powerup_catalog()
+            assert missing.powerups == [] and missing.roll() is sessions.DEFAULT_POWERUP
+            print("  ✓ Missing file rolls the default powerup")
+        finally:
+            (sessions.POWERUPS_PATH, sessions.POWERUPS_RECHECK_INTERVAL,
+             sessions._POWERUP_CATALOG, sessions._POWERUP_CHECKED_AT) = originals
+    print()
+
+
+if __name__ == "__main__":
+    test_memory_store()
+    test_sqlite_store()
+    test_pack_index_follows_edits()
+    test_refreshed_session_expiry()
+    test_rejected_edits()
+    test_powerup_catalog()
@@ -8,17 +8,21 @@ import { CSV_FILES } from './config.js';
 export let commandersCache = {};
 export let csvInfo = {};
 
-// Load and parse CSV file
+// Load and parse CSV file (prefers the binary index written next to it)
 export async function loadCSV(filename) {
     if (commandersCache[filename]) {
         return commandersCache[filename];
     }
     
     try {
-        const response = await fetch(filename);
-        const text = await response.text();
+        let commanders = await loadCommanderIndex(filename.replace(/\.csv$/, '.bin'));
+        
+        if (!commanders) {
+            const response = await fetch(filename);
+            const text = await response.text();
+            commanders = parseCSV(text);
+        }
         
-        const commanders = parseCSV(text);
         commandersCache[filename] = commanders;
         return commanders;
     } catch (error) {
@@ -27,6 +31,97 @@ export async function loadCSV(filename) {
     }
 }
 
+// ========================================
+// BINARY COMMANDER INDEX
+// ========================================
+// Layout matches write_commander_index in api/commander_index.py:
+// 16-byte header, fixed 40-byte records, then name/type/rarity/colour string tables
+
+const INDEX_MAGIC = 'EDHC';
+const INDEX_VERSION = 3;
+const INDEX_HEADER_SIZE = 16;
+const INDEX_RECORD_SIZE = 40;
+const INDEX_MISSING = 0xFFFFFFFF;
+
+// Bits in the record's whole-number byte (INDEX_WHOLE_FIELDS in api/commander_index.py)
+const INDEX_WHOLE_CMC = 1;
+const INDEX_WHOLE_SALT = 2;
+
+// A number as the scraper wrote it to the CSV: whole numbers as "4",
+// floats as Python prints them ("0.0", "1.97")
+function formatNumber(value, whole) {
+    if (whole) return String(value);
+    return Number.isInteger(value) ? value.toFixed(1) : String(value);
+}
+
+// Load the binary index, or null if it is missing or unreadable
+async function loadCommanderIndex(filename) {
+    try {
+        const response = await fetch(filename);
+        if (!response.ok) return null;
+        return parseCommanderIndex(await response.arrayBuffer());
+    } catch (error) {
+        return null;
+    }
+}
+
+// Decode index records into the same commander objects parseCSV returns
+function parseCommanderIndex(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    
+    if (magic !== INDEX_MAGIC ||
+        view.getUint16(4, true) !== INDEX_VERSION ||
+        view.getUint16(6, true) !== INDEX_RECORD_SIZE) {
+        return null;
+    }
+    
+    const count = view.getUint32(8, true);
+    let offset = view.getUint32(12, true);
+    
+    // Name, type, rarity and colour string tables
+    const decoder = new TextDecoder();
+    const tables = [];
+    for (let t = 0; t < 4; t++) {
+        const size = view.getUint32(offset, true);
+        const blobStart = offset + 4 + 4 * (size + 1);
+        const strings = new Array(size);
+        
+        for (let i = 0; i < size; i++) {
+            const start = view.getUint32(offset + 4 + 4 * i, true);
+            const end = view.getUint32(offset + 8 + 4 * i, true);
+            strings[i] = decoder.decode(new Uint8Array(buffer, blobStart + start, end - start));
+        }
+        
+        tables.push(strings);
+        offset = blobStart + view.getUint32(offset + 4 + 4 * size, true);
+    }
+    const [names, types, rarities, colors] = tables;
+    
+    const commanders = [];
+    for (let i = 0; i < count; i++) {
+        const base = INDEX_HEADER_SIZE + i * INDEX_RECORD_SIZE;
+        const rank = view.getUint32(base, true);
+        if (rank === INDEX_MISSING) continue;
+        
+        const cmc = view.getUint8(base + 15);
+        const whole = view.getUint8(base + 17);
+        const salt = view.getUint16(base + 18, true);
+        
+        commanders.push({
+            rank: rank,
+            name: names[view.getUint32(base + 8, true)],
+            colors: colors[view.getUint8(base + 16)],
+            cmc: cmc === 0xFF ? '' : formatNumber(cmc, whole & INDEX_WHOLE_CMC),
+            rarity: rarities[view.getUint8(base + 13)],
+            type: types[view.getUint8(base + 12)],
+            salt: salt === 0xFFFF ? '' : formatNumber(salt / 100, whole & INDEX_WHOLE_SALT)
+        });
+    }
+    
+    return commanders;
+}
+
 // Parse CSV text to commander objects
 function parseCSV(csvText) {
     const lines = csvText.split('\n');
@@ -83,17 +178,21 @@ function parseCSVLine(line) {
     for (let i = 0; i < line.length; i++) {
         const char = line[i];
         
-        if (char === '"') {
+        if (char === '"' && inQuotes && line[i + 1] === '"') {
+            // Escaped quote inside a quoted field, e.g. "Meet and Greet ""Sisay"""
+            current += '"';
+            i++;
+        } else if (char === '"') {
             inQuotes = !inQuotes;
         } else if (char === ',' && !inQuotes) {
-            values.push(current.trim().replace(/^"|"$/g, ''));
+            values.push(current.trim());
             current = '';
         } else {
             current += char;
         }
     }
     
-    values.push(current.trim().replace(/^"|"$/g, ''));
+    values.push(current.trim());
     return values;
 }
 
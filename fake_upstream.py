@@ -0,0 +1,95 @@
+"""
+Shared fakes for the offline pack generator tests
+
+Not a test module itself: test_*.py files import the fake EDHRec page,
+the patching helper, the fetch recorder and the local server from here.
+"""
+
+import contextlib
+import http.client
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+
+def fake_edhrec_page(name='Krenko, Mob Boss', colors=('R',), prefix='', **counts):
+    """
+    EDHRec commander page with counts[tag] cards in each cardlist
+
+    fake_edhrec_page(creatures=40, lands=20) lists 'Creature 0'..'Creature 39'
+    and 'Land 0'..'Land 19'; prefix is prepended to every card name.
+    """
+    return {
+        'card': {'name': name, 'color_identity': list(colors)},
+        'cardlists': [
+            {'tag': tag, 'cardviews': [{'name': f"{prefix}{tag.rstrip('s').title()} {i}"} for i in range(count)]}
+            for tag, count in counts.items()
+        ]
+    }
+
+
+@contextlib.contextmanager
+def patched(module, **attributes):
+    """Replace module attributes for the duration of the with block"""
+    originals = {name: getattr(module, name) for name in attributes}
+    for name, value in attributes.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, original in originals.items():
+            setattr(module, name, original)
+
+
+@contextlib.contextmanager
+def local_server(handler_class):
+    """Serve handler_class on a free localhost port for the with block, yielding the port"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def post_json(port, path, payload):
+    """POST payload as JSON on a new connection, returning (response, body)"""
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('POST', path, json.dumps(payload), {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+class FetchRecorder:
+    """
+    Builds fake upstream fetchers that record each call
+
+    Calls are kept as (kind, args) in call order, along with the names of
+    the threads they ran on. delay (seconds) keeps concurrent fetches
+    overlapping.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def fake(self, kind, result):
+        """A fetcher returning result (or result(*args) when callable)"""
+        def fetch(*args, **kwargs):
+            with self.lock:
+                self.calls.append((kind, args))
+                self.threads.add(threading.current_thread().name)
+            if self.delay:
+                time.sleep(self.delay)
+            return result(*args) if callable(result) else result
+        return fetch
+
+    def count(self, kind) -> int:
+        with self.lock:
+            return sum(1 for call_kind, _ in self.calls if call_kind == kind)
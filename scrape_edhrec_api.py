@@ -6,14 +6,29 @@ Replaces complex Playwright-based scraping with simple HTTP requests
 
 import argparse
 import csv
+import hashlib
 import json
+import random
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from urllib.request import urlopen, Request
+from typing import Callable, List, Dict, Any, Iterator, Optional, Tuple
 from urllib.error import HTTPError, URLError
 
+# Keep-alive client shared with the pack generator API. api/ sits next to this
+# script, so make it importable when the scraper is run from another directory
+SCRIPT_DIR = str(Path(__file__).resolve().parent)
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from api.http_pool import HTTPConnectionPool
+
+# Binary index format, shared with the commander randomizer API
+from api.commander_index import write_commander_index
+
 
 # Next.js build ID (may change on deployment)
 NEXTJS_BUILD_ID = "q6CiTV9g1s-s_apLD7pxR"
@@ -36,6 +51,9 @@ API_PATTERNS = {
     }
 }
 
+# Timeframes scraped by --timeframe all (in output order)
+ALL_TIMEFRAMES = ["2year", "month", "week"]
+
 # Output CSV filenames
 CSV_FILENAMES = {
     "2year": "top_commanders_2year.csv",
@@ -50,28 +68,238 @@ CSV_HEADERS = [
     "Cardhoarder", "Salt", "Decks"
 ]
 
+# Commander dict keys for each CSV column (same order as CSV_HEADERS)
+CSV_FIELDS = [
+    "rank", "colors", "cmc", "name", "rarity", "type",
+    "cardkingdom", "tcgplayer", "face2face", "cardmarket",
+    "cardhoarder", "salt", "num_decks"
+]
 
-def fetch_json_page(url: str) -> Optional[Dict[str, Any]]:
-    """Fetch a single JSON page from the API."""
-    try:
-        req = Request(url, headers={'User-Agent': 'EDHRecScraper/1.0'})
-        with urlopen(req, timeout=30) as response:
-            return json.loads(response.read().decode('utf-8'))
-    except HTTPError as e:
-        if e.code == 403:
-            # Page doesn't exist or access denied (likely means no more pages)
+# Default concurrency settings (overridable from the command line)
+DEFAULT_WORKERS = 8
+DEFAULT_RATE_LIMIT = 10.0  # requests per second across all workers
+DEFAULT_RETRIES = 3
+DEFAULT_PREFETCH_PAGES = 4  # paginated pages kept in flight ahead of the parser
+RETRY_BACKOFF = 1.0  # seconds, doubled on every retry
+
+# Per-URL state for conditional requests (persisted between runs, see ScrapeState)
+DEFAULT_STATE_FILE = Path(".cache/edhrec-scraper/state.json")
+STATE_MAX_AGE = 30 * 24 * 60 * 60  # drop URLs not seen for 30 days
+
+# Next.js cardview fields needed later (detail lookup and fallback rows)
+NEXTJS_CARDVIEW_FIELDS = ("sanitized", "rank", "name", "color_identity", "inclusion")
+
+# HTTP status codes worth retrying (rate limiting and server hiccups)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting how fast requests are started."""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a token is available."""
+        if self.rate <= 0:
+            return
+        
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Shared by every fetch so concurrent workers stay under the rate limit
+RATE_LIMITER = TokenBucket(DEFAULT_RATE_LIMIT)
+MAX_RETRIES = DEFAULT_RETRIES
+HTTP_POOL = HTTPConnectionPool(DEFAULT_WORKERS)
+
+
+def configure_fetching(rate_limit: float, retries: int, workers: int = DEFAULT_WORKERS) -> None:
+    """Apply command-line rate limit, retry and connection settings."""
+    global RATE_LIMITER, MAX_RETRIES, HTTP_POOL
+    RATE_LIMITER = TokenBucket(rate_limit)
+    MAX_RETRIES = retries
+    HTTP_POOL = HTTPConnectionPool(workers)
+
+
+def fetch_url(url: str, headers: Optional[Dict[str, str]] = None) -> Optional[Tuple[int, bytes, Any]]:
+    """
+    Fetch a URL, retrying transient failures with backoff.
+    
+    Returns:
+        (status, body, response headers), with status 304 and an empty body for
+        conditional requests that were not modified, or None if the fetch failed
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        RATE_LIMITER.acquire()
+        try:
+            return HTTP_POOL.get(url, {'User-Agent': 'EDHRecScraper/1.0', **(headers or {})}, timeout=30)
+        except HTTPError as e:
+            if e.code == 304:
+                return 304, b"", e.headers
+            if e.code == 403:
+                # Page doesn't exist or access denied (likely means no more pages)
+                return None
+            if e.code not in RETRYABLE_STATUS_CODES or attempt == MAX_RETRIES:
+                print(f"HTTP Error {e.code} fetching {url}: {e.reason}", file=sys.stderr)
+                return None
+        except URLError as e:
+            if attempt == MAX_RETRIES:
+                if isinstance(e.reason, TimeoutError):
+                    print(f"Timeout fetching {url}", file=sys.stderr)
+                else:
+                    print(f"URL Error fetching {url}: {e.reason}", file=sys.stderr)
+                return None
+        except Exception as e:
+            print(f"Unexpected error fetching {url}: {e}", file=sys.stderr)
             return None
-        print(f"HTTP Error {e.code} fetching {url}: {e.reason}", file=sys.stderr)
-        return None
-    except URLError as e:
-        print(f"URL Error fetching {url}: {e.reason}", file=sys.stderr)
-        return None
-    except json.JSONDecodeError as e:
+        
+        # Exponential backoff with jitter before the next attempt
+        time.sleep(RETRY_BACKOFF * (2 ** attempt) * (0.5 + random.random()))
+    
+    return None
+
+
+def decode_json(url: str, body: bytes) -> Optional[Dict[str, Any]]:
+    """Decode a JSON response body, logging (not raising) on bad data."""
+    try:
+        return json.loads(body.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         print(f"JSON decode error for {url}: {e}", file=sys.stderr)
         return None
-    except Exception as e:
-        print(f"Unexpected error fetching {url}: {e}", file=sys.stderr)
+
+
+def fetch_json_page(url: str) -> Optional[Dict[str, Any]]:
+    """Fetch a single JSON page from the API, retrying transient failures with backoff."""
+    result = fetch_url(url)
+    if result is None:
+        return None
+    return decode_json(url, result[1])
+
+
+class ScrapeState:
+    """
+    ETag/Last-Modified validators, content hash and derived value for each URL.
+    
+    Persisted between runs so the next scrape can send conditional requests and
+    reuse the stored value (instead of re-parsing) for pages that did not change.
+    Derived values are the compact rows the scraper needs, not the raw pages.
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.counts = {"not_modified": 0, "unchanged": 0, "changed": 0}
+        
+        if path and path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding='utf-8')).get("urls", {})
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Warning: ignoring unreadable state file {path}: {e}", file=sys.stderr)
+    
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.entries.get(url)
+    
+    def put(self, url: str, entry: Dict[str, Any], outcome: str) -> None:
+        with self.lock:
+            self.entries[url] = entry
+            self.counts[outcome] += 1
+    
+    def save(self) -> None:
+        """Write the state file, dropping URLs that have not been seen recently."""
+        if not self.path:
+            return
+        
+        cutoff = time.time() - STATE_MAX_AGE
+        with self.lock:
+            entries = {url: entry for url, entry in self.entries.items()
+                       if entry.get("checked_at", 0) >= cutoff}
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps({"version": 1, "urls": entries}, separators=(",", ":")),
+                            encoding='utf-8')
+        tmp_path.replace(self.path)
+    
+    def summary(self) -> str:
+        return (f"{self.counts['not_modified']} not modified, "
+                f"{self.counts['unchanged']} unchanged, {self.counts['changed']} changed")
+
+
+# In-memory until main() points it at a state file
+STATE = ScrapeState()
+
+
+def configure_state(path: Optional[Path]) -> None:
+    """Load per-URL scrape state from a file (None keeps it in memory only)."""
+    global STATE
+    STATE = ScrapeState(path)
+
+
+def fetch_page(url: str, derive: Callable[[Dict[str, Any]], Any]) -> Optional[Any]:
+    """
+    Fetch a JSON page and return derive(page), skipping work when it is unchanged.
+    
+    Sends If-None-Match/If-Modified-Since from the stored validators; on a 304,
+    or when the body hashes the same as last time, the stored value is returned
+    without parsing. Otherwise the page is parsed, derived and stored.
+    
+    Returns:
+        The derived value, or None if the fetch failed or derive() returned None
+    """
+    entry = STATE.get(url)
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    
+    result = fetch_url(url, headers)
+    if result is None:
         return None
+    status, body, response_headers = result
+    
+    if status == 304:
+        if not entry:
+            return None
+        STATE.put(url, dict(entry, checked_at=time.time()), "not_modified")
+        return entry["value"]
+    
+    digest = hashlib.sha256(body).hexdigest()
+    if entry and entry.get("hash") == digest:
+        value, outcome = entry["value"], "unchanged"
+    else:
+        data = decode_json(url, body)
+        value = derive(data) if data is not None else None
+        if value is None:
+            return None
+        outcome = "changed"
+    
+    STATE.put(url, {
+        "etag": response_headers.get("ETag"),
+        "last_modified": response_headers.get("Last-Modified"),
+        "hash": digest,
+        "value": value,
+        "checked_at": time.time()
+    }, outcome)
+    return value
 
 
 def get_color_identity(colors: List[str]) -> str:
@@ -150,6 +378,43 @@ def extract_commander_data(card: Dict[str, Any], from_nextjs: bool = False) -> D
     }
 
 
+def parse_detail_page(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Extract the commander row (without rank) from a detail page."""
+    container = data.get('container', {})
+    json_dict = container.get('json_dict', {})
+    card = json_dict.get('card', {})
+    return extract_commander_data(card, from_nextjs=False) if card else None
+
+
+def parse_first_page(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Extract the top-100 cardviews and "more" flag from a Next.js page.
+    
+    Next.js endpoints wrap data differently: pageProps.data.container.json_dict.cardlists
+    """
+    try:
+        cardlists = data["pageProps"]["data"]["container"]["json_dict"]["cardlists"]
+        cardviews = cardlists[0].get("cardviews", [])
+    except (KeyError, IndexError, TypeError):
+        print(f"Invalid Next.js response structure", file=sys.stderr)
+        return None
+    
+    return {
+        "cardviews": [{key: card[key] for key in NEXTJS_CARDVIEW_FIELDS if key in card}
+                      for card in cardviews],
+        "more": cardlists[0].get("more")
+    }
+
+
+def parse_paged_page(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract commander rows and "more" flag from a pagination API page (ranks 101+)."""
+    return {
+        "commanders": [extract_commander_data(card, from_nextjs=False)
+                       for card in data.get("cardviews", [])],
+        "more": data.get("more")
+    }
+
+
 def fetch_commander_detail(sanitized_name: str) -> Optional[Dict]:
     """
     Fetch detailed commander data from individual commander endpoint.
@@ -158,22 +423,117 @@ def fetch_commander_detail(sanitized_name: str) -> Optional[Dict]:
         sanitized_name: The sanitized commander name (e.g., 'yshtola-nights-blessed')
         
     Returns:
-        Commander data dictionary or None if fetch fails
+        Commander row (rank is filled in by the caller) or None if fetch fails
     """
     url = f"https://json.edhrec.com/pages/commanders/{sanitized_name}.json"
     try:
-        data = fetch_json_page(url)
-        if data:
-            container = data.get('container', {})
-            json_dict = container.get('json_dict', {})
-            card = json_dict.get('card', {})
-            return card
+        return fetch_page(url, parse_detail_page)
     except Exception as e:
         print(f"    Error fetching detail for {sanitized_name}: {e}")
     return None
 
 
-def fetch_all_commanders(timeframe: str, max_pages: int = 100) -> List[Dict[str, Any]]:
+class DetailCache:
+    """
+    Thread-safe cache of commander detail pages shared across timeframes.
+    
+    The top-100 lists overlap heavily, so each commander is downloaded once per
+    run. Concurrent requests for the same commander wait on the first fetch.
+    """
+    
+    def __init__(self):
+        self.entries: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+        self.fetches = 0
+        self.hits = 0
+    
+    def get(self, sanitized_name: str) -> Optional[Dict]:
+        """Return the detail card for a commander, fetching it on first use."""
+        with self.lock:
+            future = self.entries.get(sanitized_name)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self.entries[sanitized_name] = future
+                self.fetches += 1
+            else:
+                self.hits += 1
+        
+        if is_owner:
+            future.set_result(fetch_commander_detail(sanitized_name))
+        return future.result()
+
+
+def fetch_top_commanders(cardviews: List[Dict[str, Any]], workers: int = DEFAULT_WORKERS,
+                         detail_cache: Optional[DetailCache] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch detail pages for the first-page commanders concurrently.
+    
+    Requests run on a bounded thread pool (and through the shared rate limiter);
+    results are collected in input order so output rank order is deterministic.
+    """
+    detail_cache = detail_cache or DetailCache()
+    
+    def fetch_detail(card: Dict[str, Any]) -> Optional[Dict]:
+        sanitized = card.get('sanitized', '')
+        return detail_cache.get(sanitized) if sanitized else None
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        details = list(executor.map(fetch_detail, cardviews))
+    
+    commanders = []
+    for i, (card, detail) in enumerate(zip(cardviews, details), 1):
+        sanitized = card.get('sanitized', '')
+        rank = card.get('rank', i)
+        
+        if not sanitized:
+            print(f"    Warning: No sanitized name for rank {rank}")
+            continue
+        
+        if detail:
+            # Merge rank info from Next.js with detail data (copy: details are shared across timeframes)
+            commanders.append(dict(detail, rank=rank))
+            print(f"    [{i}/{len(cardviews)}] Rank {rank}: {sanitized} ... OK")
+        else:
+            # Fallback to limited Next.js data if detail fetch fails
+            commanders.append(extract_commander_data(card, from_nextjs=True))
+            print(f"    [{i}/{len(cardviews)}] Rank {rank}: {sanitized} ... FAILED (using limited data)")
+    
+    return commanders
+
+
+def iter_pages(url_config: Dict[str, str], max_pages: int,
+               prefetch: int = DEFAULT_PREFETCH_PAGES) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    Yield (page, parsed page) for the first page and then each paginated page, in order.
+    
+    Paginated pages are fetched speculatively, keeping up to `prefetch` requests
+    in flight. Fetching only starts once the caller asks for page 1, and closing
+    the generator (e.g. on a 403 or an empty page) cancels anything still queued.
+    """
+    yield 0, fetch_page(url_config["first"], parse_first_page)
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, prefetch))
+    pending = deque()
+    next_page = 1
+    try:
+        while pending or next_page <= max_pages:
+            while next_page <= max_pages and len(pending) < max(1, prefetch):
+                url = url_config["paged"].format(page=next_page)
+                pending.append((next_page, executor.submit(fetch_page, url, parse_paged_page)))
+                next_page += 1
+            
+            page, future = pending.popleft()
+            yield page, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def fetch_all_commanders(timeframe: str, max_pages: int = 100, workers: int = DEFAULT_WORKERS,
+                         prefetch: int = DEFAULT_PREFETCH_PAGES,
+                         detail_cache: Optional[DetailCache] = None) -> List[Dict[str, Any]]:
     """
     Fetch all commander pages for a given timeframe.
     
@@ -185,91 +545,47 @@ def fetch_all_commanders(timeframe: str, max_pages: int = 100) -> List[Dict[str,
         raise ValueError(f"Unknown timeframe: {timeframe}")
     
     all_commanders = []
-    page = 0  # Start at 0 for the first page (ranks 1-100)
     
     print(f"Fetching {timeframe} commander data...")
     
-    while page <= max_pages:
-        # First page uses Next.js endpoint, subsequent pages use pagination API
-        if page == 0:
-            url = url_config["first"]
-            is_nextjs = True
-        else:
-            url = url_config["paged"].format(page=page)
-            is_nextjs = False
-        
-        print(f"  Fetching page {page}...", end=" ", flush=True)
-        
-        data = fetch_json_page(url)
-        
-        if data is None:
-            print(f"No data (likely end of pages)")
-            break
-        
-        # Extract cardviews from the response
-        # Next.js endpoints wrap data differently: pageProps.data.container.json_dict.cardlists
-        # Pagination API has direct: cardviews array
-        if is_nextjs:
-            try:
-                cardlists = data["pageProps"]["data"]["container"]["json_dict"]["cardlists"]
-                cardviews = cardlists[0].get("cardviews", [])
-            except (KeyError, IndexError, TypeError):
-                print(f"Invalid Next.js response structure")
+    # Page 0 (ranks 1-100) uses the Next.js endpoint, subsequent pages use pagination API
+    pages = iter_pages(url_config, max_pages, prefetch)
+    try:
+        for page, data in pages:
+            is_nextjs = page == 0
+            
+            print(f"  Fetching page {page}...", end=" ", flush=True)
+            
+            if data is None:
+                print(f"No data (likely end of pages)")
                 break
-        else:
-            cardviews = data.get("cardviews", [])
-        
-        if not cardviews:
-            print(f"Empty cardviews (end of data)")
-            break
-        
-        first_rank = cardviews[0].get('rank', '?')
-        last_rank = cardviews[-1].get('rank', '?')
-        print(f"Got {len(cardviews)} commanders (ranks {first_rank}-{last_rank})")
-        
-        # For first page (ranks 1-100), fetch individual detail pages for complete metadata
-        if is_nextjs:
-            print(f"  Fetching detailed data for top 100 commanders...")
-            for i, card in enumerate(cardviews, 1):
-                sanitized = card.get('sanitized', '')
-                rank = card.get('rank', i)
-                
-                if sanitized:
-                    print(f"    [{i}/100] Rank {rank}: {sanitized}", end=" ... ", flush=True)
-                    detail = fetch_commander_detail(sanitized)
-                    
-                    if detail:
-                        # Merge rank info from Next.js with detail data
-                        detail['rank'] = rank
-                        commander = extract_commander_data(detail, from_nextjs=False)
-                        print("OK")
-                    else:
-                        # Fallback to limited Next.js data if detail fetch fails
-                        print("FAILED (using limited data)")
-                        commander = extract_commander_data(card, from_nextjs=True)
-                    
-                    all_commanders.append(commander)
-                else:
-                    print(f"    Warning: No sanitized name for rank {rank}")
-        else:
-            # For pagination pages (101+), use data directly (it has full metadata)
-            for card in cardviews:
-                all_commanders.append(extract_commander_data(card, from_nextjs=False))
-        
-        # Check if there are more pages
-        # Both endpoint types include a "more" field
-        if is_nextjs:
-            # For Next.js, check inside cardlists
-            more = cardlists[0].get("more") if cardlists else None
-        else:
-            # For pagination API, check at root level
-            more = data.get("more")
-        
-        if not more:
-            print(f"  Reached last page")
-            break
-        
-        page += 1
+            
+            # Next.js page has raw cardviews (detail pages still needed),
+            # pagination pages already carry full commander rows
+            cardviews = data["cardviews"] if is_nextjs else data["commanders"]
+            
+            if not cardviews:
+                print(f"Empty cardviews (end of data)")
+                break
+            
+            first_rank = cardviews[0].get('rank', '?')
+            last_rank = cardviews[-1].get('rank', '?')
+            print(f"Got {len(cardviews)} commanders (ranks {first_rank}-{last_rank})")
+            
+            # For first page (ranks 1-100), fetch individual detail pages for complete metadata
+            if is_nextjs:
+                print(f"  Fetching detailed data for top 100 commanders ({workers} workers)...")
+                all_commanders.extend(fetch_top_commanders(cardviews, workers, detail_cache))
+            else:
+                # For pagination pages (101+), use data directly (it has full metadata)
+                all_commanders.extend(cardviews)
+            
+            # Check if there are more pages
+            if not data.get("more"):
+                print(f"  Reached last page")
+                break
+    finally:
+        pages.close()
     
     print(f"Total commanders fetched: {len(all_commanders)}")
     return all_commanders
@@ -303,15 +619,76 @@ def write_csv(commanders: List[Dict[str, Any]], output_path: Path) -> None:
     print(f"✅ Wrote {len(commanders)} commanders to {output_path}")
 
 
+def read_csv_commanders(path: Path) -> List[Dict[str, str]]:
+    """Read a CSV written by write_csv back into commander dicts (values stay strings)."""
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        return [dict(zip(CSV_FIELDS, (row[header] for header in CSV_HEADERS)))
+                for row in csv.DictReader(csvfile)]
+
+
+def read_previous_csv(path: Path) -> Optional[Dict[str, Dict[str, str]]]:
+    """Read a previously written CSV into {name: row}, or None if there is none."""
+    if not path.exists():
+        return None
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        return {row["Name"]: row for row in csv.DictReader(csvfile)}
+
+
+def diff_commanders(previous: Dict[str, Dict[str, str]],
+                    commanders: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Row-level diff of rank and deck count against the previous CSV.
+    
+    Returns:
+        Dict with "added", "removed" and "changed" lists; changed entries hold
+        [old, new] pairs for rank and/or decks
+    """
+    added, changed = [], []
+    seen = set()
+    
+    for cmd in commanders:
+        name = cmd["name"]
+        rank, decks = str(cmd["rank"]), str(cmd["num_decks"])
+        seen.add(name)
+        
+        old = previous.get(name)
+        if old is None:
+            added.append({"name": name, "rank": rank, "decks": decks})
+            continue
+        
+        change = {}
+        if old["Rank"] != rank:
+            change["rank"] = [old["Rank"], rank]
+        if old["Decks"] != decks:
+            change["decks"] = [old["Decks"], decks]
+        if change:
+            changed.append({"name": name, **change})
+    
+    removed = [{"name": name, "rank": row["Rank"], "decks": row["Decks"]}
+               for name, row in previous.items() if name not in seen]
+    
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def write_changes(changes: Dict[str, Any], output_path: Path) -> None:
+    """Write a commander diff as JSON for downstream consumers."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(changes, f, indent=2)
+        f.write("\n")
+    
+    print(f"✅ Wrote changes to {output_path}: {len(changes['added'])} added, "
+          f"{len(changes['removed'])} removed, {len(changes['changed'])} changed")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Scrape EDHRec commander data via JSON API"
     )
     parser.add_argument(
         "--timeframe",
-        choices=["2year", "month", "week"],
+        choices=ALL_TIMEFRAMES + ["all"],
         required=True,
-        help="Timeframe to scrape"
+        help="Timeframe to scrape ('all' scrapes every timeframe, sharing commander detail fetches)"
     )
     parser.add_argument(
         "--output-dir",
@@ -325,22 +702,88 @@ def main():
         default=100,
         help="Maximum pages to fetch (default: 100)"
     )
+    parser.add_argument(
+        "--state-file",
+        type=Path,
+        default=DEFAULT_STATE_FILE,
+        help=f"Per-URL ETag/hash state for incremental scrapes (default: {DEFAULT_STATE_FILE})"
+    )
+    parser.add_argument(
+        "--no-state",
+        action="store_true",
+        help="Fetch every page unconditionally and don't read or write the state file"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent requests for commander detail pages (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=DEFAULT_PREFETCH_PAGES,
+        help=f"Paginated pages to fetch ahead while parsing (default: {DEFAULT_PREFETCH_PAGES})"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help=f"Maximum requests per second, 0 for unlimited (default: {DEFAULT_RATE_LIMIT:g})"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=f"Retries for failed requests, with exponential backoff (default: {DEFAULT_RETRIES})"
+    )
+    parser.add_argument(
+        "--index-only",
+        action="store_true",
+        help="Rebuild the binary indexes from the CSVs already in --output-dir instead of scraping"
+    )
     
     args = parser.parse_args()
+    timeframes = ALL_TIMEFRAMES if args.timeframe == "all" else [args.timeframe]
+    
+    if args.index_only:
+        for timeframe in timeframes:
+            csv_file = args.output_dir / CSV_FILENAMES[timeframe]
+            write_commander_index(read_csv_commanders(csv_file), csv_file.with_suffix(".bin"))
+        return
+    
+    configure_fetching(args.rate_limit, args.retries, args.workers)
+    configure_state(None if args.no_state else args.state_file)
+    
+    detail_cache = DetailCache()
     
     try:
-        # Fetch commanders from API
-        commanders = fetch_all_commanders(args.timeframe, args.max_pages)
-        
-        if not commanders:
-            print("❌ No commanders fetched!", file=sys.stderr)
-            sys.exit(1)
+        for timeframe in timeframes:
+            # Fetch commanders from API
+            commanders = fetch_all_commanders(timeframe, args.max_pages, args.workers,
+                                              args.prefetch, detail_cache)
+            
+            if not commanders:
+                print(f"❌ No {timeframe} commanders fetched!", file=sys.stderr)
+                sys.exit(1)
+            
+            # Diff against the previous CSV, then overwrite it
+            output_file = args.output_dir / CSV_FILENAMES[timeframe]
+            previous = read_previous_csv(output_file)
+            write_csv(commanders, output_file)
+            write_commander_index(commanders, output_file.with_suffix(".bin"))
+            
+            if previous is not None:
+                changes = {"timeframe": timeframe, **diff_commanders(previous, commanders)}
+                write_changes(changes, output_file.with_name(output_file.stem + "_changes.json"))
+            
+            print(f"✅ Successfully scraped {timeframe} data!")
         
-        # Write to CSV
-        output_file = args.output_dir / CSV_FILENAMES[args.timeframe]
-        write_csv(commanders, output_file)
+        if len(timeframes) > 1:
+            print(f"Commander details: {detail_cache.fetches} fetched, {detail_cache.hits} shared across timeframes")
         
-        print(f"✅ Successfully scraped {args.timeframe} data!")
+        STATE.save()
+        print(f"Pages: {STATE.summary()}")
         
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
@@ -0,0 +1,88 @@
+"""
+Test batch pack generation with shared upstream fetches (offline)
+"""
+
+import json
+import sys
+sys.path.insert(0, 'api')
+
+import index
+from fake_upstream import FetchRecorder, fake_edhrec_page, local_server, patched, post_json
+
+
+def fake_page(slug, bracket, budget):
+    return fake_edhrec_page(slug.replace('-', ' ').title(), ['G'], prefix=f'{slug} ', creatures=30, lands=10)
+
+
+def test_batch_dedupes_shared_fetches():
+    """Jobs sharing commanders, queries and lookups fetch each once"""
+    print("=== Testing batch pack generation ===")
+
+    # Keep fetches overlapping across jobs
+    recorder = FetchRecorder(delay=0.01)
+    config = {
+        "packTypes": [
+            {"count": 2, "slots": [
+                {"cardType": "creatures", "budget": "any", "bracket": "any", "count": 3},
+                {"cardType": "lands", "budget": "any", "bracket": "any", "count": 1}
+            ]},
+            {"source": "scryfall", "useCommanderColorIdentity": False, "count": 1,
+             "slots": [{"query": "banned:commander", "count": 2}]}
+        ]
+    }
+    slugs = ['krenko-mob-boss', 'omnath-locus-of-mana'] * 8
+    jobs = [{"commander_url": f"https://edhrec.com/commanders/{slug}", "config": config} for slug in slugs]
+    jobs.append({"config": config})  # EDHRec packs without a commander
+
+    with patched(
+        index,
+        fetch_edhrec_data=recorder.fake('edhrec', fake_page),
+        fetch_scryfall_cards_with_colors=recorder.fake('scryfall', [
+            {'name': f'Banned {i}', 'color_identity': []} for i in range(10)
+        ]),
+        get_basic_lands=recorder.fake('basic_lands', {'Forest'}),
+        _BASIC_LANDS_CACHE=None,
+    ):
+        results = index.generate_pack_batch(jobs, max_workers=8)
+
+    print(f"  Jobs: {len(jobs)}, upstream calls: {len(recorder.calls)}")
+    assert [r['status'] for r in results] == [200] * 16 + [400]
+    assert results[-1]['commander_required']
+    for slug, result in zip(slugs, results):
+        assert len(result['packs']) == 3
+        names = [card for pack in result['packs'] for card in pack['cards']]
+        assert len(names) == len(set(names)) == 10
+        assert all(card.startswith(slug) for card in result['packs'][0]['cards'])
+    # Two commanders: header page 2 plus the "any" page, once each
+    assert recorder.count('edhrec') == 4, recorder.calls
+    assert recorder.count('scryfall') == 1
+    assert recorder.count('basic_lands') == 1
+    print("  ✓ Shared fetches happen once per batch")
+
+    # Every job's prefetch ran on the one shared, bounded pool
+    prefetch_threads = {name for name in recorder.threads if name.startswith('batch-prefetch')}
+    assert prefetch_threads and len(prefetch_threads) <= index.BATCH_PREFETCH_WORKERS, recorder.threads
+    print(f"  ✓ Prefetch used {len(prefetch_threads)} shared threads (max {index.BATCH_PREFETCH_WORKERS})")
+    print()
+
+
+def test_batch_routed_by_path():
+    """Only POST .../batch is a batch request, a "jobs" field alone is not"""
+    print("=== Testing batch routing ===")
+    with local_server(index.handler) as port, patched(
+        index,
+        generate_pack_batch=lambda jobs, timings=None: [{"status": 200, "packs": []} for _ in jobs],
+        generate_packs=lambda *args, **kwargs: [],
+    ):
+        jobs = [{"config": {"packTypes": []}}]
+        _, batch = post_json(port, '/api/generate-packs/batch', {"jobs": jobs})
+        _, single = post_json(port, '/api/generate-packs', {"jobs": jobs, "config": {"packTypes": []}})
+        assert 'results' in json.loads(batch)
+        assert 'packs' in json.loads(single)
+    print("  ✓ Batch mode selected by path only")
+    print()
+
+
+if __name__ == "__main__":
+    test_batch_dedupes_shared_fetches()
+    test_batch_routed_by_path()
@@ -0,0 +1,61 @@
+"""
+Test the CardPool selection index (offline)
+"""
+
+import sys
+sys.path.insert(0, 'api')
+
+from index import CardPool, select_cards_by_type, select_cards_from_category, select_random_cards, select_weighted_cards
+
+
+def build_cards():
+    cards = []
+    for i in range(300):
+        cards.append({'name': f'Creature {i}', 'cardType': 'Creature', 'sourceList': 'creatures'})
+    for i in range(100):
+        cards.append({'name': f'Instant {i}', 'cardType': 'Instant', 'sourceList': 'instants'})
+    for i in range(40):
+        cards.append({'name': f'Land {i}', 'cardType': 'Land', 'sourceList': 'lands'})
+    # Same card listed in two EDHRec sections
+    cards.append({'name': 'Creature 0', 'cardType': 'Unknown', 'sourceList': 'topcards'})
+    return cards
+
+
+def test_draws_respect_buckets():
+    """Type and category draws only return cards from that bucket"""
+    print("=== Testing CardPool buckets ===")
+    pool = CardPool(build_cards())
+
+    instants = select_cards_by_type(pool, 'Instant', 10, set())
+    lands = select_cards_from_category(pool, 'lands', 5, set())
+    print(f"  Instants: {instants[:3]}...")
+    print(f"  Lands: {lands}")
+    assert len(instants) == 10 and all(name.startswith('Instant') for name in instants)
+    assert len(lands) == 5 and all(name.startswith('Land') for name in lands)
+    assert select_cards_by_type(pool, 'Battle', 1, set()) == []
+    print("  ✓ Buckets are separated by cardType and sourceList")
+    print()
+
+
+def test_no_duplicates_or_used_cards():
+    """Weighted draws never repeat a card or return one already used"""
+    print("=== Testing CardPool duplicate prevention ===")
+    pool = CardPool(build_cards())
+    used = {f'Creature {i}' for i in range(0, 300, 2)}
+
+    selected = select_weighted_cards(pool, 200, {'Creature': 0.7, 'Instant': 0.3}, used)
+    print(f"  Selected {len(selected)} cards")
+    assert len(selected) == len(set(selected)) == 200
+    assert not any(name in {f'Creature {i}' for i in range(0, 300, 2)} for name in selected)
+
+    # Everything left is drawable exactly once
+    rest = select_random_cards(pool, 1000, used)
+    assert len(rest) == len(set(rest)) == 440 - 150 - 200
+    assert select_random_cards(pool, 1, used) == []
+    print("  ✓ No duplicates, used cards skipped, pool drains cleanly")
+    print()
+
+
+if __name__ == "__main__":
+    test_draws_respect_buckets()
+    test_no_duplicates_or_used_cards()
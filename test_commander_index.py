@@ -0,0 +1,65 @@
+"""
+Test the binary commander index written by the scraper (offline)
+"""
+
+import csv
+import os
+import tempfile
+from pathlib import Path
+
+from api.commander_index import CommanderIndex, color_mask, write_commander_index
+from api.commanders import INDEX_COLUMNS, index_rows
+from scrape_edhrec_api import CSV_FIELDS, read_csv_commanders
+
+
+CSV_PATHS = [Path(f'docs/data/top_commanders_{timeframe}.csv') for timeframe in ('2year', 'month', 'week')]
+
+
+def test_round_trip_matches_csv():
+    """Every CSV field should come back as the exact CSV text after a write/read round trip"""
+    print("=== Testing commander index round trip ===")
+    for csv_path in CSV_PATHS:
+        commanders = read_csv_commanders(csv_path)
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            csv_rows = [{column: row[column] for column in INDEX_COLUMNS} for row in csv.DictReader(f)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / csv_path.with_suffix('.bin').name
+            write_commander_index(commanders, path)
+            size = os.path.getsize(path)
+            index = CommanderIndex.open(path)
+
+            assert len(index) == len(commanders)
+            for original, decoded in zip(commanders, index):
+                # Colours keep the CSV's EDHRec order, zero CMC and salt keep "0" vs "0.0"
+                assert {key: str(decoded[key]) for key in CSV_FIELDS} == original, (original, decoded)
+
+            # The API's catalog rows match csv.DictReader's
+            assert list(index_rows(index)) == csv_rows
+
+            # Colour masks and names can be read without decoding whole records
+            assert index.color_mask(0) == color_mask(commanders[0]["colors"])
+            assert index.name(len(index) - 1) == commanders[-1]["name"]
+            index.buffer.close()
+
+        print(f"  {csv_path.name}: {len(commanders)} records, "
+              f"CSV {os.path.getsize(csv_path)} bytes, index {size} bytes")
+    print("  ✓ All fields round-trip to the CSV text")
+    print()
+
+
+def test_rejects_other_files():
+    """Opening something that isn't an index fails loudly"""
+    print("=== Testing index validation ===")
+    try:
+        CommanderIndex(b"not an index at all")
+    except ValueError:
+        print("  ✓ Bad magic rejected")
+    else:
+        raise AssertionError("expected ValueError")
+    print()
+
+
+if __name__ == "__main__":
+    test_round_trip_matches_csv()
+    test_rejects_other_files()
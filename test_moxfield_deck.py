@@ -0,0 +1,87 @@
+"""
+Test that Moxfield decks are downloaded and parsed once per request (offline)
+"""
+
+import sys
+sys.path.insert(0, 'api')
+
+import index
+
+
+DECK_JSON = {
+    'name': 'Goblin Tribal',
+    'boards': {
+        'mainboard': {'cards': {
+            'a': {'quantity': 1, 'card': {'name': 'Sol Ring', 'color_identity': []}},
+            'b': {'quantity': 12, 'card': {'name': 'Mountain', 'color_identity': []}},
+            'c': {'quantity': 1, 'card': {'name': 'Goblin Matron', 'color_identity': ['R']}},
+            'd': {'quantity': 1, 'card': {'name': 'Boros Charm', 'color_identity': ['R', 'W']}},
+            'e': {'quantity': 1, 'card': {'name': 'Counterspell', 'color_identity': ['U']}},
+        }},
+        'commanders': {'cards': {
+            'k': {'quantity': 1, 'card': {'name': 'Krenko, Mob Boss', 'color_identity': ['R']}},
+        }},
+    }
+}
+
+
+def test_deck_parsing_and_filters():
+    """Names, quantities and color filters match the deck JSON"""
+    print("=== Testing MoxfieldDeck parsing ===")
+    deck = index.MoxfieldDeck.from_json('abc123', DECK_JSON)
+    assert deck.name == 'Goblin Tribal' and len(deck) == 5
+
+    assert deck.cards().count('Mountain') == 12
+    assert 'Krenko, Mob Boss' not in deck.cards()
+    assert sorted(set(deck.cards(['R']))) == ['Goblin Matron', 'Mountain', 'Sol Ring']
+    assert sorted(set(deck.cards([]))) == ['Mountain', 'Sol Ring']
+
+    by_name = {c['name']: c for c in deck.cards_with_colors(['R', 'W'])}
+    assert set(by_name) == {'Sol Ring', 'Mountain', 'Goblin Matron', 'Boros Charm'}
+    assert by_name['Boros Charm']['color_identity'] == ['W', 'R']
+    assert by_name['Mountain']['quantity'] == 12
+    print("  ✓ Mainboard parsed with masks and quantities")
+
+    # Mutating one result leaves later results (and the shared mask table) alone
+    by_name['Boros Charm']['color_identity'].append('G')
+    deck.cards_with_colors()[0]['color_identity'].append('G')
+    assert {c['name']: c['color_identity'] for c in deck.cards_with_colors()}['Boros Charm'] == ['W', 'R']
+    assert deck.cards_with_colors()[0]['color_identity'] == []
+    print("  ✓ Each call returns its own color identity lists")
+    print()
+
+
+def test_one_download_per_request():
+    """Every slot, filter and the pack title share one deck download"""
+    print("=== Testing shared Moxfield deck ===")
+    calls = []
+
+    def fake_fetch_json(url, source, timeout=10):
+        calls.append(url)
+        return DECK_JSON
+
+    original = index.fetch_json
+    index.fetch_json = fake_fetch_json
+    try:
+        config = {"packTypes": [{
+            "source": "moxfield", "count": 3,
+            "slots": [
+                {"deckUrl": "https://moxfield.com/decks/abc123", "count": 2},
+                {"deckUrl": "https://www.moxfield.com/decks/abc123/", "count": 1,
+                 "colorComplexityWeighting": False, "useCommanderColorIdentity": True}
+            ]
+        }]}
+        packs = index.generate_packs(None, config)
+    finally:
+        index.fetch_json = original
+
+    print(f"  Downloads: {len(calls)}")
+    assert len(calls) == 1
+    assert len(packs) == 3 and all(p['name'].startswith('Goblin Tribal Card Set') for p in packs)
+    print("  ✓ One download served every slot and the pack titles")
+    print()
+
+
+if __name__ == "__main__":
+    test_deck_parsing_and_filters()
+    test_one_download_per_request()
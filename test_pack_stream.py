@@ -0,0 +1,118 @@
+"""
+Test NDJSON pack streaming over a local HTTP server (offline)
+"""
+
+import http.client
+import json
+import sys
+import time
+sys.path.insert(0, 'api')
+
+import index
+from fake_upstream import fake_edhrec_page, local_server, patched, post_json
+
+
+FAKE_PAGE = fake_edhrec_page(creatures=40)
+
+SLOW_FETCH_SECONDS = 0.5
+
+
+def test_first_pack_arrives_before_slow_fetch():
+    """EDHRec packs stream out while a slow Scryfall fetch is still running"""
+    print("=== Testing NDJSON pack streaming ===")
+
+    def slow_scryfall(query):
+        time.sleep(SLOW_FETCH_SECONDS)
+        return [{'name': f'Banned {i}', 'color_identity': []} for i in range(10)]
+
+    with local_server(index.handler) as port, patched(
+        index,
+        fetch_edhrec_data=lambda slug, bracket, budget: FAKE_PAGE,
+        fetch_scryfall_cards_with_colors=slow_scryfall,
+        _BASIC_LANDS_CACHE=set(),
+    ):
+        body = json.dumps({
+            "commander_url": "https://edhrec.com/commanders/krenko-mob-boss",
+            "stream": True,
+            "config": {"packTypes": [
+                {"count": 3, "slots": [{"cardType": "creatures", "budget": "any", "bracket": "any", "count": 5}]},
+                {"source": "scryfall", "count": 1, "slots": [{"query": "banned:commander", "count": 2}]}
+            ]}
+        })
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        started = time.time()
+        conn.request('POST', '/api/generate-packs', body, {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        assert response.status == 200
+        assert response.getheader('Content-Type') == index.NDJSON_CONTENT_TYPE
+        assert response.getheader('Transfer-Encoding') == 'chunked'
+
+        first_line = response.readline()
+        first_at = time.time() - started
+        lines = [json.loads(first_line)] + [json.loads(line) for line in response.read().splitlines()]
+        total = time.time() - started
+
+        # Same connection still usable for a regular JSON request (keep-alive)
+        conn.request('GET', '/api/generate-packs')
+        docs = conn.getresponse()
+        assert docs.status == 200 and 'streaming' in json.loads(docs.read())
+        conn.close()
+
+    print(f"  First pack after {first_at:.2f}s, all {len(lines) - 1} packs after {total:.2f}s")
+    assert lines[-1] == {"done": True, "count": 4}
+    assert [len(pack['cards']) for pack in lines[:-1]] == [5, 5, 5, 2]
+    assert first_at < SLOW_FETCH_SECONDS <= total
+    print("  ✓ First pack streamed before the slow fetch finished")
+    print()
+
+
+def test_buffered_fallback():
+    """With NDJSON_CHUNKED off (as on Vercel) the same lines arrive as one sized body"""
+    print("=== Testing buffered NDJSON fallback ===")
+    body = {
+        "commander_url": "https://edhrec.com/commanders/krenko-mob-boss",
+        "stream": True,
+        "config": {"packTypes": [{"count": 2, "slots": [{"cardType": "creatures", "budget": "any", "bracket": "any", "count": 5}]}]}
+    }
+    with local_server(index.handler) as port, patched(
+        index,
+        fetch_edhrec_data=lambda slug, bracket, budget: FAKE_PAGE,
+        NDJSON_CHUNKED=False,
+    ):
+        response, data = post_json(port, '/api/generate-packs', body)
+
+    assert response.status == 200
+    assert response.getheader('Content-Type') == index.NDJSON_CONTENT_TYPE
+    assert response.getheader('Transfer-Encoding') is None
+    assert int(response.getheader('Content-Length')) == len(data)
+    lines = [json.loads(line) for line in data.splitlines()]
+    assert lines[-1] == {"done": True, "count": 2} and all(len(pack['cards']) == 5 for pack in lines[:-1])
+    print("  ✓ Buffered body with a Content-Length and the same lines")
+    print()
+
+
+def test_unread_body_closes_connection():
+    """An error sent before the request body was read closes the connection"""
+    print("=== Testing errors before the body is read ===")
+    with local_server(index.handler) as port:
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        # No Content-Length: the body is sent chunked and never read by the handler
+        conn.request('POST', '/api/generate-packs', iter([b'{"commander_url": "x"}']),
+                     {'Content-Type': 'application/json'}, encode_chunked=True)
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 500
+        assert response.getheader('Connection') == 'close' and response.will_close
+        conn.close()
+
+        # A request whose body was read keeps the connection open
+        response, _ = post_json(port, '/api/generate-packs', {})
+        assert response.status == 400 and response.getheader('Connection') is None
+    print("  ✓ Connection: close only when the body is left unread")
+    print()
+
+
+if __name__ == "__main__":
+    test_first_pack_arrives_before_slow_fetch()
+    test_buffered_fallback()
+    test_unread_body_closes_connection()
@@ -0,0 +1,134 @@
+"""
+Test request-scoped EDHRec memoization in generate_packs (offline)
+"""
+
+import sys
+import threading
+import time
+sys.path.insert(0, 'api')
+
+import index
+from fake_upstream import FetchRecorder, fake_edhrec_page, patched
+
+
+FAKE_PAGE = fake_edhrec_page(creatures=40, lands=20)
+
+
+def test_edhrec_pages_fetched_once_per_request():
+    """Every slot of every pack should share the same parsed EDHRec pages"""
+    print("=== Testing EDHRec request memoization ===")
+    recorder = FetchRecorder()
+    config = {
+        "packTypes": [{
+            "count": 5,
+            "slots": [
+                {"cardType": "creatures", "budget": "expensive", "bracket": "any", "count": 1},
+                {"cardType": "creatures", "budget": "budget", "bracket": "any", "count": 3},
+                {"cardType": "lands", "budget": "any", "bracket": "any", "count": 2}
+            ]
+        }]
+    }
+    with patched(index, fetch_edhrec_data=recorder.fake('edhrec', FAKE_PAGE), _BASIC_LANDS_CACHE=set()):
+        packs = index.generate_packs('krenko-mob-boss', config)
+
+    print(f"  Packs generated: {len(packs)}")
+    print(f"  EDHRec fetches: {len(recorder.calls)}")
+    assert len(packs) == 5
+    # Commander header (bracket 2) + expensive + budget + any
+    assert recorder.count('edhrec') == 4, recorder.calls
+    print("  ✓ Each distinct page fetched once")
+    print()
+
+
+def test_prefetch_leaves_no_io_for_selection():
+    """All upstream fetches should happen in the prefetch pass"""
+    print("=== Testing prefetch planner ===")
+    recorder = FetchRecorder()
+    prefetched = []
+    original_prefetch = index.prefetch_upstream
+
+    def prefetch_then_mark(*args, **kwargs):
+        result = original_prefetch(*args, **kwargs)
+        prefetched.append(len(recorder.calls))
+        return result
+
+    deck = index.MoxfieldDeck.from_json('abc123', {
+        'name': 'Test Deck',
+        'boards': {'mainboard': {'cards': {
+            str(i): {'quantity': 1, 'card': {'name': f'Deck Card {i}', 'color_identity': []}} for i in range(30)
+        }}}
+    })
+    config = {
+        "packTypes": [
+            {"count": 3, "slots": [
+                {"cardType": "weighted", "budget": "budget", "bracket": "any", "count": 5},
+                {"cardType": "lands", "budget": "any", "bracket": "any", "count": 2}
+            ]},
+            {"source": "scryfall", "count": 1, "slots": [{"query": "banned:commander", "count": 1}]},
+            {"source": "moxfield", "count": 2, "useCommanderColorIdentity": True,
+             "slots": [{"deckUrl": "https://moxfield.com/decks/abc123", "count": 5}]}
+        ]
+    }
+    with patched(
+        index,
+        fetch_edhrec_data=recorder.fake('edhrec', FAKE_PAGE),
+        fetch_average_deck=recorder.fake('average_deck', {'Creature': 1.0}),
+        fetch_scryfall_cards_with_colors=recorder.fake('scryfall', [
+            {'name': f'Banned {i}', 'color_identity': ['R']} for i in range(10)
+        ]),
+        fetch_moxfield_deck=recorder.fake('moxfield', deck),
+        prefetch_upstream=prefetch_then_mark,
+        _BASIC_LANDS_CACHE=set(),
+    ):
+        plan = index.plan_upstream_fetches('krenko-mob-boss', config)
+        packs = index.generate_packs('krenko-mob-boss', config)
+
+    late_calls = recorder.calls[prefetched[0]:]
+    print(f"  Planned fetches: {len(plan)}")
+    print(f"  Packs generated: {len(packs)}")
+    print(f"  Fetches during selection: {late_calls}")
+    assert len(packs) == 6
+    assert packs[-1]['name'].startswith('Test Deck Card Set')
+    assert not late_calls
+    print("  ✓ Selection ran without further I/O")
+    print()
+
+
+def test_card_pool_joins_prefetched_lookups():
+    """Building a card pool waits for the prefetch's basic lands fetch instead of starting its own"""
+    print("=== Testing single-flight basic lands ===")
+    recorder = FetchRecorder()
+    entered = threading.Event()
+    release = threading.Event()
+
+    def slow_basic_lands():
+        entered.set()
+        release.wait(5)
+        return {'Land 0'}
+
+    with patched(index, get_basic_lands=recorder.fake('basic_lands', slow_basic_lands), _BASIC_LANDS_CACHE=None):
+        request_cache = index.RequestCache()
+        prefetch = threading.Thread(target=request_cache.get_basic_lands)
+        prefetch.start()
+        assert entered.wait(5)
+
+        pool = []
+        builder = threading.Thread(target=lambda: pool.extend(
+            index.process_cardlists(FAKE_PAGE['cardlists'], request_cache=request_cache)
+        ))
+        builder.start()
+        time.sleep(0.05)
+        release.set()
+        prefetch.join()
+        builder.join()
+
+    assert recorder.count('basic_lands') == 1, recorder.calls
+    assert len(pool) == 59 and 'Land 0' not in {card['name'] for card in pool}
+    print("  ✓ One basic lands fetch shared by the prefetch and the card pool")
+    print()
+
+
+if __name__ == "__main__":
+    test_edhrec_pages_fetched_once_per_request()
+    test_prefetch_leaves_no_io_for_selection()
+    test_card_pool_joins_prefetched_lookups()
@@ -0,0 +1,62 @@
+"""
+Test per-request timings: Server-Timing header, debug block and JSON log line (offline)
+"""
+
+import contextlib
+import io
+import json
+import sys
+import time
+sys.path.insert(0, 'api')
+
+import index
+from fake_upstream import fake_edhrec_page, local_server, patched, post_json
+
+
+FAKE_PAGE = fake_edhrec_page(creatures=40)
+
+CONFIG = {"packTypes": [
+    {"count": 2, "slots": [{"cardType": "creatures", "budget": "any", "bracket": "any", "count": 5}]},
+    {"source": "scryfall", "count": 1, "slots": [{"query": "t:goblin", "count": 2}]}
+]}
+
+
+def test_timings_reported():
+    """Pack requests report spans in a header, optionally in the body, and in one log line"""
+    print("=== Testing request timings ===")
+    log = io.StringIO()
+    fakes = {
+        'fetch_edhrec_data': lambda slug, bracket, budget: FAKE_PAGE,
+        'fetch_scryfall_cards_with_colors': lambda query: [{'name': f'Token {i}', 'color_identity': []} for i in range(10)],
+        '_BASIC_LANDS_CACHE': set(),
+    }
+    payload = {"commander_url": "https://edhrec.com/commanders/krenko-mob-boss", "config": CONFIG}
+    with local_server(index.handler) as port, patched(index, **fakes), contextlib.redirect_stdout(log):
+        response, body = post_json(port, '/api/generate-packs', payload)
+        debug_response, debug_body = post_json(port, '/api/generate-packs?timings=1', payload)
+        # The log line is written after the response, wait for the second one
+        deadline = time.time() + 5
+        while log.getvalue().count('{"event"') < 2 and time.time() < deadline:
+            time.sleep(0.01)
+
+    header = response.getheader('Server-Timing')
+    print(f"  Server-Timing: {header}")
+    names = {entry.split(';')[0].strip() for entry in header.split(',')}
+    assert {'parse', 'prefetch', 'fetch.edhrec', 'fetch.scryfall', 'card_pool', 'select', 'encode', 'total'} <= names, names
+    assert 'timings' not in json.loads(body)
+    print("  ✓ Server-Timing covers fetches and pipeline stages")
+
+    timings = json.loads(debug_body)['timings']
+    assert timings['select']['count'] == 3 and timings['fetch.edhrec']['count'] >= 1
+    print("  ✓ ?timings=1 adds a timings block")
+
+    lines = [json.loads(line) for line in log.getvalue().splitlines() if line.startswith('{"event"')]
+    assert len(lines) == 2
+    assert lines[0]['status'] == 200 and lines[0]['packs'] == 3
+    assert lines[0]['commander'] == 'krenko-mob-boss' and 'fetch.edhrec' in lines[0]['timings']
+    print("  ✓ One JSON log line per request")
+    print()
+
+
+if __name__ == "__main__":
+    test_timings_reported()
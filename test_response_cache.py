@@ -0,0 +1,168 @@
+"""
+Test the upstream response cache backends (offline)
+"""
+
+import contextlib
+import io
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+sys.path.insert(0, 'api')
+
+import index
+from index import ResponseCache, MemoryResponseCache, SQLiteResponseCache
+
+
+def check_backend(cache):
+    url = "https://json.edhrec.com/pages/commanders/the-ur-dragon.json"
+
+    assert cache.get(url, 'edhrec') is None
+    cache.set(url, 'edhrec', b'{"container": {}}')
+    assert cache.get(url, 'edhrec') == b'{"container": {}}'
+
+    counters = cache.stats()['sources']['edhrec']
+    print(f"  {type(cache).__name__}: {counters}")
+    assert counters['hits'] == 1
+    assert counters['misses'] == 1
+
+
+def test_memory_cache():
+    """Memory backend stores, hits and evicts least recently used bodies"""
+    print("=== Testing MemoryResponseCache ===")
+    check_backend(MemoryResponseCache())
+
+    cache = MemoryResponseCache(max_bytes=10)
+    cache.set('a', 'scryfall', b'12345')
+    cache.set('b', 'scryfall', b'12345')
+    cache.get('a', 'scryfall')  # 'a' is now most recently used
+    cache.set('c', 'scryfall', b'12345')
+    assert cache.get('a', 'scryfall') is not None
+    assert cache.get('b', 'scryfall') is None
+    print("  ✓ LRU eviction keeps recently used entries")
+    print()
+
+
+def test_sqlite_cache():
+    """SQLite backend persists across instances and honours TTLs"""
+    print("=== Testing SQLiteResponseCache ===")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, 'responses.sqlite3')
+        check_backend(SQLiteResponseCache(path))
+
+        reopened = SQLiteResponseCache(path)
+        assert reopened.get("https://json.edhrec.com/pages/commanders/the-ur-dragon.json", 'edhrec') is not None
+        print("  ✓ Entries survive reopening the cache file")
+
+        short_lived = SQLiteResponseCache(path, ttls={'moxfield': 1})
+        short_lived.set('deck', 'moxfield', b'{}')
+        time.sleep(1.1)
+        assert short_lived.get('deck', 'moxfield') is None
+        print("  ✓ Expired entries are not served")
+
+        small = SQLiteResponseCache(os.path.join(cache_dir, 'small.sqlite3'), max_bytes=10)
+        small.set('a', 'scryfall', b'12345')
+        time.sleep(0.01)
+        small.set('b', 'scryfall', b'12345')
+        time.sleep(0.01)
+        small.get('a', 'scryfall')
+        small.set('c', 'scryfall', b'12345')
+        assert small.get('a', 'scryfall') is not None
+        assert small.get('b', 'scryfall') is None
+        print("  ✓ LRU eviction keeps the cache under its size budget")
+    print()
+
+
+def test_sqlite_size_tracking():
+    """The stored size is tracked in memory and resynced with other writers"""
+    print("=== Testing SQLiteResponseCache size tracking ===")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, 'responses.sqlite3')
+        cache = SQLiteResponseCache(path)
+        cache.set('a', 'scryfall', b'12345')
+        cache.set('b', 'scryfall', b'123')
+        cache.set('a', 'scryfall', b'1')  # replacing an entry swaps its size
+        assert cache.total_bytes == cache._stored_bytes() == 4
+
+        other_process = SQLiteResponseCache(path)
+        other_process.set('c', 'scryfall', b'1234567890')
+        assert cache.total_bytes == 4
+        cache.writes_since_sync = cache.resync_interval
+        cache.set('d', 'scryfall', b'12')
+        assert cache.total_bytes == 16
+        print("  ✓ Running total matches the table and picks up other writers")
+    print()
+
+
+class BrokenCache(ResponseCache):
+    """Backend whose every read and write fails like a locked SQLite file"""
+
+    def get(self, url, source):
+        raise sqlite3.OperationalError('database is locked')
+
+    def set(self, url, source, body):
+        raise sqlite3.OperationalError('database is locked')
+
+
+class FakePool:
+    def get(self, url, headers=None, timeout=10):
+        return 200, b'{"ok": true}', {}
+
+
+def test_cache_errors_do_not_fail_fetches():
+    """fetch_json logs cache errors and still returns the upstream body"""
+    print("=== Testing cache errors in fetch_json ===")
+    original_pool = index.HTTP_POOL
+    index.HTTP_POOL = FakePool()
+    index.set_response_cache(BrokenCache())
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            assert index.fetch_json('https://api.scryfall.example/cards', 'scryfall') == {'ok': True}
+    finally:
+        index.HTTP_POOL = original_pool
+        index.set_response_cache(index.create_response_cache())
+    assert '[Cache] Read failed' in log.getvalue() and '[Cache] Write failed' in log.getvalue()
+    print("  ✓ Fetch succeeded with a failing cache, errors logged")
+    print()
+
+
+def test_disabled_cache():
+    """The base backend never stores anything"""
+    print("=== Testing disabled cache ===")
+    cache = ResponseCache()
+    cache.set('a', 'edhrec', b'{}')
+    assert cache.get('a', 'edhrec') is None
+    print("  ✓ Nothing is cached")
+    print()
+
+
+def test_import_creates_no_files():
+    """The default backend is in memory, SQLite only when RESPONSE_CACHE_BACKEND asks for it"""
+    print("=== Testing default backend ===")
+    script = "import sys; sys.path.insert(0, 'api'); import index; print(type(index.RESPONSE_CACHE).__name__)"
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {**os.environ, 'RESPONSE_CACHE_DIR': cache_dir}
+        env.pop('RESPONSE_CACHE_BACKEND', None)
+        default = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True, check=True)
+        assert default.stdout.strip().endswith('MemoryResponseCache'), default.stdout
+        assert os.listdir(cache_dir) == []
+        print("  ✓ Importing index.py leaves the cache directory empty")
+
+        env['RESPONSE_CACHE_BACKEND'] = 'sqlite'
+        opted_in = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True, check=True)
+        assert opted_in.stdout.strip().endswith('SQLiteResponseCache'), opted_in.stdout
+        assert 'responses.sqlite3' in os.listdir(cache_dir)
+        print("  ✓ RESPONSE_CACHE_BACKEND=sqlite opts in")
+    print()
+
+
+if __name__ == "__main__":
+    test_memory_cache()
+    test_sqlite_cache()
+    test_sqlite_size_tracking()
+    test_cache_errors_do_not_fail_fetches()
+    test_disabled_cache()
+    test_import_creates_no_files()
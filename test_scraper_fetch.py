@@ -0,0 +1,152 @@
+"""
+Test the scraper's rate limiting, retries and concurrent detail fetches (offline)
+"""
+
+import contextlib
+import io
+import json
+import random
+import threading
+import time
+import types
+from urllib.error import HTTPError
+
+import scrape_edhrec_api
+
+
+def detail_page(name):
+    return json.dumps({'container': {'json_dict': {'card': {
+        'name': name.replace('-', ' ').title(),
+        'color_identity': ['R'],
+        'cmc': 3.0,
+        'num_decks': 1000,
+        'salt': 0.5,
+    }}}}).encode('utf-8')
+
+
+class FlakyPool:
+    """Stands in for HTTP_POOL, raising the queued HTTP errors before answering"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=30):
+        self.calls += 1
+        if self.errors:
+            code = self.errors.pop(0)
+            raise HTTPError(url, code, 'Error', {}, io.BytesIO())
+        return 200, b'{"ok": true}', {}
+
+
+def test_top_commanders_in_rank_order():
+    """Detail pages finishing out of order still come back in rank order"""
+    print("=== Testing concurrent detail fetches ===")
+    active = {'now': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    def fake_fetch_url(url, headers=None):
+        with lock:
+            active['now'] += 1
+            active['peak'] = max(active['peak'], active['now'])
+        time.sleep(random.uniform(0, 0.02))
+        with lock:
+            active['now'] -= 1
+        name = url.rsplit('/', 1)[1][:-len('.json')]
+        return 200, detail_page(name), {}
+
+    original = scrape_edhrec_api.fetch_url
+    scrape_edhrec_api.fetch_url = fake_fetch_url
+    scrape_edhrec_api.configure_state(None)
+    try:
+        cardviews = [{'sanitized': f'commander-{i}', 'rank': i} for i in range(1, 41)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            commanders = scrape_edhrec_api.fetch_top_commanders(cardviews, workers=8)
+    finally:
+        scrape_edhrec_api.fetch_url = original
+
+    assert [c['rank'] for c in commanders] == list(range(1, 41))
+    assert [c['name'] for c in commanders] == [f'Commander {i}' for i in range(1, 41)]
+    assert commanders[0]['cmc'] == 3 and commanders[0]['colors'] == 'R'
+    assert 1 < active['peak'] <= 8, active
+    print(f"  ✓ 40 commanders in rank order, peak concurrency {active['peak']} (max 8)")
+    print()
+
+
+def test_retries_with_backoff():
+    """429 and 5xx responses are retried with growing delays, other errors are not"""
+    print("=== Testing fetch_url retries ===")
+    sleeps = []
+    original_time = scrape_edhrec_api.time
+    original_pool = scrape_edhrec_api.HTTP_POOL
+    scrape_edhrec_api.time = types.SimpleNamespace(
+        sleep=sleeps.append, time=time.time, monotonic=time.monotonic
+    )
+    scrape_edhrec_api.configure_fetching(rate_limit=0, retries=3)
+    try:
+        scrape_edhrec_api.HTTP_POOL = FlakyPool([429, 503, 502])
+        status, body, _ = scrape_edhrec_api.fetch_url('https://json.edhrec.example/page.json')
+        assert status == 200 and body == b'{"ok": true}'
+        assert scrape_edhrec_api.HTTP_POOL.calls == 4 and len(sleeps) == 3
+        backoff = scrape_edhrec_api.RETRY_BACKOFF
+        for attempt, delay in enumerate(sleeps):
+            assert 0.5 * backoff * 2 ** attempt <= delay <= 1.5 * backoff * 2 ** attempt, sleeps
+        print(f"  ✓ Succeeded after 3 retries, delays {[round(d, 2) for d in sleeps]}")
+
+        sleeps.clear()
+        scrape_edhrec_api.HTTP_POOL = FlakyPool([500] * 4)
+        assert scrape_edhrec_api.fetch_url('https://json.edhrec.example/page.json') is None
+        assert scrape_edhrec_api.HTTP_POOL.calls == 4 and len(sleeps) == 3
+        print("  ✓ Gives up after MAX_RETRIES")
+
+        sleeps.clear()
+        scrape_edhrec_api.HTTP_POOL = FlakyPool([404])
+        assert scrape_edhrec_api.fetch_url('https://json.edhrec.example/page.json') is None
+        assert scrape_edhrec_api.HTTP_POOL.calls == 1 and not sleeps
+        print("  ✓ 404 is not retried")
+    finally:
+        scrape_edhrec_api.time = original_time
+        scrape_edhrec_api.configure_fetching(scrape_edhrec_api.DEFAULT_RATE_LIMIT, scrape_edhrec_api.DEFAULT_RETRIES)
+        scrape_edhrec_api.HTTP_POOL = original_pool
+    print()
+
+
+def test_token_bucket_rate():
+    """Requests beyond the burst are spaced at the configured rate across threads"""
+    print("=== Testing token bucket ===")
+    bucket = scrape_edhrec_api.TokenBucket(rate=50, capacity=1)
+    started = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            bucket.acquire()
+            with lock:
+                started.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    begin = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - begin
+
+    # 20 tokens with a burst of 1 need at least 19 refills at 50/s
+    assert len(started) == 20
+    assert elapsed >= 19 / 50 * 0.95, elapsed
+    print(f"  ✓ 20 acquires across 4 threads took {elapsed:.2f}s (>= {19 / 50:.2f}s)")
+
+    unlimited = scrape_edhrec_api.TokenBucket(rate=0)
+    begin = time.monotonic()
+    for _ in range(1000):
+        unlimited.acquire()
+    assert time.monotonic() - begin < 0.1
+    print("  ✓ rate=0 disables limiting")
+    print()
+
+
+if __name__ == "__main__":
+    test_top_commanders_in_rank_order()
+    test_retries_with_backoff()
+    test_token_bucket_rate()
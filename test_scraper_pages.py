@@ -0,0 +1,135 @@
+"""
+Test the scraper's page prefetching and shared detail cache (offline)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import scrape_edhrec_api
+
+
+URL_CONFIG = {
+    'first': 'https://edhrec.example/first.json',
+    'paged': 'https://edhrec.example/page-{page}.json',
+}
+
+
+class FakePages:
+    """Stands in for fetch_page, recording which pages were requested"""
+
+    def __init__(self, blocked=()):
+        self.requested = []
+        self.blocked = set(blocked)
+        self.gate = threading.Event()
+        self.lock = threading.Lock()
+
+    def __call__(self, url, derive):
+        page = 0 if url == URL_CONFIG['first'] else int(url.rsplit('-', 1)[1][:-len('.json')])
+        with self.lock:
+            self.requested.append(page)
+        if page in self.blocked:
+            self.gate.wait(5)
+        return {'page': page}
+
+    def pages(self):
+        with self.lock:
+            return sorted(self.requested)
+
+
+class SingleWorkerExecutor(ThreadPoolExecutor):
+    """One worker, so prefetched pages beyond the first really sit in the queue"""
+
+    def __init__(self, max_workers=None):
+        super().__init__(max_workers=1)
+
+
+def test_prefetch_window():
+    """Paginated pages start only when asked for, and stay `prefetch` ahead"""
+    print("=== Testing iter_pages prefetch window ===")
+    fake = FakePages()
+    original = scrape_edhrec_api.fetch_page
+    scrape_edhrec_api.fetch_page = fake
+    try:
+        pages = scrape_edhrec_api.iter_pages(URL_CONFIG, max_pages=10, prefetch=3)
+        assert next(pages) == (0, {'page': 0})
+        time.sleep(0.05)
+        assert fake.pages() == [0]
+        print("  ✓ Only the first page fetched before page 1 is requested")
+
+        assert next(pages) == (1, {'page': 1})
+        time.sleep(0.05)
+        assert fake.pages() == [0, 1, 2, 3]
+        assert next(pages) == (2, {'page': 2})
+        time.sleep(0.05)
+        assert fake.pages() == [0, 1, 2, 3, 4]
+        print("  ✓ Three pages kept in flight ahead of the consumer")
+
+        assert [page for page, _ in pages] == list(range(3, 11))
+        assert fake.pages() == list(range(11))
+        print("  ✓ Pages yielded in order up to max_pages")
+    finally:
+        scrape_edhrec_api.fetch_page = original
+    print()
+
+
+def test_close_cancels_pending():
+    """Closing the generator early cancels prefetched pages that have not started"""
+    print("=== Testing iter_pages early close ===")
+    fake = FakePages(blocked={2})
+    originals = (scrape_edhrec_api.fetch_page, scrape_edhrec_api.ThreadPoolExecutor)
+    scrape_edhrec_api.fetch_page = fake
+    scrape_edhrec_api.ThreadPoolExecutor = SingleWorkerExecutor
+    try:
+        pages = scrape_edhrec_api.iter_pages(URL_CONFIG, max_pages=10, prefetch=3)
+        next(pages)
+        assert next(pages) == (1, {'page': 1})
+        # Page 2 holds the only worker, page 3 is queued behind it
+        deadline = time.time() + 5
+        while 2 not in fake.pages() and time.time() < deadline:
+            time.sleep(0.01)
+        pages.close()
+        fake.gate.set()
+        time.sleep(0.05)
+    finally:
+        scrape_edhrec_api.fetch_page, scrape_edhrec_api.ThreadPoolExecutor = originals
+
+    assert fake.pages() == [0, 1, 2], fake.pages()
+    print(f"  ✓ Requested pages {fake.pages()}, queued page 3 cancelled")
+    print()
+
+
+def test_detail_cache_dedupes_in_flight():
+    """Concurrent lookups of one commander share a single download"""
+    print("=== Testing DetailCache ===")
+    calls = []
+    lock = threading.Lock()
+
+    def fake_detail(sanitized_name):
+        with lock:
+            calls.append(sanitized_name)
+        time.sleep(0.05)
+        return {'name': sanitized_name}
+
+    original = scrape_edhrec_api.fetch_commander_detail
+    scrape_edhrec_api.fetch_commander_detail = fake_detail
+    try:
+        cache = scrape_edhrec_api.DetailCache()
+        names = ['krenko-mob-boss'] * 10 + ['atraxa-grand-unifier'] * 5
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            results = list(executor.map(cache.get, names))
+        assert cache.get('krenko-mob-boss') is results[0]
+    finally:
+        scrape_edhrec_api.fetch_commander_detail = original
+
+    assert sorted(calls) == ['atraxa-grand-unifier', 'krenko-mob-boss'], calls
+    assert cache.fetches == 2 and cache.hits == 14
+    assert all(result['name'] == name for result, name in zip(results, names))
+    print(f"  ✓ {len(names) + 1} lookups, {cache.fetches} downloads")
+    print()
+
+
+if __name__ == "__main__":
+    test_prefetch_window()
+    test_close_cancels_pending()
+    test_detail_cache_dedupes_in_flight()
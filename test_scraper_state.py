@@ -0,0 +1,130 @@
+"""
+Test the scraper's conditional-request state and commander diffs (offline)
+"""
+
+import contextlib
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import scrape_edhrec_api
+
+
+def row(rank, name, decks):
+    return {
+        "rank": rank, "colors": "R", "cmc": 3, "name": name, "rarity": "rare",
+        "type": "Creature", "cardkingdom": "", "tcgplayer": "", "face2face": "",
+        "cardmarket": "", "cardhoarder": "", "salt": 0.5, "num_decks": decks,
+    }
+
+
+class ConditionalUpstream:
+    """Stands in for fetch_url, answering 304 when the ETag matches"""
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    def __call__(self, url, headers=None):
+        headers = headers or {}
+        self.requests.append(headers)
+        if headers.get("If-None-Match") == self.etag:
+            return 304, b"", {"ETag": self.etag}
+        return 200, self.body, {"ETag": self.etag}
+
+
+def test_not_modified_reuses_state():
+    """A 304 returns the stored value without parsing, and state survives a reload"""
+    print("=== Testing conditional page fetches ===")
+    url = "https://json.edhrec.example/pages/commanders/year.json"
+    upstream = ConditionalUpstream(b'{"cardviews": [1, 2, 3]}', '"v1"')
+    derived = []
+
+    def derive(data):
+        derived.append(data)
+        return {"count": len(data["cardviews"])}
+
+    original = scrape_edhrec_api.fetch_url
+    scrape_edhrec_api.fetch_url = upstream
+    with tempfile.TemporaryDirectory() as state_dir:
+        path = Path(state_dir) / "state.json"
+        try:
+            scrape_edhrec_api.configure_state(path)
+            assert scrape_edhrec_api.fetch_page(url, derive) == {"count": 3}
+            assert upstream.requests[0] == {} and len(derived) == 1
+            scrape_edhrec_api.STATE.save()
+
+            # Next run: validators sent, 304 answered from the saved state
+            scrape_edhrec_api.configure_state(path)
+            assert scrape_edhrec_api.fetch_page(url, derive) == {"count": 3}
+            assert upstream.requests[1] == {"If-None-Match": '"v1"'}
+            assert len(derived) == 1
+            assert scrape_edhrec_api.STATE.counts["not_modified"] == 1
+            print("  ✓ 304 served from saved state without parsing")
+
+            # Same body under a new ETag: hash matches, still no parse
+            upstream.etag = '"v2"'
+            assert scrape_edhrec_api.fetch_page(url, derive) == {"count": 3}
+            assert len(derived) == 1 and scrape_edhrec_api.STATE.counts["unchanged"] == 1
+            assert scrape_edhrec_api.STATE.get(url)["etag"] == '"v2"'
+            print("  ✓ Unchanged body detected by hash")
+
+            # Entries not seen for STATE_MAX_AGE are dropped on save
+            scrape_edhrec_api.STATE.put("https://old.example", {
+                "value": 1, "checked_at": time.time() - scrape_edhrec_api.STATE_MAX_AGE - 1
+            }, "changed")
+            scrape_edhrec_api.STATE.save()
+            assert set(json.loads(path.read_text())["urls"]) == {url}
+            print("  ✓ Stale URLs pruned from the state file")
+        finally:
+            scrape_edhrec_api.fetch_url = original
+            scrape_edhrec_api.configure_state(None)
+    print()
+
+
+def test_diff_against_previous_csv():
+    """Added, removed and moved commanders are reported against the last CSV"""
+    print("=== Testing commander diff ===")
+    with tempfile.TemporaryDirectory() as data_dir:
+        csv_path = Path(data_dir) / "top_commanders_week.csv"
+        assert scrape_edhrec_api.read_previous_csv(csv_path) is None
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            scrape_edhrec_api.write_csv([
+                row(1, "Krenko, Mob Boss", 900),
+                row(2, "Atraxa, Grand Unifier", 800),
+                row(3, "Edgar Markov", 700),
+            ], csv_path)
+        previous = scrape_edhrec_api.read_previous_csv(csv_path)
+        assert previous["Edgar Markov"]["Rank"] == "3"
+
+        changes = scrape_edhrec_api.diff_commanders(previous, [
+            row(1, "Atraxa, Grand Unifier", 800),
+            row(2, "Krenko, Mob Boss", 950),
+            row(3, "The Ur-Dragon", 650),
+        ])
+        assert changes == {
+            "added": [{"name": "The Ur-Dragon", "rank": "3", "decks": "650"}],
+            "removed": [{"name": "Edgar Markov", "rank": "3", "decks": "700"}],
+            "changed": [
+                {"name": "Atraxa, Grand Unifier", "rank": ["2", "1"]},
+                {"name": "Krenko, Mob Boss", "rank": ["1", "2"], "decks": ["900", "950"]},
+            ],
+        }, changes
+        print("  ✓ Added, removed and rank/deck changes detected")
+
+        changes_path = Path(data_dir) / "top_commanders_week_changes.json"
+        with contextlib.redirect_stdout(io.StringIO()):
+            scrape_edhrec_api.write_changes({"timeframe": "week", **changes}, changes_path)
+        written = json.loads(changes_path.read_text(encoding="utf-8"))
+        assert written["timeframe"] == "week" and written["added"] == changes["added"]
+        print("  ✓ Diff written as JSON")
+    print()
+
+
+if __name__ == "__main__":
+    test_not_modified_reuses_state()
+    test_diff_against_previous_csv()
@@ -0,0 +1,110 @@
+"""
+Test that --timeframe all writes the same files as one run per timeframe (offline)
+"""
+
+import contextlib
+import csv
+import io
+import json
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+import scrape_edhrec_api
+
+
+COMMANDERS = ['krenko-mob-boss', 'atraxa-grand-unifier', 'edgar-markov', 'the-ur-dragon', 'kenrith-the-returned-king']
+
+# Each timeframe ranks the same commanders differently, so detail pages overlap
+ORDER = {
+    '2year': [0, 1, 2, 3, 4],
+    'month': [3, 0, 4, 1, 2],
+    'week': [4, 3, 2, 1, 0],
+}
+
+PAGED_RE = re.compile(r'(year-past2years|month-pastmonth|week-pastweek)-(\d+)\.json$')
+PAGED_TIMEFRAMES = {'year-past2years': '2year', 'month-pastmonth': 'month', 'week-pastweek': 'week'}
+
+
+def card(slug, rank=None):
+    data = {
+        'sanitized': slug,
+        'name': slug.replace('-', ' ').title(),
+        'color_identity': ['R', 'W', 'B'] if slug == 'the-ur-dragon' else ['G', 'U'],
+        'cmc': 0.0 if slug == 'edgar-markov' else 4.0,
+        'rarity': 'Mythic',
+        'primary_type': 'Creature',
+        'prices': {'cardkingdom': {'price': 1.99}, 'tcgplayer': None},
+        'salt': 0.0,
+        'num_decks': 1000 + len(slug),
+        'inclusion': 1000 + len(slug),
+    }
+    if rank is not None:
+        data['rank'] = rank
+    return data
+
+
+def fake_fetch_url(url, headers=None):
+    """Serve first pages, paginated pages and detail pages for every timeframe"""
+    if '/_next/data/' in url:
+        timeframe = 'week' if 'week' in url else 'month' if 'month' in url else '2year'
+        cardviews = [card(COMMANDERS[i], rank) for rank, i in enumerate(ORDER[timeframe][:3], 1)]
+        body = {'pageProps': {'data': {'container': {'json_dict': {'cardlists': [
+            {'cardviews': cardviews, 'more': 'yes'}
+        ]}}}}}
+    elif PAGED_RE.search(url):
+        prefix, page = PAGED_RE.search(url).groups()
+        timeframe = PAGED_TIMEFRAMES[prefix]
+        if page != '1':
+            return None
+        body = {'cardviews': [card(COMMANDERS[i], rank) for rank, i in enumerate(ORDER[timeframe][3:], 4)]}
+    else:
+        slug = url.rsplit('/', 1)[1][:-len('.json')]
+        body = {'container': {'json_dict': {'card': card(slug)}}}
+    return 200, json.dumps(body).encode('utf-8'), {}
+
+
+def run_scraper(*args):
+    argv = sys.argv
+    sys.argv = ['scrape_edhrec_api.py', '--no-state', '--rate-limit', '0', '--max-pages', '3', *args]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            scrape_edhrec_api.main()
+    finally:
+        sys.argv = argv
+
+
+def test_all_matches_separate_runs():
+    """One --timeframe all run and three single-timeframe runs produce identical CSV and index files"""
+    print("=== Testing --timeframe all ===")
+    original = scrape_edhrec_api.fetch_url
+    scrape_edhrec_api.fetch_url = fake_fetch_url
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            combined, separate = Path(tmp) / 'all', Path(tmp) / 'separate'
+            run_scraper('--timeframe', 'all', '--output-dir', str(combined))
+            for timeframe in scrape_edhrec_api.ALL_TIMEFRAMES:
+                run_scraper('--timeframe', timeframe, '--output-dir', str(separate))
+
+            files = sorted(path.name for path in combined.iterdir())
+            assert files == sorted(path.name for path in separate.iterdir())
+            assert len(files) == 6, files
+            for name in files:
+                assert (combined / name).read_bytes() == (separate / name).read_bytes(), name
+
+            with open(combined / 'top_commanders_week.csv', encoding='utf-8', newline='') as f:
+                week = list(csv.DictReader(f))
+            assert [row['Name'] for row in week][:3] == ['Kenrith The Returned King', 'The Ur Dragon', 'Edgar Markov']
+            assert week[2]['CMC'] == '0.0' and week[1]['Colors'] == 'R,W,B'
+    finally:
+        scrape_edhrec_api.fetch_url = original
+        scrape_edhrec_api.configure_fetching(scrape_edhrec_api.DEFAULT_RATE_LIMIT, scrape_edhrec_api.DEFAULT_RETRIES)
+        scrape_edhrec_api.configure_state(None)
+
+    print(f"  ✓ {len(files)} files byte-identical: {', '.join(files)}")
+    print()
+
+
+if __name__ == "__main__":
+    test_all_matches_separate_runs()
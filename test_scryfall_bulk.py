@@ -0,0 +1,168 @@
+"""
+Test offline Scryfall query evaluation against bulk data (offline)
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, 'api')
+
+import index
+from index import ScryfallBulkIndex, UnsupportedScryfallQuery, build_scryfall_query
+
+
+def card(name, type_line, color_identity=(), oracle_text='', usd=None, **extra):
+    data = {
+        'name': name,
+        'layout': 'normal',
+        'type_line': type_line,
+        'oracle_text': oracle_text,
+        'color_identity': list(color_identity),
+        'prices': {'usd': usd},
+        'legalities': {'commander': 'legal', 'duel': 'legal'},
+        'set': 'cmm'
+    }
+    data.update(extra)
+    return data
+
+
+BULK_CARDS = [
+    card('Sol Ring', 'Artifact', oracle_text='{T}: Add {C}{C}.', usd='1.50', game_changer=True),
+    card('Command Tower', 'Land', oracle_text='{T}: Add one mana of any color in your commander\'s color identity.', usd='0.25'),
+    card('Gaea\'s Cradle', 'Legendary Land', oracle_text='{T}: Add {G} for each creature you control.', usd='900.00', color_identity=['G']),
+    card('Forest', 'Basic Land — Forest', oracle_text='({T}: Add {G}.)', color_identity=['G']),
+    card('Power Play', 'Conspiracy', oracle_text='You start the game.'),
+    card('Playtest Plot', 'Conspiracy', promo_types=['playtest']),
+    card('Marchesa\'s Surprise Party', 'Conspiracy', set='mb2'),
+    card('Iona, Shield of Emeria', 'Legendary Creature — Angel', color_identity=['W'],
+         legalities={'commander': 'banned', 'duel': 'banned'}),
+    card('Prophet of Kruphix', 'Creature — Human Wizard', color_identity=['U', 'G'],
+         legalities={'commander': 'banned', 'duel': 'legal'}),
+    card('Goblin Token', 'Token Creature — Goblin', layout='token'),
+]
+
+CONSPIRACY_URL = 'https://scryfall.com/search?q=%28t%3Aconspiracy+-is%3Aplaytest%29+OR+%28set%3Amb2+name%3A%22Marchesa%27s+Surprise+Party%22%29&unique=cards&as=grid&order=name'
+BANNED_URL = 'https://scryfall.com/search?q=banned%3Acommander+-f%3Aduel&unique=cards&as=grid&order=name'
+LANDS_URL = 'https://scryfall.com/search?q=t%3Aland+%28o%3A%22add+%7B%22+OR+o%3A%22mana+of+any%22%29+usd%3E10&unique=cards&as=grid&order=usd'
+
+
+def test_special_pack_queries():
+    """The special pack queries resolve locally with the automatic filters applied"""
+    print("=== Testing special pack queries ===")
+    original = (index._SCRYFALL_BULK_INDEX, index.SCRYFALL_BULK_PATH)
+    index._SCRYFALL_BULK_INDEX = ScryfallBulkIndex(BULK_CARDS)
+    index.SCRYFALL_BULK_PATH = 'in-memory'
+    try:
+        conspiracies = index.fetch_scryfall_cards(build_scryfall_query(CONSPIRACY_URL, ['R']))
+        banned = index.fetch_scryfall_cards(build_scryfall_query(BANNED_URL, ['W']))
+        lands = index.fetch_scryfall_cards_with_colors(build_scryfall_query(LANDS_URL, ['G']))
+        game_changers = index.fetch_scryfall_cards('is:gamechanger')
+        basics = index.fetch_scryfall_cards('type:land type:basic')
+    finally:
+        index._SCRYFALL_BULK_INDEX, index.SCRYFALL_BULK_PATH = original
+
+    print(f"  Conspiracies: {conspiracies}")
+    print(f"  Banned (W): {banned}")
+    print(f"  Expensive lands (G): {lands}")
+    assert conspiracies == ["Marchesa's Surprise Party", 'Power Play']
+    assert banned == ['Iona, Shield of Emeria']
+    assert lands == [{'name': "Gaea's Cradle", 'color_identity': ['G']}]
+    assert game_changers == ['Sol Ring']
+    assert basics == ['Forest']
+    print("  ✓ Queries resolved without network access")
+    print()
+
+
+def test_unsupported_syntax():
+    """Syntax we can't evaluate is reported so callers fall back to the API"""
+    print("=== Testing unsupported syntax ===")
+    bulk_index = ScryfallBulkIndex(BULK_CARDS)
+    for query in ['pow>=5', 'is:commander', 'commander:esper', '(t:land']:
+        try:
+            bulk_index.search(query)
+        except UnsupportedScryfallQuery as e:
+            print(f"  ✓ {query!r}: {e}")
+        else:
+            raise AssertionError(f"{query} should be unsupported")
+    print()
+
+
+def test_query_cache_bounded_and_reset():
+    """Memoized queries are capped, and a changed bulk file starts a fresh cache"""
+    print("=== Testing bulk query cache ===")
+    bulk_index = ScryfallBulkIndex(BULK_CARDS, max_queries=2)
+    bulk_index.search('t:land')
+    bulk_index.search('t:conspiracy')
+    bulk_index.search('t:land')  # most recently used again
+    bulk_index.search('is:gamechanger')
+    assert list(bulk_index.query_cache) == ['t:land', 'is:gamechanger']
+    print("  ✓ LRU keeps the 2 most recent queries")
+
+    original = (index._SCRYFALL_BULK_INDEX, index.SCRYFALL_BULK_PATH, index.SCRYFALL_BULK_RECHECK_INTERVAL)
+    with tempfile.TemporaryDirectory() as bulk_dir:
+        path = os.path.join(bulk_dir, 'oracle-cards.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(BULK_CARDS, f)
+        index._SCRYFALL_BULK_INDEX = None
+        index.SCRYFALL_BULK_PATH = path
+        index.SCRYFALL_BULK_RECHECK_INTERVAL = 0
+        try:
+            first = index.get_scryfall_bulk_index()
+            assert first.search_cards('t:artifact', False) == ['Sol Ring']
+            assert index.get_scryfall_bulk_index() is first
+
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(BULK_CARDS + [card('Mana Crypt', 'Artifact')], f)
+            os.utime(path, (first.mtime + 10, first.mtime + 10))
+
+            reloaded = index.get_scryfall_bulk_index()
+            assert reloaded is not first and not reloaded.query_cache
+            assert reloaded.search_cards('t:artifact', False) == ['Mana Crypt', 'Sol Ring']
+        finally:
+            index._SCRYFALL_BULK_INDEX, index.SCRYFALL_BULK_PATH, index.SCRYFALL_BULK_RECHECK_INTERVAL = original
+    print("  ✓ Changed bulk file reloaded with an empty query cache")
+    print()
+
+
+def test_failed_load_retried():
+    """A bulk file that fails to load is retried on the next recheck instead of disabled"""
+    print("=== Testing bulk load retry ===")
+    original = (index._SCRYFALL_BULK_INDEX, index._SCRYFALL_BULK_FAILED_AT,
+                index.SCRYFALL_BULK_PATH, index.SCRYFALL_BULK_RECHECK_INTERVAL)
+    with tempfile.TemporaryDirectory() as bulk_dir:
+        path = os.path.join(bulk_dir, 'oracle-cards.json')
+        index._SCRYFALL_BULK_INDEX = None
+        index._SCRYFALL_BULK_FAILED_AT = None
+        index.SCRYFALL_BULK_PATH = path
+        index.SCRYFALL_BULK_RECHECK_INTERVAL = 60
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert index.get_scryfall_bulk_index() is None
+            assert index.SCRYFALL_BULK_PATH == path and index._SCRYFALL_BULK_FAILED_AT is not None
+
+            # Within the recheck interval the failure is remembered, not retried
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(BULK_CARDS, f)
+            assert index.get_scryfall_bulk_index() is None
+            print("  ✓ Missing file falls back to the API until the next check")
+
+            index._SCRYFALL_BULK_FAILED_AT -= 61
+            with contextlib.redirect_stdout(io.StringIO()):
+                loaded = index.get_scryfall_bulk_index()
+            assert loaded is not None and loaded.search_cards('t:artifact', False) == ['Sol Ring']
+            assert index._SCRYFALL_BULK_FAILED_AT is None
+            print("  ✓ File loaded once it appears")
+        finally:
+            (index._SCRYFALL_BULK_INDEX, index._SCRYFALL_BULK_FAILED_AT,
+             index.SCRYFALL_BULK_PATH, index.SCRYFALL_BULK_RECHECK_INTERVAL) = original
+    print()
+
+
+if __name__ == "__main__":
+    test_special_pack_queries()
+    test_unsupported_syntax()
+    test_query_cache_bounded_and_reset()
+    test_failed_load_retried()
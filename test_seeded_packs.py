@@ -0,0 +1,101 @@
+"""
+Test seeded pack generation and the seeded result cache (offline)
+"""
+
+import sys
+sys.path.insert(0, 'api')
+
+import index
+from fake_upstream import FetchRecorder, fake_edhrec_page, patched
+
+
+FAKE_PAGE = fake_edhrec_page(creatures=60, instants=60)
+
+CONFIG = {"packTypes": [
+    {"count": 3, "slots": [
+        {"cardType": "weighted", "budget": "any", "bracket": "any", "count": 5},
+        {"cardType": "instants", "budget": "any", "bracket": "any", "count": 2}
+    ]},
+    {"source": "scryfall", "count": 1, "slots": [{"query": "t:goblin", "count": 4}]}
+]}
+
+SLUG = 'krenko-mob-boss'
+
+
+def test_same_seed_same_packs():
+    """A seed pins every draw, and replays come from the cache"""
+    print("=== Testing seeded pack generation ===")
+    recorder = FetchRecorder()
+    with patched(
+        index,
+        fetch_edhrec_data=recorder.fake('edhrec', FAKE_PAGE),
+        fetch_average_deck=recorder.fake('average_deck', None),
+        fetch_scryfall_cards_with_colors=recorder.fake('scryfall', [
+            {'name': f'Token {i}', 'color_identity': ['R'] if i % 2 else []} for i in range(30)
+        ]),
+        _BASIC_LANDS_CACHE=set(),
+        SEEDED_PACK_CACHE=index.SeededPackCache(),
+    ):
+        first = index.generate_packs(SLUG, CONFIG, seed='ABC123')
+        assert recorder.calls, "first seeded request should fetch upstream"
+
+        # Same seed without the cache draws the same cards
+        index.SEEDED_PACK_CACHE = index.SeededPackCache(max_entries=0)
+        again = index.generate_packs(SLUG, CONFIG, seed='ABC123')
+        assert again == first
+        print("  ✓ Same seed drew identical packs")
+
+        other = index.generate_packs(SLUG, CONFIG, seed='XYZ789')
+        assert other != first
+        print("  ✓ Different seed drew different packs")
+
+        # A cached replay makes no upstream calls and returns a fresh copy
+        index.SEEDED_PACK_CACHE = index.SeededPackCache()
+        index.generate_packs(SLUG, CONFIG, seed=42)
+        recorder.calls.clear()
+        replay = index.generate_packs(SLUG, CONFIG, seed=42)
+        assert recorder.calls == []
+        replay[0]['cards'].clear()
+        assert index.generate_packs(SLUG, CONFIG, seed=42)[0]['cards']
+        stats = index.SEEDED_PACK_CACHE.stats()
+        assert stats['hits'] == 2 and stats['entries'] == 1, stats
+        print("  ✓ Replay served from cache without fetching")
+
+        # Streaming with a seed yields the same packs as the list form
+        streamed = list(index.iter_packs(SLUG, CONFIG, stream=True, seed='ABC123'))
+        assert streamed == first
+        print("  ✓ Streamed seeded packs match")
+    print()
+
+
+def test_cache_bounds_and_seed_validation():
+    """The LRU stays bounded and bad seeds are rejected"""
+    print("=== Testing seeded cache bounds ===")
+    cache = index.SeededPackCache(max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, [{'name': key, 'cards': [key]}])
+    assert cache.get('a') is None and cache.get('c') == [{'name': 'c', 'cards': ['c']}]
+    assert cache.stats()['entries'] == 2
+    print("  ✓ Least recently used entry evicted")
+
+    config_a = {"packTypes": [{"count": 1, "slots": []}], "x": 1}
+    config_b = {"x": 1, "packTypes": [{"count": 1, "slots": []}]}
+    assert index.seeded_pack_key(SLUG, config_a, 2, 7) == index.seeded_pack_key(SLUG, config_b, 2, 7)
+    assert index.seeded_pack_key(SLUG, config_a, 2, 7) != index.seeded_pack_key(SLUG, config_a, 2, '7')
+    print("  ✓ Keys ignore config key order")
+
+    for bad in (True, 1.5, ['a'], 'x' * (index.MAX_SEED_LENGTH + 1)):
+        try:
+            index.validate_seed(bad)
+        except index.PackRequestError as e:
+            assert e.status_code == 400
+        else:
+            raise AssertionError(f"seed {bad!r} should be rejected")
+    assert index.validate_seed('ABC123') == 'ABC123' and index.validate_seed(5) == 5
+    print("  ✓ Invalid seeds rejected")
+    print()
+
+
+if __name__ == "__main__":
+    test_same_seed_same_packs()
+    test_cache_bounds_and_seed_validation()
@@ -0,0 +1,86 @@
+"""
+Test average-deck type weights and their cache (offline)
+"""
+
+import io
+import random
+import sys
+import urllib.error
+sys.path.insert(0, 'api')
+
+import index
+
+
+AVERAGE_DECK = {'pageProps': {'data': {
+    'creature': 30, 'instant': 10, 'sorcery': 10, 'artifact': 10,
+    'enchantment': 0, 'planeswalker': 0, 'battle': 0
+}}}
+
+
+def test_distribution_and_draws():
+    """Weights are normalized and draws follow them"""
+    print("=== Testing type weights ===")
+    weights = index.TypeWeights({'Creature': 30, 'Instant': 10, 'Sorcery': 10, 'Artifact': 10, 'Battle': 0})
+    assert weights.types == ('Creature', 'Instant', 'Sorcery', 'Artifact')
+    assert abs(weights.cumulative[-1] - 1.0) < 1e-9
+    assert abs(weights.as_dict()['Creature'] - 0.5) < 1e-9
+
+    rng = random.Random(1)
+    draws = [weights.pick(rng) for _ in range(6000)]
+    assert 2700 < draws.count('Creature') < 3300, draws.count('Creature')
+    assert 'Battle' not in draws
+
+    # Plain dicts still work, and empty distributions fall back to Creature
+    assert index.select_weighted_type({'Instant': 1.0}) == 'Instant'
+    assert index.select_weighted_type({}) == 'Creature'
+    assert not index.TypeWeights({'Creature': 0})
+    print("  ✓ Normalized distribution drawn by bisect")
+    print()
+
+
+def test_fetch_is_cached():
+    """Each (commander, bracket) is fetched once, and 404s are remembered"""
+    print("=== Testing type weights cache ===")
+    calls = []
+
+    def fake_fetch_json(url, source, timeout=10):
+        calls.append(url)
+        if 'missing-commander' in url:
+            raise urllib.error.HTTPError(url, 404, 'Not Found', {}, io.BytesIO())
+        if 'flaky-commander' in url:
+            raise urllib.error.URLError('timed out')
+        return AVERAGE_DECK
+
+    original = index.fetch_json
+    index.fetch_json = fake_fetch_json
+    index.TYPE_WEIGHTS_CACHE = index.TypeWeightsCache()
+    try:
+        first = index.fetch_average_deck('krenko-mob-boss', 2)
+        for _ in range(10):
+            assert index.fetch_average_deck('krenko-mob-boss', 2) is first
+        assert len(calls) == 1
+        assert abs(first['Creature'] - 0.5) < 1e-9 and first['Battle'] == 0
+        index.fetch_average_deck('krenko-mob-boss', 3)
+        assert len(calls) == 2
+        print("  ✓ Repeat lookups served from cache")
+
+        calls.clear()
+        assert index.fetch_average_deck('missing-commander', 2) is None
+        assert index.fetch_average_deck('missing-commander', 2) is None
+        assert len(calls) == 1
+        print("  ✓ 404 cached as a miss")
+
+        calls.clear()
+        index.fetch_average_deck('flaky-commander', 2)
+        index.fetch_average_deck('flaky-commander', 2)
+        assert len(calls) == 2
+        print("  ✓ Network errors are not cached")
+    finally:
+        index.fetch_json = original
+        index.TYPE_WEIGHTS_CACHE = index.TypeWeightsCache()
+    print()
+
+
+if __name__ == "__main__":
+    test_distribution_and_draws()
+    test_fetch_is_cached()
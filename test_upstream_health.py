@@ -0,0 +1,112 @@
+"""
+Test the upstream circuit breaker and failed-URL cache (offline)
+"""
+
+import io
+import json
+import sys
+import urllib.error
+sys.path.insert(0, 'api')
+
+import index
+
+
+class FakePool:
+    """Stands in for HTTP_POOL, answering with responder(url)"""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=10):
+        self.calls.append(url)
+        return 200, self.responder(url), {}
+
+
+def install(responder):
+    """Route upstream requests through responder(url) and return the list of URLs hit"""
+    original = index.HTTP_POOL
+    index.HTTP_POOL = FakePool(responder)
+    index.set_response_cache(index.ResponseCache())
+    return index.HTTP_POOL.calls, original
+
+
+def test_circuit_opens_and_recovers():
+    """Repeated timeouts open the circuit; a trial after the cooldown closes it"""
+    print("=== Testing upstream circuit breaker ===")
+    healthy = {'up': False}
+
+    def responder(url):
+        if not healthy['up']:
+            raise urllib.error.URLError(TimeoutError('timed out'))
+        return json.dumps({'ok': True}).encode('utf-8')
+
+    calls, original = install(responder)
+    index.UPSTREAM_HEALTH = index.UpstreamHealth(failure_threshold=3, open_seconds=60, negative_ttl=0)
+    try:
+        for i in range(3):
+            try:
+                index.fetch_json(f'https://edhrec.example/page{i}.json', 'edhrec')
+            except urllib.error.URLError:
+                pass
+        assert len(calls) == 3
+        host = index.UPSTREAM_HEALTH.stats()['hosts']['edhrec.example']
+        assert host['state'] == 'open' and host['opens'] == 1
+
+        # Further requests fail without touching the network, other hosts are unaffected
+        try:
+            index.fetch_json('https://edhrec.example/page9.json', 'edhrec')
+        except index.UpstreamUnavailable:
+            pass
+        else:
+            raise AssertionError("expected UpstreamUnavailable")
+        assert len(calls) == 3
+        healthy['up'] = True
+        assert index.fetch_json('https://api.scryfall.example/x', 'scryfall') == {'ok': True}
+        print("  ✓ Circuit opened after 3 failures and short-circuits requests")
+
+        # After the cooldown one trial is let through and closes the circuit
+        index.UPSTREAM_HEALTH.hosts['edhrec.example']['opened_at'] -= 61
+        assert index.fetch_json('https://edhrec.example/page9.json', 'edhrec') == {'ok': True}
+        host = index.UPSTREAM_HEALTH.stats()['hosts']['edhrec.example']
+        assert host['state'] == 'closed' and host['short_circuits'] == 1
+        print("  ✓ Half-open trial closed the circuit")
+    finally:
+        index.HTTP_POOL = original
+        index.UPSTREAM_HEALTH = index.UpstreamHealth()
+        index.set_response_cache(index.create_response_cache())
+    print()
+
+
+def test_failed_urls_fail_fast():
+    """A 404 is answered from memory and never counts against the host"""
+    print("=== Testing failed-URL cache ===")
+
+    def responder(url):
+        raise urllib.error.HTTPError(url, 404, 'Not Found', None, io.BytesIO())
+
+    calls, original = install(responder)
+    index.UPSTREAM_HEALTH = index.UpstreamHealth(failure_threshold=2)
+    try:
+        url = 'https://json.edhrec.example/pages/commanders/not-a-commander.json'
+        for _ in range(5):
+            try:
+                index.fetch_json(url, 'edhrec')
+            except urllib.error.HTTPError as e:
+                assert e.code == 404
+            else:
+                raise AssertionError("expected HTTPError")
+        assert len(calls) == 1
+        host = index.UPSTREAM_HEALTH.stats()['hosts']['json.edhrec.example']
+        assert host['state'] == 'closed' and host['negative_hits'] == 4
+        print("  ✓ Repeated 404 served from the failed-URL cache")
+    finally:
+        index.HTTP_POOL = original
+        index.UPSTREAM_HEALTH = index.UpstreamHealth()
+        index.set_response_cache(index.create_response_cache())
+    print()
+
+
+if __name__ == "__main__":
+    test_circuit_opens_and_recovers()
+    test_failed_urls_fail_fast()
@@ -0,0 +1,48 @@
+"""
+Test weighted sampling without replacement (offline)
+"""
+
+import sys
+sys.path.insert(0, 'api')
+
+from index import weighted_sample_without_replacement, weighted_random_sample
+
+
+def test_never_returns_duplicates():
+    """Heavily weighted cards still only come back once"""
+    print("=== Testing duplicate-free weighted sampling ===")
+    cards = [
+        {'name': 'Atraxa, Praetors\' Voice', 'color_identity': ['W', 'U', 'B', 'G']},
+        {'name': 'Sol Ring', 'color_identity': []},
+        {'name': 'Sol Ring', 'color_identity': []},
+        {'name': 'Lightning Bolt', 'color_identity': ['R']},
+    ]
+    for _ in range(200):
+        selected = weighted_random_sample(cards, 3)
+        assert len(selected) == len(set(selected)) == 3
+
+    # Asking for more than exists returns every distinct card once
+    assert sorted(weighted_random_sample(cards, 10)) == sorted({c['name'] for c in cards})
+    print("  ✓ No duplicates across 200 draws")
+    print()
+
+
+def test_weights_bias_selection():
+    """Single draws follow the weights"""
+    print("=== Testing weight bias ===")
+    hits = {'heavy': 0, 'light': 0}
+    for _ in range(5000):
+        hits[weighted_sample_without_replacement(['heavy', 'light'], [9, 1], 1)[0]] += 1
+
+    ratio = hits['heavy'] / 5000
+    print(f"  Heavy item chosen {ratio:.1%} of the time (expected ~90%)")
+    assert 0.86 < ratio < 0.94
+
+    assert weighted_sample_without_replacement(['a', 'b'], [0, 1], 2) == ['b']
+    print("  ✓ Selection follows weights, zero weights excluded")
+    print()
+
+
+if __name__ == "__main__":
+    test_never_returns_duplicates()
+    test_weights_bias_selection()